@@ -5,8 +5,16 @@ A Mode7-style kart racer inspired by Mario Kart DS pre-release builds.
 Single-file implementation for Flames / Team Flames / Samsoft.
 """
 
+import copy
+import hashlib
+import json
 import math
+import os
 import random
+import re
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Optional, Tuple, List, Dict, Any
@@ -27,6 +35,8 @@ TRACK_SIZE = 512
 HORIZON_Y = 78
 CAM_HEIGHT = 60.0
 FOV_DEG = 70.0
+MIPMAPS = True               # distance-filtered ground texture
+FAR_HALF_RES_DIST = 160.0    # ground beyond this renders at half horizontal res
 
 MAX_SPEED_ROAD = 240.0
 MAX_SPEED_OFFROAD = 150.0
@@ -39,6 +49,16 @@ STEER_RATE = 2.4
 STEER_RATE_DRIFT = 3.2
 BOOST_STRENGTH = 340.0
 
+# Split-screen (VS RACE): one binding set per player, in player order
+MAX_PLAYERS = 4
+PLAYER_CONTROLS = [
+    {"up": pygame.K_UP, "down": pygame.K_DOWN, "left": pygame.K_LEFT, "right": pygame.K_RIGHT, "drift": pygame.K_SPACE},
+    {"up": pygame.K_w, "down": pygame.K_s, "left": pygame.K_a, "right": pygame.K_d, "drift": pygame.K_LSHIFT},
+    {"up": pygame.K_i, "down": pygame.K_k, "left": pygame.K_j, "right": pygame.K_l, "drift": pygame.K_RSHIFT},
+    {"up": pygame.K_KP8, "down": pygame.K_KP5, "left": pygame.K_KP4, "right": pygame.K_KP6, "drift": pygame.K_KP0},
+]
+PLAYER_DOT_COLORS = [(255, 60, 60), (60, 200, 60), (60, 140, 255), (255, 220, 40)]
+
 # Menu colors (MKDS beta style - blue/orange theme)
 COL_BG_DARK = (16, 24, 48)
 COL_BG_LIGHT = (32, 48, 80)
@@ -130,28 +150,56 @@ class Kart:
 # =============================================================================
 # TRACK GENERATION
 # =============================================================================
+SURF_OFFROAD = 0
+SURF_ROAD = 1
+SURF_KERB = 2
+SURF_BOOST = 3
+
+
 @dataclass
 class Track:
     name: str
     size: int
     surface: pygame.Surface
-    road_mask: np.ndarray
-    boost_mask: np.ndarray
+    surface_map: np.ndarray        # (size, size) uint8 SURF_* per texel
+    edge_dist: np.ndarray          # (size, size) float32, +inside road / -outside
+    progress: np.ndarray           # (size, size) float32 lap fraction of the nearest centreline point
     minimap: pygame.Surface
     start_x: float
     start_y: float
     start_angle: float
     checkpoints: List[Tuple[float, float, float]]  # (x, y, radius)
+    centerline: List[Tuple[float, float]] = field(default_factory=list)
+
+    def _index(self, xs, ys) -> Tuple[np.ndarray, np.ndarray]:
+        ix = np.asarray(xs, dtype=np.float64).astype(np.int64) % self.size
+        iy = np.asarray(ys, dtype=np.float64).astype(np.int64) % self.size
+        return ix, iy
+
+    def surface_at(self, xs, ys) -> np.ndarray:
+        """SURF_* codes for many world points at once."""
+        ix, iy = self._index(xs, ys)
+        return self.surface_map[ix, iy]
+
+    def distance_to_edge(self, xs, ys) -> np.ndarray:
+        """Signed texel distance to the road edge; positive while on road."""
+        ix, iy = self._index(xs, ys)
+        return self.edge_dist[ix, iy]
+
+    def progress_at(self, xs, ys) -> np.ndarray:
+        """Lap fraction in [0, 1) of the centreline point nearest each position."""
+        ix, iy = self._index(xs, ys)
+        return self.progress[ix, iy]
 
     def is_road(self, x: float, y: float) -> bool:
         ix = int(x) % self.size
         iy = int(y) % self.size
-        return bool(self.road_mask[ix, iy])
+        return self.surface_map[ix, iy] in (SURF_ROAD, SURF_BOOST)
 
     def is_boost(self, x: float, y: float) -> bool:
         ix = int(x) % self.size
         iy = int(y) % self.size
-        return bool(self.boost_mask[ix, iy])
+        return self.surface_map[ix, iy] == SURF_BOOST
 
 
 def _make_checker_grass(size: int, c1: Tuple, c2: Tuple) -> pygame.Surface:
@@ -241,13 +289,11 @@ def generate_oval_track(size: int = 512, name: str = "Samsoft Circuit") -> Track
         boost_layer.blit(pad_rot, rect.topleft)
     tex.blit(boost_layer, (0, 0))
 
-    # Build masks
-    tex_rgb = pygame.surfarray.array3d(tex)
-    r = tex_rgb[:, :, 0].astype(np.int16)
-    g = tex_rgb[:, :, 1].astype(np.int16)
-    b = tex_rgb[:, :, 2].astype(np.int16)
-    road_mask = (abs(r - road_color[0]) < 25) & (abs(g - road_color[1]) < 25) & (abs(b - road_color[2]) < 25)
-    boost_mask = (abs(r - boost_color[0]) < 25) & (abs(g - boost_color[1]) < 25) & (abs(b - boost_color[2]) < 25)
+    # Surface types come from the layers they were drawn on, not the final colors
+    surface_map = np.full((size, size), SURF_OFFROAD, dtype=np.uint8)
+    surface_map[pygame.surfarray.array_alpha(road_layer) > 0] = SURF_ROAD
+    surface_map[pygame.surfarray.array_alpha(kerb) > 0] = SURF_KERB
+    surface_map[pygame.surfarray.array_alpha(boost_layer) > 0] = SURF_BOOST
 
     minimap = pygame.transform.smoothscale(tex, (64, 64))
 
@@ -259,17 +305,22 @@ def generate_oval_track(size: int = 512, name: str = "Samsoft Circuit") -> Track
         cy = center[1] + ry * math.sin(t)
         checkpoints.append((cx, cy, 50.0))
 
+    centerline = [(center[0] + rx * math.cos(t), center[1] + ry * math.sin(t))
+                  for t in np.linspace(0.0, math.tau, 256, endpoint=False)]
+
     return Track(
         name=name,
         size=size,
         surface=tex.convert(),
-        road_mask=road_mask,
-        boost_mask=boost_mask,
+        surface_map=surface_map,
+        edge_dist=signed_edge_distance(surface_map),
+        progress=progress_field(size, centerline),
         minimap=minimap.convert(),
         start_x=center[0] + size * 0.34,
         start_y=center[1],
         start_angle=math.pi,
         checkpoints=checkpoints,
+        centerline=centerline,
     )
 
 
@@ -301,48 +352,264 @@ def generate_figure8_track(size: int = 512, name: str = "Figure-8 Cross") -> Tra
 
     tex.blit(road_layer, (0, 0))
 
-    # Build masks
-    tex_rgb = pygame.surfarray.array3d(tex)
-    r = tex_rgb[:, :, 0].astype(np.int16)
-    g = tex_rgb[:, :, 1].astype(np.int16)
-    b = tex_rgb[:, :, 2].astype(np.int16)
-    road_mask = (abs(r - road_color[0]) < 25) & (abs(g - road_color[1]) < 25) & (abs(b - road_color[2]) < 25)
-    boost_mask = np.zeros_like(road_mask)
+    surface_map = np.full((size, size), SURF_OFFROAD, dtype=np.uint8)
+    surface_map[pygame.surfarray.array_alpha(road_layer) > 0] = SURF_ROAD
 
     minimap = pygame.transform.smoothscale(tex, (64, 64))
 
+    # Right loop down to the crossing, the whole left loop the other way round,
+    # then back up the right loop to the start
+    right = (center[0] + loop_offset, center[1])
+    left = (center[0] - loop_offset, center[1])
+    centerline = [(right[0] + loop_r * math.cos(t), right[1] + loop_r * math.sin(t))
+                  for t in np.linspace(0.0, math.pi, 96, endpoint=False)]
+    centerline += [(left[0] + loop_r * math.cos(t), left[1] + loop_r * math.sin(t))
+                   for t in np.linspace(0.0, -math.tau, 192, endpoint=False)]
+    centerline += [(right[0] + loop_r * math.cos(t), right[1] + loop_r * math.sin(t))
+                   for t in np.linspace(math.pi, math.tau, 96, endpoint=False)]
+
     return Track(
         name=name,
         size=size,
         surface=tex.convert(),
-        road_mask=road_mask,
-        boost_mask=boost_mask,
+        surface_map=surface_map,
+        edge_dist=signed_edge_distance(surface_map),
+        progress=progress_field(size, centerline),
         minimap=minimap.convert(),
         start_x=center[0] + loop_offset + loop_r,
         start_y=center[1],
         start_angle=math.pi / 2,
         checkpoints=[(center[0], center[1], 40.0)],
+        centerline=centerline,
     )
 
 
+# =============================================================================
+# TRACK COMPILER
+# =============================================================================
+TRACK_GENERATORS = {
+    "Samsoft Circuit": generate_oval_track,
+    "Figure-8 Cross": generate_figure8_track,
+}
+TRACK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "track_cache")
+TRACK_BUNDLE_VERSION = 1
+TRACK_ARRAYS = ("texture", "surface_map", "edge_dist", "progress")
+
+
+def _distance_1d(feature: np.ndarray) -> np.ndarray:
+    """Distance along axis 0 to the nearest True cell, per column."""
+    n = feature.shape[0]
+    big = float(sum(feature.shape))
+    dist = np.empty(feature.shape, dtype=np.float32)
+    run = np.full(feature.shape[1], big, dtype=np.float32)
+    for i in range(n):
+        run = np.where(feature[i], 0.0, run + 1.0)
+        dist[i] = run
+    run = np.full(feature.shape[1], big, dtype=np.float32)
+    for i in range(n - 1, -1, -1):
+        run = np.where(feature[i], 0.0, run + 1.0)
+        np.minimum(dist[i], run, out=dist[i])
+    return dist
+
+
+def euclidean_distance(feature: np.ndarray, chunk: int = 32) -> np.ndarray:
+    """Exact Euclidean distance from every cell to the nearest True cell.
+
+    Separable: a 1D scan along axis 0, then a brute-force lower envelope along
+    axis 1 in row chunks. O(N^3) but vectorised, and only run at compile time.
+    """
+    g2 = _distance_1d(feature) ** 2
+    n = feature.shape[1]
+    j = np.arange(n, dtype=np.float32)
+    offsets2 = (j[:, None] - j[None, :]) ** 2        # (target, source)
+    out = np.empty(feature.shape, dtype=np.float32)
+    for r0 in range(0, feature.shape[0], chunk):
+        block = g2[r0:r0 + chunk]
+        out[r0:r0 + chunk] = (offsets2[None, :, :] + block[:, None, :]).min(axis=2)
+    return np.sqrt(out)
+
+
+def signed_edge_distance(surface_map: np.ndarray) -> np.ndarray:
+    """Texel distance to the road edge: positive on road/boost, negative off it."""
+    road = (surface_map == SURF_ROAD) | (surface_map == SURF_BOOST)
+    inside = euclidean_distance(~road)
+    outside = euclidean_distance(road)
+    return np.where(road, inside, -outside).astype(np.float32)
+
+
+def progress_field(size: int, centerline: List[Tuple[float, float]], chunk: int = 16384) -> np.ndarray:
+    """Lap fraction of the nearest centreline point for every texel."""
+    pts = np.asarray(centerline, dtype=np.float32)
+    seg = np.hypot(*np.diff(np.vstack([pts, pts[:1]]), axis=0).T)
+    along = np.concatenate([[0.0], np.cumsum(seg)[:-1]]) / seg.sum()
+    gx, gy = np.meshgrid(np.arange(size, dtype=np.float32), np.arange(size, dtype=np.float32), indexing="ij")
+    gx, gy = gx.ravel(), gy.ravel()
+    nearest = np.empty(gx.shape, dtype=np.int64)
+    for k in range(0, gx.size, chunk):
+        d2 = (gx[k:k + chunk, None] - pts[None, :, 0]) ** 2 + (gy[k:k + chunk, None] - pts[None, :, 1]) ** 2
+        nearest[k:k + chunk] = d2.argmin(axis=1)
+    return along[nearest].astype(np.float32).reshape(size, size)
+
+
+def track_source_digest() -> str:
+    """Digest of this file's TRACK GENERATION and TRACK COMPILER sections: the
+    SURF_* table, the generators and the compiler that bake a bundle."""
+    with open(os.path.abspath(__file__), "rb") as f:
+        source = f.read()
+    start = re.search(rb"^# TRACK GENERATION$", source, re.M)
+    end = re.search(rb"^# MODE7 RENDERER$", source, re.M)
+    section = source[start.start():end.start()] if start and end else source
+    return hashlib.sha1(section).hexdigest()[:12]
+
+
+# Part of every bundle path, so editing a generator or surface code misses the cache
+TRACK_SOURCE_DIGEST = track_source_digest()
+
+
+def _track_bundle_prefix(name: str, size: int) -> str:
+    slug = "".join(c.lower() if c.isalnum() else "_" for c in name)
+    return f"{slug}-{size}-"
+
+
+def track_bundle_path(name: str, size: int) -> str:
+    return os.path.join(TRACK_CACHE_DIR, f"{_track_bundle_prefix(name, size)}"
+                                         f"v{TRACK_BUNDLE_VERSION}-{TRACK_SOURCE_DIGEST}")
+
+
+def prune_track_bundles(name: str, size: int) -> None:
+    """Delete bundles of this track built by older code."""
+    current = os.path.basename(track_bundle_path(name, size))
+    prefix = _track_bundle_prefix(name, size)
+    for entry in os.listdir(TRACK_CACHE_DIR):
+        if entry.startswith(prefix) and entry != current and ".tmp" not in entry:
+            shutil.rmtree(os.path.join(TRACK_CACHE_DIR, entry), ignore_errors=True)
+
+
+def save_track_bundle(track: Track, path: str) -> None:
+    """Write one .npy per array (so they can be memory-mapped) plus meta.json.
+    Written to a temp directory and renamed so a crash never leaves half a bundle."""
+    tmp = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    arrays = {
+        "texture": pygame.surfarray.array3d(track.surface),
+        "surface_map": track.surface_map,
+        "edge_dist": track.edge_dist,
+        "progress": track.progress,
+    }
+    for key in TRACK_ARRAYS:
+        np.save(os.path.join(tmp, f"{key}.npy"), np.ascontiguousarray(arrays[key]))
+    meta = {
+        "name": track.name,
+        "size": track.size,
+        "start": [track.start_x, track.start_y, track.start_angle],
+        "checkpoints": [list(c) for c in track.checkpoints],
+        "centerline": [list(p) for p in track.centerline],
+    }
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+
+
+def load_track_bundle(path: str) -> Track:
+    """Open a compiled bundle; the query arrays stay memory-mapped read-only."""
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r") for key in TRACK_ARRAYS}
+    tex = pygame.surfarray.make_surface(np.asarray(arrays["texture"]))
+    if pygame.display.get_surface() is not None:
+        tex = tex.convert()
+    start_x, start_y, start_angle = meta["start"]
+    return Track(
+        name=meta["name"],
+        size=meta["size"],
+        surface=tex,
+        surface_map=arrays["surface_map"],
+        edge_dist=arrays["edge_dist"],
+        progress=arrays["progress"],
+        minimap=pygame.transform.smoothscale(tex, (64, 64)),
+        start_x=start_x,
+        start_y=start_y,
+        start_angle=start_angle,
+        checkpoints=[tuple(c) for c in meta["checkpoints"]],
+        centerline=[tuple(p) for p in meta["centerline"]],
+    )
+
+
+def load_track(name: str, size: int = TRACK_SIZE, rebuild: bool = False) -> Track:
+    """Load a compiled track, compiling and caching it first if needed.
+    Falls back to the in-memory build when the cache cannot be written."""
+    path = track_bundle_path(name, size)
+    if not rebuild and os.path.isfile(os.path.join(path, "meta.json")):
+        try:
+            return load_track_bundle(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Track cache unreadable ({e}), rebuilding {name}")
+    generator = TRACK_GENERATORS.get(name, generate_oval_track)
+    track = generator(size=size, name=name)
+    try:
+        save_track_bundle(track, path)
+        prune_track_bundles(name, size)
+    except OSError as e:
+        print(f"Could not cache track {name}: {e}")
+    return track
+
+
 # =============================================================================
 # MODE7 RENDERER
 # =============================================================================
+@dataclass
+class GroundBand:
+    """A horizontal slab of ground rows rendered every `step` columns, with
+    its own per-row mip tables and reusable gather buffers."""
+    step: int
+    r0: int
+    r1: int
+    row_dist: np.ndarray
+    side: np.ndarray
+    shift: np.ndarray
+    th_row: np.ndarray
+    offset: np.ndarray
+    wx: np.ndarray
+    wy: np.ndarray
+    ix: np.ndarray
+    iy: np.ndarray
+    px: np.ndarray
+
+
+def build_mip_pyramid(tex_array: np.ndarray, min_size: int = 8) -> List[np.ndarray]:
+    """Box-filtered (W, H, 3) levels, halving until a side hits `min_size`."""
+    levels = [tex_array]
+    level = tex_array.astype(np.uint16)
+    while min(level.shape[0], level.shape[1]) // 2 >= min_size and \
+            level.shape[0] % 2 == 0 and level.shape[1] % 2 == 0:
+        level = (level[0::2, 0::2] + level[1::2, 0::2] + level[0::2, 1::2] + level[1::2, 1::2]) // 4
+        levels.append(level.astype(np.uint8))
+    return levels
+
+
 class Mode7Renderer:
     def __init__(self, texture: pygame.Surface, horizon_y: int, cam_height: float,
-                 fov_deg: float, screen_w: int, screen_h: int) -> None:
+                 fov_deg: float, screen_w: int, screen_h: int, vectorized: bool = True,
+                 mipmaps: bool = MIPMAPS, far_dist: Optional[float] = FAR_HALF_RES_DIST,
+                 mip_bias: float = 0.0) -> None:
         self.texture = texture
         self.horizon_y = horizon_y
         self.cam_height = float(cam_height)
         self.screen_w = int(screen_w)
         self.screen_h = int(screen_h)
-
-        self.tex_array = pygame.surfarray.array3d(texture)
-        self.tw, self.th = self.tex_array.shape[0], self.tex_array.shape[1]
+        self.vectorized = vectorized
+        self.mipmaps = mipmaps
+        self.far_dist = far_dist
+        self.mip_bias = mip_bias
+        self._tables_key: Optional[Tuple] = None
 
         self.x_lerp = np.linspace(0.0, 1.0, self.screen_w, endpoint=False, dtype=np.float32)
         self.proj = 120.0
         self.fov_scale = float(math.tan(math.radians(fov_deg) / 2.0))
+        self.pixel_shifts = (16, 8, 0)   # XRGB8888 until set_pixel_format says otherwise
+        self.update_texture(texture)
 
         # Sky gradient
         top = np.array([120, 185, 255], dtype=np.float32)
@@ -352,14 +619,144 @@ class Mode7Renderer:
         else:
             t = np.linspace(0.0, 1.0, self.horizon_y, dtype=np.float32)[:, None]
             self.sky_rows = (top * (1.0 - t) + bot * t).astype(np.uint8)
+        self.sky_px = self.pack_pixels(self.sky_rows)
+
+    def pack_pixels(self, rgb: np.ndarray) -> np.ndarray:
+        """(..., 3) uint8 colours as 32-bit pixels in the target's format."""
+        rgb = rgb.astype(np.uint32)
+        rs, gs, bs = self.pixel_shifts
+        return (rgb[..., 0] << rs) | (rgb[..., 1] << gs) | (rgb[..., 2] << bs)
+
+    def set_pixel_format(self, surface: pygame.Surface) -> None:
+        """Repack the texels and sky for a 32-bit surface's channel layout."""
+        shifts = tuple(surface.get_shifts()[:3])
+        if shifts != self.pixel_shifts:
+            self.pixel_shifts = shifts
+            self.tex_px = self.pack_pixels(self.tex_flat)
+            self.sky_px = self.pack_pixels(self.sky_rows)
 
     def update_texture(self, texture: pygame.Surface) -> None:
-        """Update the texture (for track changes)."""
+        """Update the texture (for track changes) and rebuild its mip chain."""
         self.texture = texture
         self.tex_array = pygame.surfarray.array3d(texture)
         self.tw, self.th = self.tex_array.shape[0], self.tex_array.shape[1]
+        # All mip levels live in one flat texel array; level l starts at mip_offsets[l]
+        self.mips = build_mip_pyramid(self.tex_array) if self.mipmaps else [self.tex_array]
+        self.mip_offsets = np.cumsum([0] + [m.shape[0] * m.shape[1] for m in self.mips[:-1]])
+        self.tex_flat = np.concatenate([np.ascontiguousarray(m).reshape(-1, 3) for m in self.mips])
+        self.tex_px = self.pack_pixels(self.tex_flat)
+        # Power-of-two textures wrap with a mask instead of a division
+        self.wrap_mask = self.tw & (self.tw - 1) == 0 and self.th & (self.th - 1) == 0
+        self._tables_key = None
+
+    def _ground_tables(self) -> None:
+        """Per-row distance, width and mip tables plus reusable buffers. Only
+        rebuilt when camera height, projection, FOV, LOD or resolution change."""
+        key = (self.cam_height, self.proj, self.fov_scale, self.horizon_y, self.screen_w,
+               self.screen_h, self.far_dist, self.mip_bias, len(self.mips))
+        if key == self._tables_key:
+            return
+        W = self.screen_w
+        rows = max(self.screen_h - self.horizon_y, 0)
+        p = np.arange(rows, dtype=np.float64) + 1.0
+        row_dist = (self.cam_height * self.proj) / p
+        half_width = row_dist * self.fov_scale
+        u = 2.0 * self.x_lerp.astype(np.float64) - 1.0
+
+        # Rows beyond far_dist (the ones nearest the horizon) use every other
+        # column. There are cam_height * proj / far_dist of them, so the band
+        # grows with the projection when a viewport is scaled up
+        far_rows = 0 if self.far_dist is None else int(np.count_nonzero(row_dist > self.far_dist))
+        self.bands = []
+        for step, r0, r1 in ((2, 0, far_rows), (1, far_rows, rows)):
+            if r1 <= r0:
+                continue
+            # Texels covered by one pixel: across the row, and between rows
+            across = 2.0 * half_width[r0:r1] * step / W
+            depth = row_dist[r0:r1] / p[r0:r1]
+            footprint = np.maximum(np.maximum(across, depth), 1.0)
+            level = np.floor(np.log2(footprint) + self.mip_bias).astype(np.int32)
+            level = np.clip(level, 0, len(self.mips) - 1)
+            side = u[::step, None] * half_width[None, r0:r1]
+            self.bands.append(GroundBand(
+                step=step, r0=r0, r1=r1,
+                row_dist=row_dist[r0:r1],
+                side=side,
+                shift=level[None, :],
+                th_row=(self.th >> level)[None, :].astype(np.int32),
+                offset=self.mip_offsets[level][None, :].astype(np.int32),
+                wx=np.empty_like(side),
+                wy=np.empty_like(side),
+                ix=np.empty(side.shape, dtype=np.int32),
+                iy=np.empty(side.shape, dtype=np.int32),
+                px=np.empty(side.shape, dtype=np.uint32),
+            ))
+        self._tables_key = key
 
     def render_ground(self, target: pygame.Surface, cam_x: float, cam_y: float, cam_angle: float) -> None:
+        if self.vectorized:
+            self._render_ground_grid(target, cam_x, cam_y, cam_angle)
+        else:
+            self._render_ground_rows(target, cam_x, cam_y, cam_angle)
+
+    def _render_ground_grid(self, target: pygame.Surface, cam_x: float, cam_y: float, cam_angle: float) -> None:
+        self.set_pixel_format(target)
+        arr = pygame.surfarray.pixels2d(target)
+        self.render_ground_array(arr, cam_x, cam_y, cam_angle)
+        del arr
+
+    def render_ground_array(self, arr: np.ndarray, cam_x: float, cam_y: float, cam_angle: float) -> None:
+        """Whole ground in one broadcasted pass per band of the (W, H - horizon) grid.
+
+        Writes into a (screen_w, screen_h) pixels2d view of a 32-bit surface
+        whose layout was given to set_pixel_format, and touches no pygame
+        state, so viewports with their own renderer can run on worker threads.
+        """
+        self._ground_tables()
+        h0 = self.horizon_y
+        cos_a = math.cos(cam_angle)
+        sin_a = math.sin(cam_angle)
+
+        if h0 > 0:
+            arr[:, :h0] = self.sky_px[None, :]
+
+        for band in self.bands:
+            wx, wy, ix, iy = band.wx, band.wy, band.ix, band.iy
+            # world = cam + dir * row_dist + right * side, with right = (-sin, cos)
+            np.multiply(band.side, -sin_a, out=wx)
+            wx += cam_x + cos_a * band.row_dist
+            np.multiply(band.side, cos_a, out=wy)
+            wy += cam_y + sin_a * band.row_dist
+
+            np.copyto(ix, wx, casting="unsafe")
+            np.copyto(iy, wy, casting="unsafe")
+            if self.wrap_mask:
+                np.bitwise_and(ix, self.tw - 1, out=ix)
+                np.bitwise_and(iy, self.th - 1, out=iy)
+            else:
+                np.remainder(ix, self.tw, out=ix)
+                np.remainder(iy, self.th, out=iy)
+            if self.mipmaps:
+                np.right_shift(ix, band.shift, out=ix)
+                np.right_shift(iy, band.shift, out=iy)
+                ix *= band.th_row
+                ix += band.offset
+            else:
+                ix *= self.th
+            ix += iy
+            np.take(self.tex_px, ix, out=band.px, mode="clip")
+
+            y0, y1 = h0 + band.r0, h0 + band.r1
+            if band.step == 1:
+                arr[:, y0:y1] = band.px
+            else:
+                # Nearest-neighbour upscale: each sample fills `step` columns
+                for k in range(band.step):
+                    cols = arr[k::band.step, y0:y1]
+                    cols[...] = band.px[:cols.shape[0]]
+
+    def _render_ground_rows(self, target: pygame.Surface, cam_x: float, cam_y: float, cam_angle: float) -> None:
+        """Original scanline loop, kept as the reference for benchmark_mode7."""
         W, H = self.screen_w, self.screen_h
         h0 = self.horizon_y
         cos_a = math.cos(cam_angle)
@@ -421,6 +818,44 @@ class Mode7Renderer:
         scale = max(0.05, min(2.2, 120.0 / forward))
         return float(sx), float(sy), float(scale), float(forward)
 
+    def project_points(self, xs: np.ndarray, ys: np.ndarray, cam_x: float, cam_y: float,
+                       cam_angle: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """project_point for many world points at once.
+
+        Returns (sx, sy, scale, forward, visible); entries where `visible` is
+        False are the points project_point would return None for.
+        """
+        dx = np.asarray(xs, dtype=np.float64) - cam_x
+        dy = np.asarray(ys, dtype=np.float64) - cam_y
+        cos_a = math.cos(cam_angle)
+        sin_a = math.sin(cam_angle)
+        forward = dx * cos_a + dy * sin_a
+        side = dx * -sin_a + dy * cos_a
+        safe = np.where(forward > 1.0, forward, 1.0)
+        sy = self.horizon_y + (self.cam_height * self.proj) / safe
+        sx = (0.5 + 0.5 * side / (safe * self.fov_scale)) * self.screen_w
+        visible = ((forward > 1.0) & (sy < self.screen_h + 20) & (sx >= -40) & (sx <= self.screen_w + 40))
+        # Sprite scale follows the projection so shrunken viewports shrink sprites too
+        scale = np.clip(120.0 / safe, 0.05, 2.2) * (self.proj / 120.0)
+        return sx, sy, scale, forward, visible
+
+    def for_viewport(self, screen_w: int, screen_h: int) -> "Mode7Renderer":
+        """A renderer for a (screen_w, screen_h) viewport sharing this one's
+        texture and mip chain. Horizon and projection scale with the height so
+        a split-screen view shows the same framing as the full screen."""
+        view = copy.copy(self)
+        ratio = screen_h / self.screen_h
+        view.screen_w = int(screen_w)
+        view.screen_h = int(screen_h)
+        view.horizon_y = int(round(self.horizon_y * ratio))
+        view.proj = self.proj * ratio
+        view.x_lerp = np.linspace(0.0, 1.0, view.screen_w, endpoint=False, dtype=np.float32)
+        view.sky_rows = self.sky_rows[np.linspace(0, len(self.sky_rows) - 1, max(view.horizon_y, 1)).astype(int)]
+        view.sky_px = view.pack_pixels(view.sky_rows)
+        view._tables_key = None
+        view.bands = []
+        return view
+
 
 # =============================================================================
 # CHARACTER DATA
@@ -563,6 +998,7 @@ class MainMenu:
         self.font = pygame.font.Font(None, 18)
         self.font_small = pygame.font.Font(None, 14)
         self.key_delay = 0.0
+        self.vs_players = 2
 
     def update(self, dt: float) -> Optional[GameState]:
         self.t += dt
@@ -576,11 +1012,17 @@ class MainMenu:
             elif keys[pygame.K_DOWN]:
                 self.selected = (self.selected + 1) % len(self.OPTIONS)
                 self.key_delay = 0.15
+            elif self.selected == 2 and (keys[pygame.K_LEFT] or keys[pygame.K_RIGHT]):
+                step = 1 if keys[pygame.K_RIGHT] else -1
+                self.vs_players = 2 + (self.vs_players - 2 + step) % (MAX_PLAYERS - 1)
+                self.key_delay = 0.15
             elif keys[pygame.K_RETURN] or keys[pygame.K_SPACE]:
                 if self.selected == 0:  # Grand Prix
                     return GameState.CHARACTER_SELECT
                 elif self.selected == 1:  # Time Trials
                     return GameState.CHARACTER_SELECT
+                elif self.selected == 2:  # VS Race (split-screen)
+                    return GameState.CHARACTER_SELECT
                 elif self.selected == 3:  # Options
                     return GameState.OPTIONS
                 self.key_delay = 0.2
@@ -610,6 +1052,8 @@ class MainMenu:
                 cursor_x = panel_rect.x + 10 + math.sin(self.t * 8) * 2
                 pygame.draw.polygon(surf, COL_HIGHLIGHT, 
                     [(cursor_x, y + 4), (cursor_x + 6, y + 8), (cursor_x, y + 12)])
+            if opt == "VS RACE":
+                opt = f"VS RACE  <{self.vs_players}P>" if i == self.selected else f"VS RACE  {self.vs_players}P"
             text = self.font_small.render(opt, True, color)
             surf.blit(text, (panel_rect.x + 22, y))
 
@@ -906,6 +1350,30 @@ class OptionsMenu:
                 pygame.draw.rect(surf, COL_HIGHLIGHT, pygame.Rect(bar_x, y + 2, 45, 10))
 
 
+# =============================================================================
+# SPLIT-SCREEN
+# =============================================================================
+@dataclass
+class Viewport:
+    rect: pygame.Rect
+    surface: pygame.Surface        # subsurface of the frame covering rect
+    renderer: Mode7Renderer
+    player: int
+    kart_sprite: pygame.Surface
+
+
+def split_rects(count: int, w: int, h: int) -> List[pygame.Rect]:
+    """1 player: full screen, 2: stacked halves, 3-4: quadrants."""
+    if count <= 1:
+        return [pygame.Rect(0, 0, w, h)]
+    if count == 2:
+        return [pygame.Rect(0, 0, w, h // 2), pygame.Rect(0, h // 2, w, h - h // 2)]
+    hw, hh = w // 2, h // 2
+    quads = [pygame.Rect(0, 0, hw, hh), pygame.Rect(hw, 0, w - hw, hh),
+             pygame.Rect(0, hh, hw, h - hh), pygame.Rect(hw, hh, w - hw, h - hh)]
+    return quads[:count]
+
+
 # =============================================================================
 # MAIN GAME CLASS
 # =============================================================================
@@ -915,7 +1383,8 @@ class SamsoftKart:
         pygame.display.set_caption("Samsoft Kart — Beta MKDS Style")
         self.window = pygame.display.set_mode((WINDOW_W, WINDOW_H))
         self.clock = pygame.time.Clock()
-        self.frame = pygame.Surface((INTERNAL_W, INTERNAL_H)).convert()
+        # 32-bit so the Mode7 pass can write whole pixels through pixels2d
+        self.frame = pygame.Surface((INTERNAL_W, INTERNAL_H), 0, 32)
 
         self.state = GameState.TITLE
         self.running = True
@@ -931,30 +1400,38 @@ class SamsoftKart:
         # Race state
         self.selected_character = 0
         self.selected_cup = 0
+        self.num_players = 1
         self.track: Optional[Track] = None
         self.renderer: Optional[Mode7Renderer] = None
-        self.player: Optional[Kart] = None
-        self.player_sprite: Optional[pygame.Surface] = None
+        self.players: List[Kart] = []
+        self.player_chars: List[Character] = []
+        self.player_sprites: List[pygame.Surface] = []  # how each player looks to the others
+        self.viewports: List[Viewport] = []
         self.ai_karts: List[Dict] = []
         self.race_time = 0.0
-        self.drifting = False
-        self.drift_sparks_t = 0.0
+        self.drifting: List[bool] = []
+        self.drift_sparks_t: List[float] = []
         self.show_fps = True
 
+        # Viewport ground passes run here; the NumPy gathers release the GIL
+        self.render_pool: Optional[ThreadPoolExecutor] = None
+        self.sprite_cache: Dict[Tuple[int, int, int], pygame.Surface] = {}
+
         # Fonts for HUD
         self.font = pygame.font.Font(None, 20)
         self.font_small = pygame.font.Font(None, 16)
 
+    @property
+    def player(self) -> Optional[Kart]:
+        return self.players[0] if self.players else None
+
     def init_race(self):
         """Initialize a race with current selections."""
         # Generate track based on cup/track selection
         cup = CUPS[self.selected_cup]
         track_name = cup.tracks[0]  # First track in cup
 
-        if track_name == "Figure-8 Cross":
-            self.track = generate_figure8_track()
-        else:
-            self.track = generate_oval_track(name=track_name)
+        self.track = load_track(track_name)
 
         self.renderer = Mode7Renderer(
             self.track.surface,
@@ -965,18 +1442,45 @@ class SamsoftKart:
             screen_h=INTERNAL_H,
         )
 
-        # Player
-        char = CHARACTERS[self.selected_character]
-        self.player = Kart(
-            x=self.track.start_x,
-            y=self.track.start_y,
-            angle=self.track.start_angle,
-        )
-        self.player_sprite = make_kart_sprite((28, 16), char.color, char.outline)
+        # Players, side by side on the start line
+        n = self.num_players
+        self.players, self.player_chars, self.player_sprites = [], [], []
+        self.viewports = []
+        rects = split_rects(n, INTERNAL_W, INTERNAL_H)
+        right_x, right_y = -math.sin(self.track.start_angle), math.cos(self.track.start_angle)
+        for i, rect in enumerate(rects):
+            char = CHARACTERS[(self.selected_character + i) % len(CHARACTERS)]
+            offset = (i - (n - 1) / 2.0) * 14.0
+            self.players.append(Kart(
+                x=self.track.start_x + right_x * offset,
+                y=self.track.start_y + right_y * offset,
+                angle=self.track.start_angle,
+            ))
+            self.player_chars.append(char)
+            self.player_sprites.append(make_kart_sprite((22, 12), char.color, char.outline))
+            if n == 1:
+                renderer = self.renderer
+                kart_size = (28, 16)
+            else:
+                renderer = self.renderer.for_viewport(rect.width, rect.height)
+                ratio = rect.height / INTERNAL_H
+                kart_size = (max(8, int(28 * ratio)), max(4, int(16 * ratio)))
+            self.viewports.append(Viewport(
+                rect=rect,
+                surface=self.frame.subsurface(rect),
+                renderer=renderer,
+                player=i,
+                kart_sprite=make_kart_sprite(kart_size, char.color, char.outline),
+            ))
+        self.drifting = [False] * n
+        self.drift_sparks_t = [0.0] * n
+        if n > 1 and self.render_pool is None:
+            self.render_pool = ThreadPoolExecutor(max_workers=MAX_PLAYERS, thread_name_prefix="mode7")
+        self.sprite_cache.clear()
 
         # AI karts
         self.ai_karts = []
-        ai_chars = [c for i, c in enumerate(CHARACTERS) if i != self.selected_character]
+        ai_chars = [c for c in CHARACTERS if c not in self.player_chars]
         cx, cy = self.track.size // 2, self.track.size // 2
         rx, ry = self.track.size * 0.34, self.track.size * 0.26
         for i, char in enumerate(ai_chars[:5]):  # Up to 5 AI opponents
@@ -992,33 +1496,40 @@ class SamsoftKart:
         self.race_time = 0.0
         self.countdown = Countdown(INTERNAL_W, INTERNAL_H)
 
+    def steer_input(self, keys, player: int) -> float:
+        ctl = PLAYER_CONTROLS[player]
+        return (1.0 if keys[ctl["right"]] else 0.0) - (1.0 if keys[ctl["left"]] else 0.0)
+
     def update_race(self, dt: float):
         """Update race logic."""
         keys = pygame.key.get_pressed()
-
-        # Handle race inputs
-        throttle = 1.0 if keys[pygame.K_UP] else 0.0
-        brake = 1.0 if keys[pygame.K_DOWN] else 0.0
-        steer = (1.0 if keys[pygame.K_RIGHT] else 0.0) - (1.0 if keys[pygame.K_LEFT] else 0.0)
-        self.drifting = keys[pygame.K_SPACE]
-
-        on_road = self.track.is_road(self.player.x, self.player.y)
-        on_boost = self.track.is_boost(self.player.x, self.player.y)
-
-        # Apply character bonuses
-        char = CHARACTERS[self.selected_character]
-        speed_mult = 1.0 + char.speed_bonus
-        accel_mult = 1.0 + char.accel_bonus
-
-        self.player.update(
-            dt, throttle, brake, steer, self.drifting, on_road, on_boost,
-            MAX_SPEED_ROAD * speed_mult, MAX_SPEED_OFFROAD * speed_mult,
-            ACCEL * accel_mult, BRAKE,
-            FRICTION, OFFROAD_FRICTION, REVERSE_MAX,
-            STEER_RATE * (1.0 + char.handling_bonus),
-            STEER_RATE_DRIFT * (1.0 + char.handling_bonus),
-            BOOST_STRENGTH,
-        )
+        surface = self.track.surface_at([k.x for k in self.players], [k.y for k in self.players])
+
+        for i, kart in enumerate(self.players):
+            # Handle race inputs
+            ctl = PLAYER_CONTROLS[i]
+            throttle = 1.0 if keys[ctl["up"]] else 0.0
+            brake = 1.0 if keys[ctl["down"]] else 0.0
+            steer = self.steer_input(keys, i)
+            self.drifting[i] = keys[ctl["drift"]]
+
+            on_road = surface[i] in (SURF_ROAD, SURF_BOOST)
+            on_boost = surface[i] == SURF_BOOST
+
+            # Apply character bonuses
+            char = self.player_chars[i]
+            speed_mult = 1.0 + char.speed_bonus
+            accel_mult = 1.0 + char.accel_bonus
+
+            kart.update(
+                dt, throttle, brake, steer, self.drifting[i], on_road, on_boost,
+                MAX_SPEED_ROAD * speed_mult, MAX_SPEED_OFFROAD * speed_mult,
+                ACCEL * accel_mult, BRAKE,
+                FRICTION, OFFROAD_FRICTION, REVERSE_MAX,
+                STEER_RATE * (1.0 + char.handling_bonus),
+                STEER_RATE_DRIFT * (1.0 + char.handling_bonus),
+                BOOST_STRENGTH,
+            )
 
         # Update AI
         cx, cy = self.track.size // 2, self.track.size // 2
@@ -1034,59 +1545,96 @@ class SamsoftKart:
         if keys[pygame.K_ESCAPE]:
             return GameState.MAIN_MENU
         if keys[pygame.K_r]:
-            self.player.x = self.track.start_x
-            self.player.y = self.track.start_y
-            self.player.angle = self.track.start_angle
-            self.player.speed = 0.0
+            n = len(self.players)
+            right_x, right_y = -math.sin(self.track.start_angle), math.cos(self.track.start_angle)
+            for i, kart in enumerate(self.players):
+                offset = (i - (n - 1) / 2.0) * 14.0
+                kart.x = self.track.start_x + right_x * offset
+                kart.y = self.track.start_y + right_y * offset
+                kart.angle = self.track.start_angle
+                kart.speed = 0.0
 
         return None
 
+    def scaled_sprite(self, spr: pygame.Surface, w: int, h: int) -> pygame.Surface:
+        """smoothscale with a per-race cache; projected sizes are small ints,
+        so karts cruising at similar depths reuse the same surfaces."""
+        key = (id(spr), w, h)
+        out = self.sprite_cache.get(key)
+        if out is None:
+            out = pygame.transform.smoothscale(spr, (w, h))
+            self.sprite_cache[key] = out
+        return out
+
     def draw_race(self):
-        """Draw the race view."""
-        # Camera
+        """Draw the race view: one Mode7 viewport per player."""
         cam_back = 56.0
-        cam_x = self.player.x - math.cos(self.player.angle) * cam_back
-        cam_y = self.player.y - math.sin(self.player.angle) * cam_back
-
-        # Ground
-        self.renderer.render_ground(self.frame, cam_x, cam_y, self.player.angle)
+        cams = []
+        for vp in self.viewports:
+            kart = self.players[vp.player]
+            cams.append((kart.x - math.cos(kart.angle) * cam_back,
+                         kart.y - math.sin(kart.angle) * cam_back,
+                         kart.angle))
+
+        # Ground: a single view renders in place, split views fan out to the pool
+        if len(self.viewports) == 1:
+            self.renderer.render_ground(self.frame, *cams[0])
+        else:
+            for vp in self.viewports:
+                vp.renderer.set_pixel_format(self.frame)
+            arr = pygame.surfarray.pixels2d(self.frame)
+            jobs = [self.render_pool.submit(vp.renderer.render_ground_array,
+                                            arr[vp.rect.left:vp.rect.right, vp.rect.top:vp.rect.bottom], *cam)
+                    for vp, cam in zip(self.viewports, cams)]
+            for job in jobs:
+                job.result()
+            del arr
+
+        # Everything that can appear as a sprite: the other players, then AI
+        xs = np.array([k.x for k in self.players] + [b["x"] for b in self.ai_karts], dtype=np.float64)
+        ys = np.array([k.y for k in self.players] + [b["y"] for b in self.ai_karts], dtype=np.float64)
+        sprites = self.player_sprites + [b["sprite"] for b in self.ai_karts]
 
-        # AI karts
-        projected = []
-        for bot in self.ai_karts:
-            pr = self.renderer.project_point(bot["x"], bot["y"], cam_x, cam_y, self.player.angle)
-            if pr:
-                sx, sy, sc, fwd = pr
-                projected.append((fwd, sx, sy, sc, bot["sprite"]))
-        projected.sort(reverse=True)
-
-        for fwd, sx, sy, sc, spr in projected:
-            w = max(2, int(spr.get_width() * sc))
-            h = max(2, int(spr.get_height() * sc))
-            spr2 = pygame.transform.smoothscale(spr, (w, h))
-            rect = spr2.get_rect(center=(int(sx), int(sy) - int(h * 0.35)))
-            self.frame.blit(spr2, rect.topleft)
-
-        # Player kart
-        px, py = INTERNAL_W // 2, INTERNAL_H - 28
-        self.frame.blit(self.player_sprite, self.player_sprite.get_rect(center=(px, py)))
-
-        # Drift sparks
         keys = pygame.key.get_pressed()
-        steer = (1.0 if keys[pygame.K_RIGHT] else 0.0) - (1.0 if keys[pygame.K_LEFT] else 0.0)
-        if self.drifting and abs(steer) > 0.1 and abs(self.player.speed) > 90:
-            self.drift_sparks_t += 1/60
-            if self.drift_sparks_t > 0.03:
-                self.drift_sparks_t = 0.0
-                for side in (-1, 1):
-                    sx = px + side * 12 + random.randint(-1, 1)
-                    sy = py + 8 + random.randint(-1, 1)
-                    pygame.draw.circle(self.frame, (255, 240, 160), (sx, sy), 1)
+        for vp, cam in zip(self.viewports, cams):
+            view = vp.surface
+            vw, vh = vp.rect.size
+            sx, sy, sc, fwd, visible = vp.renderer.project_points(xs, ys, *cam)
+            visible[vp.player] = False
+            for j in np.nonzero(visible)[0][np.argsort(-fwd[visible], kind="stable")]:
+                spr = sprites[j]
+                w = max(2, int(spr.get_width() * sc[j]))
+                h = max(2, int(spr.get_height() * sc[j]))
+                spr2 = self.scaled_sprite(spr, w, h)
+                rect = spr2.get_rect(center=(int(sx[j]), int(sy[j]) - int(h * 0.35)))
+                view.blit(spr2, rect.topleft)
+
+            # Player kart
+            kart = self.players[vp.player]
+            px, py = vw // 2, vh - vp.kart_sprite.get_height() - 12 * vh // INTERNAL_H
+            view.blit(vp.kart_sprite, vp.kart_sprite.get_rect(center=(px, py)))
+
+            # Drift sparks
+            steer = self.steer_input(keys, vp.player)
+            if self.drifting[vp.player] and abs(steer) > 0.1 and abs(kart.speed) > 90:
+                self.drift_sparks_t[vp.player] += 1/60
+                if self.drift_sparks_t[vp.player] > 0.03:
+                    self.drift_sparks_t[vp.player] = 0.0
+                    spread = vp.kart_sprite.get_width() * 3 // 7
+                    for side in (-1, 1):
+                        spx = px + side * spread + random.randint(-1, 1)
+                        spy = py + vp.kart_sprite.get_height() // 2 + random.randint(-1, 1)
+                        pygame.draw.circle(view, (255, 240, 160), (spx, spy), 1)
+            else:
+                self.drift_sparks_t[vp.player] = 0.0
+
+        if len(self.viewports) == 1:
+            self.draw_hud()
         else:
-            self.drift_sparks_t = 0.0
+            self.draw_split_hud()
 
-        # HUD
-        on_road = self.track.is_road(self.player.x, self.player.y)
+    def draw_hud(self):
+        """Single-player HUD."""
         speed_kmh = max(0.0, self.player.speed) * 0.18
         
         # Speed panel (MKDS style)
@@ -1121,6 +1669,38 @@ class SamsoftKart:
             fps_text = self.font_small.render(f"{self.clock.get_fps():.0f}FPS", True, (60, 60, 60))
             self.frame.blit(fps_text, (INTERNAL_W - 40, INTERNAL_H - 14))
 
+    def draw_split_hud(self):
+        """Split-screen HUD: speed per viewport, shared clock and minimap."""
+        for vp in self.viewports:
+            speed_kmh = max(0.0, self.players[vp.player].speed) * 0.18
+            label = self.font_small.render(f"P{vp.player + 1} {speed_kmh:05.1f}", True,
+                                           PLAYER_DOT_COLORS[vp.player])
+            vp.surface.blit(label, (3, 3))
+            pygame.draw.rect(self.frame, (0, 0, 0), vp.rect, 1)
+
+        # 3 players leave the last quadrant free for a large map
+        if len(self.viewports) == 3:
+            free = pygame.Rect(INTERNAL_W // 2, INTERNAL_H // 2, INTERNAL_W - INTERNAL_W // 2, INTERNAL_H - INTERNAL_H // 2)
+            self.frame.fill(COL_BG_DARK, free)
+            map_rect = pygame.Rect(0, 0, 64, 64)
+            map_rect.center = free.center
+        else:
+            map_rect = pygame.Rect(INTERNAL_W - 68, INTERNAL_H // 2 - 32, 64, 64)
+        self.frame.blit(self.track.minimap, map_rect.topleft)
+        for i, kart in enumerate(self.players):
+            dot_x = int(map_rect.x + (kart.x % self.track.size) / self.track.size * 64)
+            dot_y = int(map_rect.y + (kart.y % self.track.size) / self.track.size * 64)
+            pygame.draw.circle(self.frame, PLAYER_DOT_COLORS[i], (dot_x, dot_y), 2)
+
+        mins = int(self.race_time // 60)
+        secs = self.race_time % 60
+        time_text = self.font_small.render(f"{mins:02d}:{secs:05.2f}", True, COL_TEXT)
+        self.frame.blit(time_text, time_text.get_rect(center=(INTERNAL_W // 2, INTERNAL_H // 2)))
+
+        if self.show_fps:
+            fps_text = self.font_small.render(f"{self.clock.get_fps():.0f}FPS", True, COL_TEXT_DIM)
+            self.frame.blit(fps_text, (INTERNAL_W - 40, INTERNAL_H - 14))
+
     def run(self):
         while self.running:
             dt = self.clock.tick(FPS) / 1000.0
@@ -1144,6 +1724,8 @@ class SamsoftKart:
                 result = self.main_menu.update(dt)
                 self.main_menu.draw(self.frame)
                 if result:
+                    if result == GameState.CHARACTER_SELECT:
+                        self.num_players = self.main_menu.vs_players if self.main_menu.selected == 2 else 1
                     self.state = result
 
             elif self.state == GameState.CHARACTER_SELECT:
@@ -1193,12 +1775,120 @@ class SamsoftKart:
                 self.window.blit(pygame.transform.scale(self.frame, (WINDOW_W, WINDOW_H)), (0, 0))
             pygame.display.flip()
 
+        if self.render_pool is not None:
+            self.render_pool.shutdown()
         pygame.quit()
 
 
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+def benchmark_mode7(frames: int = 40, rounds: int = 5) -> None:
+    """Time the scanline loop against the vectorized ground pass, with and
+    without mipmapping and the half-resolution far band.
+
+    Every resolution is framed like the game's INTERNAL_W x INTERNAL_H view
+    (see for_viewport). Configurations take turns for `rounds` rounds of
+    `frames` frames, and each reports its best round."""
+    import time
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    track = generate_oval_track()
+    configs = (
+        ("rows ms", dict(vectorized=False, mipmaps=False, far_dist=None)),
+        ("grid ms", dict(vectorized=True, mipmaps=False, far_dist=None)),
+        ("mip ms", dict(vectorized=True, mipmaps=True, far_dist=None)),
+        ("mip+lod ms", dict(vectorized=True, mipmaps=True, far_dist=FAR_HALF_RES_DIST)),
+    )
+    print(f"Mode7 ground, best of {rounds} x {frames} frames per resolution")
+    print(f"{'resolution':<12}" + "".join(f"{name:>12}" for name, _ in configs)
+          + f"{'vs rows':>10}{'vs grid':>10}")
+    for w, h in ((INTERNAL_W, INTERNAL_H), (320, 240), (640, 480), (1280, 720)):
+        target = pygame.Surface((w, h))
+        renderers = []
+        for _, options in configs:
+            renderer = Mode7Renderer(track.surface, HORIZON_Y, CAM_HEIGHT, FOV_DEG,
+                                     INTERNAL_W, INTERNAL_H, **options).for_viewport(w, h)
+            renderer.render_ground(target, track.start_x, track.start_y, track.start_angle)
+            renderers.append(renderer)
+        times = [float("inf")] * len(configs)
+        for _ in range(rounds):
+            for c, renderer in enumerate(renderers):
+                start = time.perf_counter()
+                for i in range(frames):
+                    angle = track.start_angle + i * 0.01
+                    renderer.render_ground(target, track.start_x - i, track.start_y + i * 0.5, angle)
+                times[c] = min(times[c], (time.perf_counter() - start) * 1000.0 / frames)
+        print(f"{w}x{h:<8}" + "".join(f"{t:>12.2f}" for t in times)
+              + f"{times[0] / times[-1]:>9.2f}x{times[1] / times[-1]:>9.2f}x")
+    pygame.quit()
+
+
+def benchmark_split_screen(frames: int = 240) -> None:
+    """Time a full draw_race for 1-4 players, ground passes on one worker
+    thread versus one per viewport."""
+    import time
+
+    game = SamsoftKart()
+    print(f"Split-screen draw_race, {frames} frames, {INTERNAL_W}x{INTERNAL_H}")
+    print(f"{'players':<10}{'1 thread ms':>14}{'pool ms':>10}{'fps':>8}")
+    for players in range(1, MAX_PLAYERS + 1):
+        game.num_players = players
+        game.init_race()
+        times = []
+        for workers in (1, MAX_PLAYERS):
+            if game.render_pool is not None:
+                game.render_pool.shutdown()
+            game.render_pool = ThreadPoolExecutor(max_workers=workers)
+            game.draw_race()
+            start = time.perf_counter()
+            for i in range(frames):
+                for k, kart in enumerate(game.players):
+                    kart.angle += 0.01 * (k + 1)
+                    kart.x += math.cos(kart.angle)
+                    kart.y += math.sin(kart.angle)
+                game.draw_race()
+            times.append((time.perf_counter() - start) * 1000.0 / frames)
+        print(f"{players:<10}{times[0]:>14.2f}{times[1]:>10.2f}{1000.0 / times[1]:>8.0f}")
+    game.render_pool.shutdown()
+    pygame.quit()
+
+
+def compile_tracks() -> None:
+    """Rebuild every track bundle and compare build time with a cached load."""
+    import time
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    for name in TRACK_GENERATORS:
+        start = time.perf_counter()
+        track = load_track(name, rebuild=True)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        track = load_track(name)
+        loaded = time.perf_counter() - start
+        xs = np.random.uniform(0, track.size, 4096)
+        ys = np.random.uniform(0, track.size, 4096)
+        start = time.perf_counter()
+        track.surface_at(xs, ys)
+        track.distance_to_edge(xs, ys)
+        queried = time.perf_counter() - start
+        print(f"{name:<18} build {built * 1000:8.1f} ms   load {loaded * 1000:6.1f} ms   "
+              f"4096-point query {queried * 1e6:6.0f} us   -> {track_bundle_path(name, track.size)}")
+    pygame.quit()
+
+
 # =============================================================================
 # ENTRY POINT
 # =============================================================================
 if __name__ == "__main__":
-    game = SamsoftKart()
-    game.run()
+    if "--bench" in sys.argv:
+        benchmark_mode7()
+    elif "--bench-split" in sys.argv:
+        benchmark_split_screen()
+    elif "--compile-tracks" in sys.argv:
+        compile_tracks()
+    else:
+        game = SamsoftKart()
+        game.run()
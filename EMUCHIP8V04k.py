@@ -6,8 +6,20 @@ Universal Controller Support (Atari 2600 to PS5)
 """
 
 import pygame
+import os
 import sys
 import random
+import struct
+import zlib
+import json
+import hashlib
+from collections import deque
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # EMBEDDED ROMS
@@ -163,6 +175,13 @@ FONTSET = [
 
 WIDTH, HEIGHT = 64, 32
 
+# Save-state layout: header, V0-VF, stack words, 4 KiB memory, packed
+# display rows, then the CXNN generator (624 MT words + index + gauss).
+STATE_MAGIC = b"C8SV"
+STATE_VERSION = 1
+STATE_HEADER = struct.Struct("<4sBBBHHBBBBBHH")
+STATE_RNG = struct.Struct("<625IBd")
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PROJECT64 COLOR SCHEME
@@ -196,7 +215,9 @@ class P64:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 class Chip8:
-    def __init__(self):
+    def __init__(self, seed=None):
+        # CXNN draws from a per-machine generator so runs replay from a seed
+        self.rng = random.Random(seed)
         self.reset()
 
     def reset(self):
@@ -205,7 +226,11 @@ class Chip8:
         self.I = 0
         self.pc = 0x200
         self.stack = []
-        self.display = [[0] * WIDTH for _ in range(HEIGHT)]
+        # One int bitmask per row, leftmost pixel in the highest bit. Python
+        # ints grow as needed, so a 128x64 SCHIP mode only changes these two.
+        self.width = WIDTH
+        self.height = HEIGHT
+        self.display = [0] * self.height
         self.keys = [0] * 16
         self.delay_timer = 0
         self.sound_timer = 0
@@ -241,7 +266,7 @@ class Chip8:
         hi = op & 0xF000
 
         if op == 0x00E0:
-            self.display = [[0] * WIDTH for _ in range(HEIGHT)]
+            self.display = [0] * self.height
         elif op == 0x00EE:
             if self.stack:
                 self.pc = self.stack.pop()
@@ -273,7 +298,7 @@ class Chip8:
         elif hi == 0xB000:
             self.pc = (nnn + self.V[0]) & 0xFFF
         elif hi == 0xC000:
-            self.V[x] = random.randint(0, 255) & nn
+            self.V[x] = self.rng.randint(0, 255) & nn
         elif hi == 0xD000:
             self._draw(x, y, n)
         elif hi == 0xE000:
@@ -312,23 +337,21 @@ class Chip8:
             self.V[x] = (self.V[x] << 1) & 0xFF
 
     def _draw(self, x, y, n):
-        xpos = self.V[x] % WIDTH
-        ypos = self.V[y] % HEIGHT
+        xpos = self.V[x] % self.width
+        ypos = self.V[y] % self.height
         self.V[0xF] = 0
 
-        for row in range(n):
-            if ypos + row >= HEIGHT:
-                break
-            sprite_byte = self.memory[self.I + row]
-            for col in range(8):
-                if xpos + col >= WIDTH:
-                    break
-                if sprite_byte & (0x80 >> col):
-                    px = (xpos + col) % WIDTH
-                    py = (ypos + row) % HEIGHT
-                    if self.display[py][px]:
-                        self.V[0xF] = 1
-                    self.display[py][px] ^= 1
+        # Sprites clip at the right edge: bits shifted below bit 0 fall off
+        shift = self.width - 8 - xpos
+        display = self.display
+        memory = self.memory
+        for row in range(min(n, self.height - ypos)):
+            sprite_byte = memory[self.I + row]
+            bits = sprite_byte << shift if shift >= 0 else sprite_byte >> -shift
+            line = display[ypos + row]
+            if line & bits:
+                self.V[0xF] = 1
+            display[ypos + row] = line ^ bits
 
     def _misc(self, x, nn):
         if nn == 0x07:
@@ -373,6 +396,1230 @@ class Chip8:
         if self.sound_timer > 0:
             self.sound_timer -= 1
 
+    def run_cycles(self, count):
+        """Execute up to `count` instructions; returns how many actually ran."""
+        if self.paused or not self.running:
+            return 0
+        for i in range(count):
+            if self.waiting_key:
+                return i
+            self.cycle()
+        return count
+
+    def seed(self, value):
+        self.rng.seed(value)
+
+    def save_state(self):
+        """Snapshot the whole machine (not the UI pause flag) as bytes."""
+        keys = sum(1 << k for k in range(16) if self.keys[k])
+        header = STATE_HEADER.pack(
+            STATE_MAGIC, STATE_VERSION, self.width // 8, self.height,
+            self.I, self.pc, self.delay_timer, self.sound_timer,
+            self.waiting_key, self.key_reg, self.running, keys, len(self.stack))
+        row_bytes = self.width // 8
+        display = b"".join(row.to_bytes(row_bytes, "big") for row in self.display)
+        _, mt, gauss = self.rng.getstate()
+        rng = STATE_RNG.pack(*mt, gauss is not None, gauss or 0.0)
+        return b"".join((
+            header, bytes(self.V), struct.pack(f"<{len(self.stack)}H", *self.stack),
+            bytes(self.memory), display, rng))
+
+    def load_state(self, data):
+        (magic, version, row_bytes, height, self.I, self.pc, self.delay_timer,
+         self.sound_timer, waiting, self.key_reg, running, keys,
+         depth) = STATE_HEADER.unpack_from(data)
+        if magic != STATE_MAGIC or version != STATE_VERSION:
+            raise ValueError("not a Cat's CHIP-8 save state")
+        offset = STATE_HEADER.size
+        self.V = list(data[offset:offset + 16])
+        offset += 16
+        self.stack = list(struct.unpack_from(f"<{depth}H", data, offset))
+        offset += 2 * depth
+        self.memory = list(data[offset:offset + 4096])
+        offset += 4096
+        self.width = row_bytes * 8
+        self.height = height
+        self.display = [int.from_bytes(data[offset + r * row_bytes:offset + (r + 1) * row_bytes], "big")
+                        for r in range(height)]
+        offset += row_bytes * height
+        *mt, has_gauss, gauss = STATE_RNG.unpack_from(data, offset)
+        self.rng.setstate((3, tuple(mt), gauss if has_gauss else None))
+        self.waiting_key = bool(waiting)
+        self.running = bool(running)
+        self.keys = [(keys >> k) & 1 for k in range(16)]
+
+    def state_hash(self):
+        return hashlib.sha1(self.save_state()).hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FAST CORE (decode-once, threaded dispatch)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FastChip8(Chip8):
+    """Same machine as Chip8, but every 16-bit word is decoded once into a
+    (handler, x, y, n, nn, nnn) tuple cached per even address. Entries are
+    dropped only when FX33/FX55 store into the words they were decoded from."""
+
+    def reset(self):
+        super().reset()
+        self.decoded = [None] * 2048
+        self._main_ops = {
+            0x1: self._op_jp, 0x2: self._op_call, 0x3: self._op_se_nn,
+            0x4: self._op_sne_nn, 0x5: self._op_se_vy, 0x6: self._op_ld_nn,
+            0x7: self._op_add_nn, 0x9: self._op_sne_vy, 0xA: self._op_ld_i,
+            0xB: self._op_jp_v0, 0xC: self._op_rnd, 0xD: self._op_drw,
+        }
+        self._alu_ops = {
+            0x0: self._op_ld_vy, 0x1: self._op_or, 0x2: self._op_and,
+            0x3: self._op_xor, 0x4: self._op_add_vy, 0x5: self._op_sub,
+            0x6: self._op_shr, 0x7: self._op_subn, 0xE: self._op_shl,
+        }
+        self._key_ops = {0x9E: self._op_skp, 0xA1: self._op_sknp}
+        self._misc_ops = {
+            0x07: self._op_ld_dt, 0x0A: self._op_ld_key, 0x15: self._op_set_dt,
+            0x18: self._op_set_st, 0x1E: self._op_add_i, 0x29: self._op_ld_font,
+            0x33: self._op_bcd, 0x55: self._op_store, 0x65: self._op_restore,
+        }
+
+    def load_state(self, data):
+        super().load_state(data)
+        self.decoded = [None] * 2048
+
+    def decode(self, op):
+        x = (op >> 8) & 0xF
+        y = (op >> 4) & 0xF
+        n = op & 0xF
+        nn = op & 0xFF
+        nnn = op & 0xFFF
+        hi = op >> 12
+
+        if op == 0x00E0:
+            handler = self._op_cls
+        elif op == 0x00EE:
+            handler = self._op_ret
+        elif hi == 0x8:
+            handler = self._alu_ops.get(n, self._op_nop)
+        elif hi == 0xE:
+            handler = self._key_ops.get(nn, self._op_nop)
+        elif hi == 0xF:
+            handler = self._misc_ops.get(nn, self._op_nop)
+        else:
+            handler = self._main_ops.get(hi, self._op_nop)
+        return (handler, x, y, n, nn, nnn)
+
+    def invalidate(self, addr, length):
+        """Drop cached decodes overlapping memory[addr:addr + length]."""
+        decoded = self.decoded
+        for i in range(addr >> 1, min(((addr + length - 1) >> 1) + 1, 2048)):
+            decoded[i] = None
+
+    def cycle(self):
+        if self.paused or self.waiting_key or not self.running:
+            return
+        self.run_cycles(1)
+
+    def run_cycles(self, count):
+        if self.paused or not self.running:
+            return 0
+        decoded = self.decoded
+        memory = self.memory
+        decode = self.decode
+        for i in range(count):
+            if self.waiting_key:
+                return i
+            pc = self.pc
+            if pc < 0x200 or pc > 0xFFE:
+                self.pc = 0x200
+                continue
+            if pc & 1:
+                entry = decode((memory[pc] << 8) | memory[pc + 1])
+            else:
+                entry = decoded[pc >> 1]
+                if entry is None:
+                    entry = decoded[pc >> 1] = decode((memory[pc] << 8) | memory[pc + 1])
+            self.pc = pc + 2
+            handler, x, y, n, nn, nnn = entry
+            handler(x, y, n, nn, nnn)
+        return count
+
+    # -- handlers ---------------------------------------------------------------
+
+    def _op_nop(self, x, y, n, nn, nnn):
+        pass
+
+    def _op_cls(self, x, y, n, nn, nnn):
+        self.display = [0] * self.height
+
+    def _op_ret(self, x, y, n, nn, nnn):
+        if self.stack:
+            self.pc = self.stack.pop()
+
+    def _op_jp(self, x, y, n, nn, nnn):
+        self.pc = nnn
+
+    def _op_call(self, x, y, n, nn, nnn):
+        self.stack.append(self.pc)
+        self.pc = nnn
+
+    def _op_se_nn(self, x, y, n, nn, nnn):
+        if self.V[x] == nn:
+            self.pc += 2
+
+    def _op_sne_nn(self, x, y, n, nn, nnn):
+        if self.V[x] != nn:
+            self.pc += 2
+
+    def _op_se_vy(self, x, y, n, nn, nnn):
+        V = self.V
+        if V[x] == V[y]:
+            self.pc += 2
+
+    def _op_sne_vy(self, x, y, n, nn, nnn):
+        V = self.V
+        if V[x] != V[y]:
+            self.pc += 2
+
+    def _op_ld_nn(self, x, y, n, nn, nnn):
+        self.V[x] = nn
+
+    def _op_add_nn(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] = (V[x] + nn) & 0xFF
+
+    def _op_ld_vy(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] = V[y]
+
+    def _op_or(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] |= V[y]
+
+    def _op_and(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] &= V[y]
+
+    def _op_xor(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] ^= V[y]
+
+    def _op_add_vy(self, x, y, n, nn, nnn):
+        V = self.V
+        result = V[x] + V[y]
+        V[0xF] = 1 if result > 255 else 0
+        V[x] = result & 0xFF
+
+    def _op_sub(self, x, y, n, nn, nnn):
+        V = self.V
+        V[0xF] = 1 if V[x] >= V[y] else 0
+        V[x] = (V[x] - V[y]) & 0xFF
+
+    def _op_shr(self, x, y, n, nn, nnn):
+        V = self.V
+        V[0xF] = V[x] & 1
+        V[x] >>= 1
+
+    def _op_subn(self, x, y, n, nn, nnn):
+        V = self.V
+        V[0xF] = 1 if V[y] >= V[x] else 0
+        V[x] = (V[y] - V[x]) & 0xFF
+
+    def _op_shl(self, x, y, n, nn, nnn):
+        V = self.V
+        V[0xF] = (V[x] >> 7) & 1
+        V[x] = (V[x] << 1) & 0xFF
+
+    def _op_ld_i(self, x, y, n, nn, nnn):
+        self.I = nnn
+
+    def _op_jp_v0(self, x, y, n, nn, nnn):
+        self.pc = (nnn + self.V[0]) & 0xFFF
+
+    def _op_rnd(self, x, y, n, nn, nnn):
+        self.V[x] = self.rng.randint(0, 255) & nn
+
+    def _op_drw(self, x, y, n, nn, nnn):
+        self._draw(x, y, n)
+
+    def _op_skp(self, x, y, n, nn, nnn):
+        if self.keys[self.V[x] & 0xF]:
+            self.pc += 2
+
+    def _op_sknp(self, x, y, n, nn, nnn):
+        if not self.keys[self.V[x] & 0xF]:
+            self.pc += 2
+
+    def _op_ld_dt(self, x, y, n, nn, nnn):
+        self.V[x] = self.delay_timer
+
+    def _op_ld_key(self, x, y, n, nn, nnn):
+        self.waiting_key = True
+        self.key_reg = x
+
+    def _op_set_dt(self, x, y, n, nn, nnn):
+        self.delay_timer = self.V[x]
+
+    def _op_set_st(self, x, y, n, nn, nnn):
+        self.sound_timer = self.V[x]
+
+    def _op_add_i(self, x, y, n, nn, nnn):
+        self.I = (self.I + self.V[x]) & 0xFFF
+
+    def _op_ld_font(self, x, y, n, nn, nnn):
+        self.I = (self.V[x] & 0xF) * 5
+
+    def _op_bcd(self, x, y, n, nn, nnn):
+        self._misc(x, 0x33)
+        self.invalidate(self.I, 3)
+
+    def _op_store(self, x, y, n, nn, nnn):
+        self._misc(x, 0x55)
+        self.invalidate(self.I, x + 1)
+
+    def _op_restore(self, x, y, n, nn, nnn):
+        V = self.V
+        memory = self.memory
+        base = self.I
+        for i in range(x + 1):
+            V[i] = memory[base + i]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BASIC-BLOCK JIT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class JitChip8(FastChip8):
+    """Compiles straight-line runs of CHIP-8 code into Python functions.
+
+    A block starts at any PC and ends at the first jump, call, return, skip,
+    key wait or memory store, or at the next MAX_BLOCK-instruction aligned
+    address (so runs entered mid-way fall back onto the same block starts). Registers the
+    block touches live in locals and are written back at the end or before a
+    helper that needs them. Blocks are cached by start PC and dropped when
+    FX33/FX55 write over any byte they were compiled from.
+
+    Code is interpreted until HOT instructions have run from a block start
+    (each entry into the interpreter counting as VISIT more), so code that
+    runs only a few times, or keeps being rewritten, never pays for a
+    compile. A block longer than what is left of the frame budget gets a
+    second copy cut down to that budget, compiled the same way once it is
+    hot (frames tend to start at the same place with the same budget), so
+    budgets stay exact without dropping back to the interpreter.
+
+    With verify=True a plain Chip8 runs in lockstep: after every block it
+    executes the same number of instructions and V, I, pc and the display
+    are compared. Divergences are recorded and the reference is resynced."""
+
+    MAX_BLOCK = 64
+    PAGE_SHIFT = 6
+    HOT = 1000   # interpreted work from a block start before compiling it
+    VISIT = 8    # what entering the interpreter costs, in instructions
+
+    def __init__(self, seed=None, verify=False):
+        self.shadow = Chip8() if verify else None
+        self.divergences = []
+        super().__init__(seed)
+        if self.shadow is not None:
+            self.shadow.rng.setstate(self.rng.getstate())
+
+    def reset(self):
+        super().reset()
+        self._clear_blocks()
+        self.compiled_cycles = 0
+        if self.shadow is not None:
+            self.shadow.reset()
+
+    def _clear_blocks(self):
+        self.blocks = {}        # pc -> (fn, length, end)
+        self.partials = {}      # pc -> (fn, n, end) for just the first n instructions
+        self.lengths = {}       # pc -> instructions in the block starting there
+        self.spans = {}         # pc -> end address of that block's code
+        self.heat = {}          # pc -> instructions interpreted from there so far
+        self.partial_heat = {}  # pc -> the same, for runs cut short by the budget
+        self.code_pages = [set() for _ in range(4096 >> self.PAGE_SHIFT)]
+
+    def load(self, data):
+        super().load(data)
+        if self.shadow is not None:
+            self.shadow.load(data)
+
+    def seed(self, value):
+        super().seed(value)
+        if self.shadow is not None:
+            self.shadow.seed(value)
+
+    def load_state(self, data):
+        super().load_state(data)
+        self._clear_blocks()
+        if self.shadow is not None:
+            self._resync_shadow()
+
+    def key_down(self, key):
+        super().key_down(key)
+        if self.shadow is not None:
+            self.shadow.key_down(key)
+
+    def key_up(self, key):
+        super().key_up(key)
+        if self.shadow is not None:
+            self.shadow.key_up(key)
+
+    def tick_timers(self):
+        super().tick_timers()
+        if self.shadow is not None:
+            self.shadow.tick_timers()
+
+    def invalidate(self, addr, length):
+        super().invalidate(addr, length)
+        end = addr + length
+        spans = self.spans
+        pages = self.code_pages
+        shift = self.PAGE_SHIFT
+        for page in range(addr >> shift, min(((end - 1) >> shift) + 1, len(pages))):
+            for start in list(pages[page]):
+                stop = spans[start]
+                if start < end and stop > addr:
+                    # Rewritten code starts cold again
+                    self.blocks.pop(start, None)
+                    self.partials.pop(start, None)
+                    del self.lengths[start]
+                    self.heat.pop(start, None)
+                    self.partial_heat.pop(start, None)
+                    del spans[start]
+                    for p in range(start >> shift, ((stop - 1) >> shift) + 1):
+                        pages[p].discard(start)
+
+    def run_cycles(self, count):
+        if self.paused or not self.running:
+            return 0
+        blocks = self.blocks
+        lengths = self.lengths
+        shadow = self.shadow
+        interpret = FastChip8.run_cycles
+        hot = self.HOT
+        visit = self.VISIT
+        done = 0
+        while done < count:
+            if self.waiting_key:
+                return done
+            pc = self.pc
+            if pc < 0x200 or pc > 0xFFE:
+                self.pc = 0x200
+                if shadow is not None:
+                    shadow.run_cycles(1)
+                done += 1
+                continue
+            left = count - done
+            block = blocks.get(pc)
+            if block is not None:
+                length = block[1]
+            else:
+                length = lengths.get(pc) or self.block_length(pc)
+                if length <= left:
+                    heat = self.heat.get(pc, 0) + length + visit
+                    if heat < hot:
+                        self.heat[pc] = heat
+                        if shadow is None:
+                            ran = interpret(self, length)
+                        else:
+                            ran = self._interpret(length)
+                        done += ran
+                        if ran < length:
+                            return done
+                        continue
+                    block = self.compile_block(pc)
+            if length > left:
+                partial = self.partials.get(pc)
+                if partial is None or partial[1] != left:
+                    heat = self.partial_heat.get(pc, 0) + left + visit
+                    if heat < hot:
+                        self.partial_heat[pc] = heat
+                        return done + self._interpret(left)
+                    self.partial_heat[pc] = 0
+                    partial = self.compile_block(pc, left)
+                partial[0](self)
+                length = left
+            else:
+                block[0](self)
+            if shadow is not None:
+                shadow.run_cycles(length)
+                self._check_shadow(pc, length)
+            done += length
+            self.compiled_cycles += length
+        return done
+
+    def _interpret(self, count):
+        if self.shadow is None:
+            return FastChip8.run_cycles(self, count)
+        pc = self.pc
+        ran = FastChip8.run_cycles(self, count)
+        self.shadow.run_cycles(ran)
+        self._check_shadow(pc, ran)
+        return ran
+
+    def _check_shadow(self, pc, length):
+        ref = self.shadow
+        diffs = []
+        if self.V != ref.V:
+            diffs.append(f"V jit={self.V} ref={ref.V}")
+        if self.I != ref.I:
+            diffs.append(f"I jit={self.I:03X} ref={ref.I:03X}")
+        if self.pc != ref.pc:
+            diffs.append(f"pc jit={self.pc:03X} ref={ref.pc:03X}")
+        if self.display != ref.display:
+            diffs.append("display differs")
+        if not diffs:
+            return
+        report = f"block {pc:03X} (+{length}): " + "; ".join(diffs)
+        self.divergences.append(report)
+        print(f"[JIT VERIFY] {report}")
+        self._resync_shadow()
+
+    def _resync_shadow(self):
+        ref = self.shadow
+        ref.memory = list(self.memory)
+        ref.V = list(self.V)
+        ref.I = self.I
+        ref.pc = self.pc
+        ref.stack = list(self.stack)
+        ref.display = list(self.display)
+        ref.keys = list(self.keys)
+        ref.delay_timer = self.delay_timer
+        ref.sound_timer = self.sound_timer
+        ref.waiting_key = self.waiting_key
+        ref.key_reg = self.key_reg
+        ref.running = self.running
+        ref.rng.setstate(self.rng.getstate())
+
+    # -- block compiler ---------------------------------------------------------
+
+    @staticmethod
+    def ends_block(op):
+        """True for the opcodes compile_block ends a block on"""
+        hi = op >> 12
+        nn = op & 0xFF
+        return (op == 0x00EE or hi in (0x1, 0x2, 0x3, 0x4, 0x5, 0x9, 0xB)
+                or (hi == 0xE and nn in (0x9E, 0xA1))
+                or (hi == 0xF and nn in (0x0A, 0x33, 0x55)))
+
+    def block_length(self, start):
+        """Instructions in the block at start, found without compiling it"""
+        length = self.lengths.get(start)
+        if length is None:
+            memory = self.memory
+            pc = start
+            length = 0
+            while True:
+                length += 1
+                nxt = pc + 2
+                if (self.ends_block((memory[pc] << 8) | memory[pc + 1])
+                        or nxt % (2 * self.MAX_BLOCK) == 0 or nxt > 0xFFE):
+                    break
+                pc = nxt
+            self.lengths[start] = length
+            end = start + 2 * length
+            self.spans[start] = end
+            for page in range(start >> self.PAGE_SHIFT, ((end - 1) >> self.PAGE_SHIFT) + 1):
+                self.code_pages[page].add(start)
+        return length
+
+    def compile_block(self, start, limit=None):
+        """Compile and cache the block at start; with a limit, a copy of
+        just its first limit instructions, cached in partials"""
+        memory = self.memory
+        body = []
+        used = set()
+        dirty = set()
+        state = {"i_used": False, "i_dirty": False}
+
+        def reg(r):
+            used.add(r)
+            return f"v{r:x}"
+
+        def flush():
+            for r in sorted(dirty):
+                body.append(f"V[{r}] = v{r:x}")
+            dirty.clear()
+            if state["i_dirty"]:
+                body.append("self.I = i_reg")
+                state["i_dirty"] = False
+
+        def set_i(expr):
+            state["i_used"] = True
+            state["i_dirty"] = True
+            body.append(f"i_reg = {expr}")
+
+        pc = start
+        length = 0
+        tail = None
+        while tail is None:
+            op = (memory[pc] << 8) | memory[pc + 1]
+            x = (op >> 8) & 0xF
+            y = (op >> 4) & 0xF
+            n = op & 0xF
+            nn = op & 0xFF
+            nnn = op & 0xFFF
+            hi = op >> 12
+            nxt = pc + 2
+            length += 1
+
+            if op == 0x00E0:
+                body.append("self.display = [0] * self.height")
+            elif op == 0x00EE:
+                tail = [f"self.pc = self.stack.pop() if self.stack else {nxt}"]
+            elif hi == 0x1:
+                tail = [f"self.pc = {nnn}"]
+            elif hi == 0x2:
+                tail = [f"self.stack.append({nxt})", f"self.pc = {nnn}"]
+            elif hi == 0x3:
+                tail = [f"self.pc = {nxt + 2} if {reg(x)} == {nn} else {nxt}"]
+            elif hi == 0x4:
+                tail = [f"self.pc = {nxt + 2} if {reg(x)} != {nn} else {nxt}"]
+            elif hi == 0x5:
+                tail = [f"self.pc = {nxt + 2} if {reg(x)} == {reg(y)} else {nxt}"]
+            elif hi == 0x6:
+                body.append(f"{reg(x)} = {nn}")
+                dirty.add(x)
+            elif hi == 0x7:
+                body.append(f"{reg(x)} = ({reg(x)} + {nn}) & 0xFF")
+                dirty.add(x)
+            elif hi == 0x8:
+                vx, vy, vf = reg(x), reg(y), reg(0xF)
+                if n == 0x0:
+                    body.append(f"{vx} = {vy}")
+                elif n == 0x1:
+                    body.append(f"{vx} |= {vy}")
+                elif n == 0x2:
+                    body.append(f"{vx} &= {vy}")
+                elif n == 0x3:
+                    body.append(f"{vx} ^= {vy}")
+                elif n == 0x4:
+                    body += [f"t = {vx} + {vy}", f"{vf} = 1 if t > 255 else 0", f"{vx} = t & 0xFF"]
+                elif n == 0x5:
+                    body += [f"{vf} = 1 if {vx} >= {vy} else 0", f"{vx} = ({vx} - {vy}) & 0xFF"]
+                elif n == 0x6:
+                    body += [f"{vf} = {vx} & 1", f"{vx} >>= 1"]
+                elif n == 0x7:
+                    body += [f"{vf} = 1 if {vy} >= {vx} else 0", f"{vx} = ({vy} - {vx}) & 0xFF"]
+                elif n == 0xE:
+                    body += [f"{vf} = ({vx} >> 7) & 1", f"{vx} = ({vx} << 1) & 0xFF"]
+                if n in (0x4, 0x5, 0x6, 0x7, 0xE):
+                    dirty.add(0xF)
+                if n in (0x0, 0x1, 0x2, 0x3, 0x4, 0x5, 0x6, 0x7, 0xE):
+                    dirty.add(x)
+            elif hi == 0x9:
+                tail = [f"self.pc = {nxt + 2} if {reg(x)} != {reg(y)} else {nxt}"]
+            elif hi == 0xA:
+                set_i(nnn)
+            elif hi == 0xB:
+                tail = [f"self.pc = ({nnn} + {reg(0)}) & 0xFFF"]
+            elif hi == 0xC:
+                body.append(f"{reg(x)} = self.rng.randint(0, 255) & {nn}")
+                dirty.add(x)
+            elif hi == 0xD:
+                used.update((x, y, 0xF))
+                flush()
+                body.append(f"self._draw({x}, {y}, {n})")
+                body.append("vf = V[15]")
+            elif hi == 0xE:
+                if nn == 0x9E:
+                    tail = [f"self.pc = {nxt + 2} if self.keys[{reg(x)} & 0xF] else {nxt}"]
+                elif nn == 0xA1:
+                    tail = [f"self.pc = {nxt} if self.keys[{reg(x)} & 0xF] else {nxt + 2}"]
+            elif hi == 0xF:
+                if nn == 0x07:
+                    body.append(f"{reg(x)} = self.delay_timer")
+                    dirty.add(x)
+                elif nn == 0x0A:
+                    tail = ["self.waiting_key = True", f"self.key_reg = {x}", f"self.pc = {nxt}"]
+                elif nn == 0x15:
+                    body.append(f"self.delay_timer = {reg(x)}")
+                elif nn == 0x18:
+                    body.append(f"self.sound_timer = {reg(x)}")
+                elif nn == 0x1E:
+                    set_i(f"(i_reg + {reg(x)}) & 0xFFF")
+                elif nn == 0x29:
+                    set_i(f"({reg(x)} & 0xF) * 5")
+                elif nn == 0x33:
+                    # Stores end the block: they may rewrite code we compiled
+                    tail = [f"self._op_bcd({x}, 0, 0, 0, 0)", f"self.pc = {nxt}"]
+                elif nn == 0x55:
+                    tail = [f"self._op_store({x}, 0, 0, 0, 0)", f"self.pc = {nxt}"]
+                elif nn == 0x65:
+                    flush()
+                    body.append(f"self._op_restore({x}, 0, 0, 0, 0)")
+                    for r in range(x + 1):
+                        body.append(f"{reg(r)} = V[{r}]")
+
+            if tail is None and (nxt % (2 * self.MAX_BLOCK) == 0 or nxt > 0xFFE
+                                 or length == limit):
+                tail = [f"self.pc = {nxt}"]
+            pc = nxt
+
+        flush()
+        body += tail
+
+        prologue = ["V = self.V"] + [f"v{r:x} = V[{r}]" for r in sorted(used)]
+        if state["i_used"]:
+            prologue.append("i_reg = self.I")
+        src = "def block(self):\n    " + "\n    ".join(prologue + body) + "\n"
+        namespace = {}
+        exec(compile(src, f"<chip8 block {start:03X}>", "exec"), namespace)
+
+        block = (namespace["block"], length, start + 2 * length)
+        if limit is None:
+            self.blocks[start] = block
+        else:
+            self.partials[start] = block
+        return block
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REWIND & INPUT MOVIES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _xor_bytes(a, b):
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+class RewindBuffer:
+    """Ring of per-frame save states covering the last `seconds` of play.
+
+    Every `keyframe_interval` frames a full (zlib) snapshot is stored; the
+    frames in between only keep the zlib-compressed XOR against that
+    keyframe, which is almost all zeros, so a minute stays in the low MB."""
+
+    def __init__(self, seconds=60, fps=60, keyframe_interval=60):
+        self.entries = deque(maxlen=seconds * fps)
+        self.keyframe_interval = keyframe_interval
+        self._key_raw = None
+        self._key_packed = None
+        self._since_key = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self._key_raw = None
+        self._since_key = 0
+
+    def push(self, frame, state):
+        if (self._key_raw is None or self._since_key >= self.keyframe_interval
+                or len(state) != len(self._key_raw)):
+            self._key_raw = state
+            self._key_packed = zlib.compress(state, 1)
+            self._since_key = 0
+            self.entries.append((frame, self._key_packed, None))
+        else:
+            delta = zlib.compress(_xor_bytes(state, self._key_raw), 1)
+            self.entries.append((frame, self._key_packed, delta))
+        self._since_key += 1
+
+    def step_back(self):
+        """Drop the newest snapshot; return the one before it as (frame, state)."""
+        if not self.entries:
+            return None
+        if len(self.entries) > 1:
+            self.entries.pop()
+        # The next push starts a fresh keyframe from the restored state
+        self._key_raw = None
+        frame, key_packed, delta = self.entries[-1]
+        state = zlib.decompress(key_packed)
+        if delta is not None:
+            state = _xor_bytes(state, zlib.decompress(delta))
+        return frame, state
+
+    def memory_usage(self):
+        keyframes = {id(key): len(key) for _, key, _ in self.entries}
+        return sum(keyframes.values()) + sum(len(d) for _, _, d in self.entries if d)
+
+
+MOVIE_CHECK_INTERVAL = 60
+
+
+def new_movie(rom_key, seed, speed):
+    """Input log: (frame, kind, value) events where kind is "down", "up" or
+    "speed", plus a state hash every MOVIE_CHECK_INTERVAL frames."""
+    return {"rom": rom_key, "seed": seed, "speed": speed,
+            "events": [], "checks": [], "frames": 0}
+
+
+def save_movie(movie, path):
+    with open(path, "w") as f:
+        json.dump(movie, f)
+
+
+def load_movie(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def verify_movie(movie, core=Chip8):
+    """Replay a movie headless; return the first frame whose state hash
+    differs from the recording, or None if it reproduces bit-for-bit."""
+    chip = core(movie["seed"])
+    chip.load(ROMS[movie["rom"]]["data"])
+    speed = movie["speed"]
+    events = {}
+    for frame, kind, value in movie["events"]:
+        events.setdefault(frame, []).append((kind, value))
+    checks = dict(movie["checks"])
+    for frame in range(movie["frames"]):
+        for kind, value in events.get(frame, ()):
+            if kind == "speed":
+                speed = value
+            elif kind == "down":
+                chip.key_down(value)
+            else:
+                chip.key_up(value)
+        chip.run_cycles(speed)
+        chip.tick_timers()
+        expected = checks.get(frame + 1)
+        if expected is not None and chip.state_hash() != expected:
+            return frame + 1
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HEADLESS BATCH RUNNER (NumPy, K machines in lockstep)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+
+
+def frame_hash(rows):
+    """FNV-1a over a Chip8.display (one 64-bit word per row). Chip8Batch
+    produces the same value for the same picture."""
+    h = FNV_OFFSET
+    for row in rows:
+        h = ((h ^ row) * FNV_PRIME) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+
+class Chip8Batch:
+    """Steps K independent CHIP-8 machines at once.
+
+    Memory, registers, stacks, timers and framebuffers are NumPy arrays with
+    the machine index first, so one Python-level step() executes one
+    instruction on every machine that is not blocked on FX0A. Semantics
+    follow Chip8 with two exceptions: CXNN draws from a NumPy generator
+    seeded per batch, and the call stack is STACK_DEPTH deep (deeper calls
+    overwrite the top entry)."""
+
+    STACK_DEPTH = 16
+
+    def __init__(self, roms, seed=0):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Chip8Batch requires numpy")
+        k = len(roms)
+        self.count = k
+        self.memory = np.zeros((k, 4096), np.uint8)
+        self.memory[:, :len(FONTSET)] = FONTSET
+        for i, rom in enumerate(roms):
+            data = np.frombuffer(bytes(rom[:4096 - 0x200]), np.uint8)
+            self.memory[i, 0x200:0x200 + len(data)] = data
+        self.V = np.zeros((k, 16), np.int32)
+        self.I = np.zeros(k, np.int32)
+        self.pc = np.full(k, 0x200, np.int32)
+        self.stack = np.zeros((k, self.STACK_DEPTH), np.int32)
+        self.sp = np.zeros(k, np.int32)
+        self.display = np.zeros((k, HEIGHT, WIDTH), np.uint8)
+        self.keys = np.zeros((k, 16), bool)
+        self.delay_timer = np.zeros(k, np.int32)
+        self.sound_timer = np.zeros(k, np.int32)
+        self.waiting_key = np.zeros(k, bool)
+        self.key_reg = np.zeros(k, np.int32)
+        self.rng = np.random.default_rng(seed)
+        self.frame = 0
+        self._groups = [
+            self._op_0, self._op_jp, self._op_call, self._op_se_nn,
+            self._op_sne_nn, self._op_se_vy, self._op_ld_nn, self._op_add_nn,
+            self._op_alu, self._op_sne_vy, self._op_ld_i, self._op_jp_v0,
+            self._op_rnd, self._op_drw, self._op_key, self._op_misc,
+        ]
+
+    def key_down(self, machine, key):
+        if 0 <= key <= 15:
+            self.keys[machine, key] = True
+            if self.waiting_key[machine]:
+                self.V[machine, self.key_reg[machine]] = key
+                self.waiting_key[machine] = False
+
+    def key_up(self, machine, key):
+        if 0 <= key <= 15:
+            self.keys[machine, key] = False
+
+    def tick_timers(self):
+        np.subtract(self.delay_timer, 1, out=self.delay_timer, where=self.delay_timer > 0)
+        np.subtract(self.sound_timer, 1, out=self.sound_timer, where=self.sound_timer > 0)
+
+    def frame_hashes(self):
+        words = np.packbits(self.display, axis=2).view(">u8")[..., 0].astype(np.uint64)
+        h = np.full(self.count, FNV_OFFSET, np.uint64)
+        prime = np.uint64(FNV_PRIME)
+        for row in range(words.shape[1]):
+            h ^= words[:, row]
+            h *= prime
+        return h
+
+    def step(self):
+        """Execute one instruction on every runnable machine; returns how many ran."""
+        live = np.flatnonzero(~self.waiting_key)
+        if not live.size:
+            return 0
+        pc = self.pc[live]
+        wrap = (pc < 0x200) | (pc > 0xFFE)
+        ran = live.size
+        if wrap.any():
+            self.pc[live[wrap]] = 0x200
+            live = live[~wrap]
+            pc = pc[~wrap]
+        op = (self.memory[live, pc].astype(np.int32) << 8) | self.memory[live, pc + 1]
+        self.pc[live] = pc + 2
+        hi = op >> 12
+        for group in np.unique(hi):
+            sel = hi == group
+            self._groups[group](live[sel], op[sel])
+        return ran
+
+    def run(self, frames, cycles_per_frame=10, timelines=None):
+        """Run `frames` frames and return a (frames, K) array of frame hashes.
+
+        `timelines` holds one list per machine of (frame, key, pressed)
+        events, applied at the start of that frame like key_down/key_up."""
+        events = {}
+        for machine, timeline in enumerate(timelines or ()):
+            for frame, key, pressed in timeline:
+                events.setdefault(frame, []).append((machine, key, pressed))
+
+        hashes = np.empty((frames, self.count), np.uint64)
+        for f in range(frames):
+            for machine, key, pressed in events.get(self.frame, ()):
+                if pressed:
+                    self.key_down(machine, key)
+                else:
+                    self.key_up(machine, key)
+            for _ in range(cycles_per_frame):
+                self.step()
+            self.tick_timers()
+            hashes[f] = self.frame_hashes()
+            self.frame += 1
+        return hashes
+
+    # -- opcode groups (m = machine indices, op = their opcodes) ---------------
+
+    def _op_0(self, m, op):
+        self.display[m[op == 0x00E0]] = 0
+        ret = m[op == 0x00EE]
+        ret = ret[self.sp[ret] > 0]
+        self.sp[ret] -= 1
+        self.pc[ret] = self.stack[ret, self.sp[ret]]
+
+    def _op_jp(self, m, op):
+        self.pc[m] = op & 0xFFF
+
+    def _op_call(self, m, op):
+        sp = self.sp[m]
+        self.stack[m, np.minimum(sp, self.STACK_DEPTH - 1)] = self.pc[m]
+        self.sp[m] = np.minimum(sp + 1, self.STACK_DEPTH)
+        self.pc[m] = op & 0xFFF
+
+    def _op_se_nn(self, m, op):
+        self.pc[m[self.V[m, (op >> 8) & 0xF] == (op & 0xFF)]] += 2
+
+    def _op_sne_nn(self, m, op):
+        self.pc[m[self.V[m, (op >> 8) & 0xF] != (op & 0xFF)]] += 2
+
+    def _op_se_vy(self, m, op):
+        self.pc[m[self.V[m, (op >> 8) & 0xF] == self.V[m, (op >> 4) & 0xF]]] += 2
+
+    def _op_sne_vy(self, m, op):
+        self.pc[m[self.V[m, (op >> 8) & 0xF] != self.V[m, (op >> 4) & 0xF]]] += 2
+
+    def _op_ld_nn(self, m, op):
+        self.V[m, (op >> 8) & 0xF] = op & 0xFF
+
+    def _op_add_nn(self, m, op):
+        x = (op >> 8) & 0xF
+        self.V[m, x] = (self.V[m, x] + (op & 0xFF)) & 0xFF
+
+    def _op_alu(self, m, op):
+        V = self.V
+        n = op & 0xF
+        for sub in np.unique(n):
+            sel = n == sub
+            mm = m[sel]
+            x = (op[sel] >> 8) & 0xF
+            y = (op[sel] >> 4) & 0xF
+            vx, vy = V[mm, x], V[mm, y]
+            # VF is written first, then Vx is recomputed from the registers,
+            # matching Chip8._alu when x or y is F
+            if sub == 0x0:
+                V[mm, x] = vy
+            elif sub == 0x1:
+                V[mm, x] = vx | vy
+            elif sub == 0x2:
+                V[mm, x] = vx & vy
+            elif sub == 0x3:
+                V[mm, x] = vx ^ vy
+            elif sub == 0x4:
+                V[mm, 0xF] = vx + vy > 255
+                V[mm, x] = (vx + vy) & 0xFF
+            elif sub == 0x5:
+                V[mm, 0xF] = vx >= vy
+                V[mm, x] = (V[mm, x] - V[mm, y]) & 0xFF
+            elif sub == 0x6:
+                V[mm, 0xF] = vx & 1
+                V[mm, x] = V[mm, x] >> 1
+            elif sub == 0x7:
+                V[mm, 0xF] = vy >= vx
+                V[mm, x] = (V[mm, y] - V[mm, x]) & 0xFF
+            elif sub == 0xE:
+                V[mm, 0xF] = (vx >> 7) & 1
+                V[mm, x] = (V[mm, x] << 1) & 0xFF
+
+    def _op_ld_i(self, m, op):
+        self.I[m] = op & 0xFFF
+
+    def _op_jp_v0(self, m, op):
+        self.pc[m] = ((op & 0xFFF) + self.V[m, 0]) & 0xFFF
+
+    def _op_rnd(self, m, op):
+        self.V[m, (op >> 8) & 0xF] = self.rng.integers(0, 256, m.size) & (op & 0xFF)
+
+    def _op_drw(self, m, op):
+        x = (op >> 8) & 0xF
+        y = (op >> 4) & 0xF
+        n = op & 0xF
+        xpos = self.V[m, x] % WIDTH
+        ypos = self.V[m, y] % HEIGHT
+        self.V[m, 0xF] = 0
+
+        rows = np.arange(16)
+        live_rows = (rows < n[:, None]) & (ypos[:, None] + rows < HEIGHT)
+        addr = np.minimum(self.I[m, None] + rows, 4095)
+        sprite = np.where(live_rows, self.memory[m[:, None], addr], 0).astype(np.uint8)
+        bits = np.unpackbits(sprite[..., None], axis=2).astype(bool)
+        bits &= xpos[:, None, None] + np.arange(8) < WIDTH
+
+        mi, ri, ci = np.nonzero(bits)
+        machines = m[mi]
+        py = ypos[mi] + ri
+        px = xpos[mi] + ci
+        old = self.display[machines, py, px]
+        self.display[machines, py, px] = old ^ 1
+        self.V[np.unique(machines[old == 1]), 0xF] = 1
+
+    def _op_key(self, m, op):
+        nn = op & 0xFF
+        pressed = self.keys[m, self.V[m, (op >> 8) & 0xF] & 0xF]
+        skip = ((nn == 0x9E) & pressed) | ((nn == 0xA1) & ~pressed)
+        self.pc[m[skip]] += 2
+
+    def _op_misc(self, m, op):
+        V = self.V
+        nn = op & 0xFF
+        x = (op >> 8) & 0xF
+        for sub in np.unique(nn):
+            sel = nn == sub
+            mm, xx = m[sel], x[sel]
+            if sub == 0x07:
+                V[mm, xx] = self.delay_timer[mm]
+            elif sub == 0x0A:
+                self.waiting_key[mm] = True
+                self.key_reg[mm] = xx
+            elif sub == 0x15:
+                self.delay_timer[mm] = V[mm, xx]
+            elif sub == 0x18:
+                self.sound_timer[mm] = V[mm, xx]
+            elif sub == 0x1E:
+                self.I[mm] = (self.I[mm] + V[mm, xx]) & 0xFFF
+            elif sub == 0x29:
+                self.I[mm] = (V[mm, xx] & 0xF) * 5
+            elif sub == 0x33:
+                val = V[mm, xx]
+                base = self.I[mm]
+                for offset, digit in enumerate((val // 100, (val // 10) % 10, val % 10)):
+                    ok = base + offset < 4096
+                    self.memory[mm[ok], base[ok] + offset] = digit[ok]
+            elif sub in (0x55, 0x65):
+                regs = np.arange(16)
+                base = self.I[mm]
+                mask = (regs <= xx[:, None]) & (base[:, None] + regs < 4096)
+                si, ri = np.nonzero(mask)
+                if sub == 0x55:
+                    self.memory[mm[si], base[si] + ri] = V[mm[si], ri]
+                else:
+                    V[mm[si], ri] = self.memory[mm[si], base[si] + ri]
+
+
+# Below this many machines a job steps scalar Chip8 cores instead: a
+# lockstep Chip8Batch pays NumPy dispatch per opcode group per instruction,
+# which only amortizes over a few hundred machines (see --batch).
+BATCH_CROSSOVER = 256
+
+
+def _run_batch_job(job):
+    roms, timelines, frames, cycles_per_frame, seed = job
+    return Chip8Batch(roms, seed=seed).run(frames, cycles_per_frame, timelines)
+
+
+def _run_scalar_job(job):
+    """Same job and (frames, K) result as _run_batch_job, one Chip8 at a time"""
+    roms, timelines, frames, cycles_per_frame, seed = job
+    hashes = np.empty((frames, len(roms)), np.uint64)
+    for machine, rom in enumerate(roms):
+        chip = Chip8(seed=seed + machine)
+        chip.load(rom)
+        events = {}
+        for frame, key, pressed in timelines[machine] if timelines else ():
+            events.setdefault(frame, []).append((key, pressed))
+        for f in range(frames):
+            for key, pressed in events.get(f, ()):
+                if pressed:
+                    chip.key_down(key)
+                else:
+                    chip.key_up(key)
+            chip.run_cycles(cycles_per_frame)
+            chip.tick_timers()
+            hashes[f, machine] = frame_hash(chip.display)
+    return hashes
+
+
+def batch_sweep(roms, timelines=None, frames=600, cycles_per_frame=10,
+                batch_size=256, processes=None, seed=0, crossover=BATCH_CROSSOVER):
+    """Run every ROM (with its optional key timeline) headless and return a
+    (len(roms), frames) array of frame hashes. ROMs are split into jobs of
+    `batch_size` machines spread over a process pool; a job with at least
+    `crossover` machines runs as one Chip8Batch, a smaller one steps scalar
+    Chip8 cores. The two paths agree except on ROMs that use CXNN."""
+    import multiprocessing
+
+    timelines = list(timelines) if timelines is not None else [[] for _ in roms]
+    jobs = [(roms[i:i + batch_size], timelines[i:i + batch_size], frames, cycles_per_frame, seed + i)
+            for i in range(0, len(roms), batch_size)]
+    with multiprocessing.Pool(processes) as pool:
+        results = [pool.apply_async(_run_batch_job if len(job[0]) >= crossover else _run_scalar_job, (job,))
+                   for job in jobs]
+        results = [r.get() for r in results]
+    return np.concatenate([r.T for r in results])
+
+
+def batch_crossover(sizes=(16, 64, 256, 1024), frames=100, cycles_per_frame=10):
+    """Time one job of K machines through Chip8Batch and through scalar Chip8
+    cores in this process, and return the smallest K where the batch wins."""
+    import time
+
+    data = [ROMS[key]["data"] for key in ROMS]
+    print(f"Chip8Batch vs scalar Chip8, single process, {frames} frames x {cycles_per_frame} cycles:")
+    print(f"{'K':>6}{'scalar ips':>14}{'batch ips':>14}{'batch/scalar':>14}")
+    crossover = None
+    for k in sizes:
+        job = ([data[i % len(data)] for i in range(k)], None, frames, cycles_per_frame, 0)
+        rates = []
+        for run in (_run_scalar_job, _run_batch_job):
+            start = time.perf_counter()
+            run(job)
+            rates.append(k * frames * cycles_per_frame / (time.perf_counter() - start))
+        print(f"{k:>6}{rates[0]:>14,.0f}{rates[1]:>14,.0f}{rates[1] / rates[0]:>13.2f}x")
+        if crossover is None and rates[1] > rates[0]:
+            crossover = k
+    print(f"  batch wins from K={crossover}" if crossover else "  scalar wins at every K tried")
+    print(f"  batch_sweep switches to Chip8Batch at K={BATCH_CROSSOVER}")
+    return crossover
+
+
+def batch_benchmark(copies=64, frames=300, cycles_per_frame=10, seed=1234):
+    """Report the scalar-vs-batch crossover, then sweep every embedded ROM
+    `copies` times with random key timelines and report
+    machine-instructions/second. The first copy of each ROM runs
+    without input and is checked against Chip8; ROMs that use CXNN differ
+    because the batch has its own random generator."""
+    import time
+
+    rng = random.Random(seed)
+    keys = list(ROMS)
+    roms, timelines = [], []
+    for key in keys:
+        for copy in range(copies):
+            timeline = []
+            if copy:
+                for frame in sorted(rng.sample(range(frames), 20)):
+                    k = rng.randrange(16)
+                    timeline += [(frame, k, True), (min(frame + 5, frames - 1), k, False)]
+            roms.append(ROMS[key]["data"])
+            timelines.append(timeline)
+
+    batch_crossover()
+    start = time.perf_counter()
+    hashes = batch_sweep(roms, timelines, frames, cycles_per_frame, seed=seed)
+    elapsed = time.perf_counter() - start
+    total = len(roms) * frames * cycles_per_frame
+    print(f"Sweep: {len(roms)} machines x {frames} frames on {os.cpu_count()} processes in {elapsed:.2f}s "
+          f"({total / elapsed:,.0f} machine-instructions/s)")
+
+    for i, key in enumerate(keys):
+        chip = Chip8()
+        chip.load(ROMS[key]["data"])
+        ref = []
+        for _ in range(frames):
+            chip.run_cycles(cycles_per_frame)
+            chip.tick_timers()
+            ref.append(frame_hash(chip.display))
+        match = all(int(h) == r for h, r in zip(hashes[i * copies], ref))
+        print(f"  {key:<16}{'matches Chip8' if match else 'differs from Chip8'}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HEADLESS BENCHMARK
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def benchmark(million_cycles=1.0, frame_sizes=(10, 1000), seed=1234):
+    """Run every embedded ROM on all three cores and print instructions/second.
+
+    Frames are emulated as `cycles_per_frame` instructions plus one timer
+    tick, once at the GUI's default speed (10) and once at 1000; a blocked
+    FX0A is released by tapping key 5 at the frame edge, and only
+    instructions that actually executed are counted. The speedups are each
+    core against Chip8, and "compiled" is the share of JitChip8's
+    instructions that ran in compiled blocks rather than its interpreter.
+    All cores share the RNG seed, so their final state must agree."""
+    import time
+
+    total = int(million_cycles * 1_000_000)
+    for cycles_per_frame in frame_sizes:
+        frames = max(1, total // cycles_per_frame)
+        print(f"CHIP-8 core benchmark: {frames * cycles_per_frame:,} cycle budget per ROM, "
+              f"{cycles_per_frame} cycles/frame")
+        print(f"{'ROM':<16}{'Chip8 ips':>12}{'FastChip8 ips':>15}{'JitChip8 ips':>14}"
+              f"{'fast':>8}{'jit':>8}{'compiled':>10}")
+
+        for key, rom in ROMS.items():
+            results = []
+            for core in (Chip8, FastChip8, JitChip8):
+                chip = core(seed)
+                chip.load(rom["data"])
+                executed = 0
+                start = time.perf_counter()
+                for _ in range(frames):
+                    executed += chip.run_cycles(cycles_per_frame)
+                    chip.tick_timers()
+                    if chip.waiting_key:
+                        chip.key_down(0x5)
+                        chip.key_up(0x5)
+                elapsed = time.perf_counter() - start
+                results.append((executed / elapsed,
+                                (chip.pc, chip.I, list(chip.V), list(chip.display))))
+            compiled = chip.compiled_cycles / max(executed, 1)
+
+            (slow_ips, slow_state), (fast_ips, fast_state), (jit_ips, jit_state) = results
+            status = "" if slow_state == fast_state == jit_state else "  STATE MISMATCH"
+            print(f"{key:<16}{slow_ips:>12,.0f}{fast_ips:>15,.0f}{jit_ips:>14,.0f}"
+                  f"{fast_ips / slow_ips:>7.2f}x{jit_ips / slow_ips:>7.2f}x{compiled:>10.0%}{status}")
+        print()
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # GUI COMPONENTS
@@ -386,6 +1633,38 @@ class Menu:
         self.hover_idx = -1
 
 
+class DisplayPresenter:
+    """Scaled copy of the CHIP-8 framebuffer that only repaints the rows whose
+    bitmask changed since the last present."""
+
+    def __init__(self):
+        self.surface = None
+        self.scale = 0
+        self.rows = []
+
+    def present(self, screen, chip, dx, dy, scale):
+        width, height = chip.width, chip.height
+        size = (width * scale, height * scale)
+        if self.surface is None or self.scale != scale or self.surface.get_size() != size:
+            self.surface = pygame.Surface(size)
+            self.scale = scale
+            self.rows = [None] * height
+
+        surface = self.surface
+        cell = scale - 1
+        for row, bits in enumerate(chip.display):
+            if bits == self.rows[row]:
+                continue
+            self.rows[row] = bits
+            y = row * scale
+            surface.fill(P64.BG, (0, y, size[0], scale))
+            for col in range(width):
+                lit = (bits >> (width - 1 - col)) & 1
+                surface.fill(P64.PIXEL_ON if lit else P64.PIXEL_OFF, (col * scale, y, cell, cell))
+
+        screen.blit(surface, (dx, dy))
+
+
 class RomList:
     def __init__(self, roms):
         self.roms = list(roms.items())
@@ -399,7 +1678,7 @@ class RomList:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 class CatChip8:
-    def __init__(self):
+    def __init__(self, fast_core=False, jit=False, jit_verify=False):
         pygame.init()
         pygame.mixer.init(frequency=44100, size=-16, channels=1, buffer=512)
 
@@ -409,7 +1688,23 @@ class CatChip8:
         pygame.display.set_caption("Cat's CHIP-8 - SAMSOFT RTX ! ON")
 
         self.clock = pygame.time.Clock()
-        self.chip8 = Chip8()
+        if jit or jit_verify:
+            self.chip8 = JitChip8(verify=jit_verify)
+        elif fast_core:
+            self.chip8 = FastChip8()
+        else:
+            self.chip8 = Chip8()
+
+        # Save states, rewind and input movies
+        self.frame = 0
+        self.rewind = RewindBuffer()
+        self.rewinding = False
+        self.quick_state = None
+        self.recording = None
+        self.replay = None
+        self.replay_events = {}
+        self.replay_checks = {}
+        self.status_msg = ""
 
         # Fonts
         self.font = pygame.font.SysFont("Consolas", 14)
@@ -427,8 +1722,9 @@ class CatChip8:
 
         # Menus
         self.menus = [
-            Menu("File", ["Open ROM...", "─", "Reset", "─", "Exit"]),
-            Menu("System", ["Pause/Resume", "Stop", "─", "Speed: Normal", "Speed: Fast", "Speed: Turbo"]),
+            Menu("File", ["Open ROM...", "─", "Save State (F5)", "Load State (F7)", "─", "Reset", "─", "Exit"]),
+            Menu("System", ["Pause/Resume", "Stop", "─", "Speed: Normal", "Speed: Fast", "Speed: Turbo",
+                            "─", "Record Input (F9)", "Replay Input (F10)"]),
             Menu("Options", ["Display Scale: 8x", "Display Scale: 10x", "Display Scale: 12x", "─", "Sound On/Off"]),
             Menu("Help", ["Controls", "─", "About Cat's CHIP-8"])
         ]
@@ -436,6 +1732,7 @@ class CatChip8:
 
         # Display settings
         self.pixel_scale = 10
+        self.presenter = DisplayPresenter()
         self.sound_on = True
         self.speed = 10  # cycles per frame
 
@@ -478,11 +1775,9 @@ class CatChip8:
 
     def run(self):
         running = True
-        timer_acc = 0
 
         while running:
-            dt = self.clock.tick(60)
-            timer_acc += dt
+            self.clock.tick(60)
 
             # Handle events
             for event in pygame.event.get():
@@ -501,15 +1796,12 @@ class CatChip8:
                 elif event.type == pygame.JOYBUTTONUP:
                     self._handle_joy_button(event, False)
 
-            # Run emulator cycles
-            if self.chip8.running and not self.chip8.paused:
-                for _ in range(self.speed):
-                    self.chip8.cycle()
-
-            # Timer at 60Hz
-            if timer_acc >= 16:
-                timer_acc = 0
-                self.chip8.tick_timers()
+            # One emulated frame per display frame, timers included, so
+            # recorded input replays identically
+            if self.rewinding:
+                self._rewind_frame()
+            elif self.chip8.running and not self.chip8.paused:
+                self._emulate_frame()
                 if self.chip8.sound_timer > 0 and self.sound_on:
                     self.beep.play()
 
@@ -520,9 +1812,142 @@ class CatChip8:
         pygame.quit()
         sys.exit()
 
+    def _emulate_frame(self):
+        chip = self.chip8
+        if self.replay is not None:
+            for kind, value in self.replay_events.get(self.frame, ()):
+                self._apply_input(kind, value)
+        chip.run_cycles(self.speed)
+        chip.tick_timers()
+        self.frame += 1
+        if self.recording is not None and self.frame % MOVIE_CHECK_INTERVAL == 0:
+            self.recording["checks"].append([self.frame, chip.state_hash()])
+        if self.replay is not None:
+            self._check_replay()
+        self.rewind.push(self.frame, chip.save_state())
+
+    def _rewind_frame(self):
+        entry = self.rewind.step_back()
+        if entry is None:
+            return
+        self.frame, state = entry
+        self.chip8.load_state(state)
+        if self.recording is not None:
+            events = [e for e in self.recording["events"] if e[0] < self.frame]
+            self.recording["events"] = events
+            self.recording["checks"] = [c for c in self.recording["checks"] if c[0] <= self.frame]
+            # Speed is not machine state; take it from the surviving log
+            speeds = [value for _, kind, value in events if kind == "speed"]
+            self.speed = speeds[-1] if speeds else self.recording["speed"]
+
+    def _apply_input(self, kind, value):
+        if kind == "speed":
+            self.speed = value
+        elif kind == "down":
+            self.chip8.key_down(value)
+        else:
+            self.chip8.key_up(value)
+
+    def _input(self, kind, value):
+        # Live input is ignored during replay and logged while recording
+        if self.replay is not None:
+            return
+        if self.recording is not None:
+            self.recording["events"].append([self.frame, kind, value])
+        self._apply_input(kind, value)
+
+    def _restart_rom(self, seed=None):
+        self.chip8.load(ROMS[self.current_rom]["data"])
+        self.chip8.seed(random.randrange(1 << 32) if seed is None else seed)
+        self.frame = 0
+        self.rewind.clear()
+
+    def _movie_path(self):
+        return os.path.splitext(self.current_rom)[0] + ".c8m"
+
+    def _state_path(self):
+        return os.path.splitext(self.current_rom)[0] + ".c8s"
+
+    def _toggle_recording(self):
+        if self.recording is not None:
+            self.recording["frames"] = self.frame
+            save_movie(self.recording, self._movie_path())
+            self.status_msg = f"Saved {self._movie_path()}"
+            self.recording = None
+        elif self.current_rom:
+            seed = random.randrange(1 << 32)
+            self.replay = None
+            self._restart_rom(seed)
+            self.recording = new_movie(self.current_rom, seed, self.speed)
+            self.status_msg = "REC"
+
+    def _start_replay(self):
+        if not self.current_rom:
+            return
+        try:
+            movie = load_movie(self._movie_path())
+        except (OSError, ValueError):
+            self.status_msg = "No movie"
+            return
+        self.recording = None
+        self.current_rom = movie["rom"]
+        self.speed = movie["speed"]
+        self._restart_rom(movie["seed"])
+        self.replay = movie
+        self.replay_events = {}
+        for frame, kind, value in movie["events"]:
+            self.replay_events.setdefault(frame, []).append((kind, value))
+        self.replay_checks = dict(movie["checks"])
+        self.status_msg = "PLAY"
+
+    def _check_replay(self):
+        expected = self.replay_checks.get(self.frame)
+        if expected is not None and self.chip8.state_hash() != expected and self.status_msg == "PLAY":
+            self.status_msg = f"DESYNC @ {self.frame}"
+        if self.frame >= self.replay["frames"]:
+            if self.status_msg == "PLAY":
+                self.status_msg = "REPLAY OK"
+            self.replay = None
+
+    def _save_state(self):
+        if not self.chip8.running:
+            return
+        self.quick_state = (self.frame, self.chip8.save_state())
+        with open(self._state_path(), "wb") as f:
+            f.write(zlib.compress(self.quick_state[1]))
+        self.status_msg = "State saved"
+
+    def _load_state(self):
+        if not self.current_rom:
+            return
+        if self.quick_state is None:
+            try:
+                with open(self._state_path(), "rb") as f:
+                    self.quick_state = (0, zlib.decompress(f.read()))
+            except (OSError, zlib.error):
+                self.status_msg = "No state"
+                return
+        self.frame, state = self.quick_state
+        self.chip8.load_state(state)
+        # A loaded state no longer follows the movie being recorded or played
+        self.recording = None
+        self.replay = None
+        self.rewind.clear()
+        self.status_msg = "State loaded"
+
     def _handle_keydown(self, event):
         if event.key in self.keymap:
-            self.chip8.key_down(self.keymap[event.key])
+            self._input("down", self.keymap[event.key])
+        elif event.key == pygame.K_F5:
+            self._save_state()
+        elif event.key == pygame.K_F7:
+            self._load_state()
+        elif event.key == pygame.K_F9:
+            self._toggle_recording()
+        elif event.key == pygame.K_F10:
+            self._start_replay()
+        elif event.key == pygame.K_BACKSPACE:
+            self.rewinding = self.replay is None and self.chip8.running
         elif event.key == pygame.K_ESCAPE:
             if self.active_menu >= 0:
                 self.active_menu = -1
@@ -542,7 +1967,9 @@ class CatChip8:
 
     def _handle_keyup(self, event):
         if event.key in self.keymap:
-            self.chip8.key_up(self.keymap[event.key])
+            self._input("up", self.keymap[event.key])
+        elif event.key == pygame.K_BACKSPACE:
+            self.rewinding = False
 
     def _handle_click(self, event):
         mx, my = event.pos
@@ -606,19 +2033,21 @@ class CatChip8:
         # Map controller buttons to CHIP-8 keys
         btn_map = {0: 0x5, 1: 0x6, 2: 0x7, 3: 0x8}  # A/B/X/Y -> 5/6/7/8
         if event.button in btn_map:
-            if pressed:
-                self.chip8.key_down(btn_map[event.button])
-            else:
-                self.chip8.key_up(btn_map[event.button])
+            self._input("down" if pressed else "up", btn_map[event.button])
 
     def _menu_action(self, menu_idx, item_idx):
         if menu_idx == 0:  # File
             if item_idx == 0:
                 self.show_rom_browser = True
             elif item_idx == 2:
+                self._save_state()
+            elif item_idx == 3:
+                self._load_state()
+            elif item_idx == 5:
                 if self.current_rom:
-                    self.chip8.load(ROMS[self.current_rom]["data"])
-            elif item_idx == 4:
+                    self.recording = self.replay = None
+                    self._restart_rom()
+            elif item_idx == 7:
                 pygame.quit()
                 sys.exit()
         elif menu_idx == 1:  # System
@@ -626,13 +2055,18 @@ class CatChip8:
                 self.chip8.paused = not self.chip8.paused
             elif item_idx == 1:
                 self.chip8.reset()
+                self.recording = self.replay = None
                 self.show_rom_browser = True
             elif item_idx == 3:
-                self.speed = 10
+                self._input("speed", 10)
             elif item_idx == 4:
-                self.speed = 20
+                self._input("speed", 20)
             elif item_idx == 5:
-                self.speed = 50
+                self._input("speed", 50)
+            elif item_idx == 7:
+                self._toggle_recording()
+            elif item_idx == 8:
+                self._start_replay()
         elif menu_idx == 2:  # Options
             if item_idx == 0:
                 self.pixel_scale = 8
@@ -652,7 +2086,9 @@ class CatChip8:
         if 0 <= self.rom_list.selected < len(self.rom_list.roms):
             key, rom = self.rom_list.roms[self.rom_list.selected]
             self.current_rom = key
-            self.chip8.load(rom["data"])
+            self.recording = self.replay = None
+            self.quick_state = None
+            self._restart_rom()
             self.show_rom_browser = False
 
     def _show_controls(self):
@@ -740,12 +2176,20 @@ class CatChip8:
             status = f"Running: {self.current_rom}" if self.current_rom else "Running"
             if self.chip8.paused:
                 status += " [PAUSED]"
+            if self.rewinding:
+                status += f" [REWIND {len(self.rewind) / 60:.1f}s]"
+            if self.status_msg:
+                status += f" [{self.status_msg}]"
 
         txt = self.font_small.render(status, True, P64.TEXT_DIM)
         self.screen.blit(txt, (10, y + 5))
 
         # Speed indicator
         speed_txt = f"Speed: {self.speed}x | Sound: {'ON' if self.sound_on else 'OFF'}"
+        if isinstance(self.chip8, JitChip8):
+            speed_txt += f" | JIT: {len(self.chip8.blocks)} blocks"
+            if self.chip8.shadow is not None:
+                speed_txt += f", {len(self.chip8.divergences)} diffs"
         stxt = self.font_small.render(speed_txt, True, P64.TEXT_DIM)
         self.screen.blit(stxt, (self.screen_w - stxt.get_width() - 10, y + 5))
 
@@ -792,8 +2236,8 @@ class CatChip8:
         y_offset = self.menu_height + self.toolbar_height + 10
 
         # Calculate display position (centered)
-        disp_w = WIDTH * self.pixel_scale
-        disp_h = HEIGHT * self.pixel_scale
+        disp_w = self.chip8.width * self.pixel_scale
+        disp_h = self.chip8.height * self.pixel_scale
         dx = (self.screen_w - disp_w) // 2
         dy = y_offset + (self.screen_h - y_offset - self.status_height - disp_h) // 2
 
@@ -801,12 +2245,7 @@ class CatChip8:
         pygame.draw.rect(self.screen, P64.BORDER, (dx - 4, dy - 4, disp_w + 8, disp_h + 8), 2, border_radius=4)
 
         # Pixels
-        for row in range(HEIGHT):
-            for col in range(WIDTH):
-                color = P64.PIXEL_ON if self.chip8.display[row][col] else P64.PIXEL_OFF
-                pygame.draw.rect(self.screen, color,
-                                 (dx + col * self.pixel_scale, dy + row * self.pixel_scale,
-                                  self.pixel_scale - 1, self.pixel_scale - 1))
+        self.presenter.present(self.screen, self.chip8, dx, dy, self.pixel_scale)
 
         # ROM title
         if self.current_rom:
@@ -823,6 +2262,28 @@ class CatChip8:
 # ENTRY POINT
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def arg_value(flag, default, cast=int):
+    """Value following `flag` on the command line, or `default`"""
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv) and not sys.argv[idx + 1].startswith("--"):
+            return cast(sys.argv[idx + 1])
+    return default
+
+
 if __name__ == "__main__":
-    app = CatChip8()
+    if "--bench" in sys.argv:
+        benchmark(arg_value("--bench", 1.0, float))
+        sys.exit()
+    if "--verify-movie" in sys.argv:
+        movie = load_movie(sys.argv[sys.argv.index("--verify-movie") + 1])
+        desync = verify_movie(movie)
+        print("replay matches recording" if desync is None else f"desync at frame {desync}")
+        sys.exit(0 if desync is None else 1)
+    if "--batch" in sys.argv:
+        batch_benchmark(arg_value("--batch", 64))
+        sys.exit()
+    app = CatChip8(fast_core="--fast" in sys.argv,
+                   jit="--jit" in sys.argv,
+                   jit_verify="--jit-verify" in sys.argv)
     app.run()
@@ -1,4 +1,8 @@
 import math
+import os
+import sys
+import random
+import time
 import pygame
 
 # =========================
@@ -6,6 +10,8 @@ import pygame
 # =========================
 
 # --- Pygame setup ---
+if '--check-collision' in sys.argv:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
 pygame.init()
 WIDTH, HEIGHT = 800, 600
 SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -142,8 +148,11 @@ class Mesh:
                 pygame.draw.line(surf, self.color, pa, pb, width_px)
 
 # =========================
-# Collision surfaces (SM64-inspired: floor triangles + simple bounds walls)
+# Collision surfaces (SM64-inspired: floor/wall/ceiling triangles + simple bounds walls)
 # =========================
+CELL_SIZE = 128.0   # XZ size of one surface-list cell
+CELL_PAD = 0.01     # bucket slack so hits exactly on an edge survive float rounding
+
 class Triangle:
     __slots__ = ("a", "b", "c", "n")
     def __init__(self, a: Vec3, b: Vec3, c: Vec3):
@@ -170,35 +179,131 @@ def point_in_tri_2d(px, pz, ax, az, bx, bz, cx, cz):
     v = (dot00 * dot12 - dot01 * dot02) * inv
     return (u >= 0.0) and (v >= 0.0) and (u + v <= 1.0)
 
+def cell_range(lo, hi):
+    # grid cells covering [lo, hi] on one axis
+    return range(math.floor((lo - CELL_PAD) / CELL_SIZE), math.floor((hi + CELL_PAD) / CELL_SIZE) + 1)
+
+def scan_floor(tris, x, z, y_probe, step_up, max_drop):
+    # SM64-ish 'find floor' scan:
+    # - vertical line at (x,z)
+    # - find highest floor triangle under y_probe+step_up
+    best_y = -1e9
+    best_n = Vec3(0, 1, 0)
+    for t in tris:
+        if t.n.y <= 0.01:
+            continue
+        if not point_in_tri_2d(x, z, t.a.x, t.a.z, t.b.x, t.b.z, t.c.x, t.c.z):
+            continue
+        if abs(t.n.y) < 1e-6:
+            continue
+        y = t.a.y - (t.n.x * (x - t.a.x) + t.n.z * (z - t.a.z)) / t.n.y
+        if y > y_probe + step_up:
+            continue
+        if y < y_probe - max_drop:
+            continue
+        if y > best_y:
+            best_y = y
+            best_n = t.n
+    return best_y, best_n
+
+def scan_ceiling(tris, x, z, y_probe):
+    # lowest ceiling triangle at or above y_probe on the vertical line at (x,z)
+    best_y = 1e9
+    best_n = Vec3(0, -1, 0)
+    for t in tris:
+        if t.n.y >= -0.01:
+            continue
+        if not point_in_tri_2d(x, z, t.a.x, t.a.z, t.b.x, t.b.z, t.c.x, t.c.z):
+            continue
+        y = t.a.y - (t.n.x * (x - t.a.x) + t.n.z * (z - t.a.z)) / t.n.y
+        if y < y_probe:
+            continue
+        if y < best_y:
+            best_y = y
+            best_n = t.n
+    return best_y, best_n
+
+def push_wall(t, pos: Vec3, vel: Vec3, radius: float, y: float):
+    # SM64-style wall push: a point at height y closer than radius to the
+    # wall's plane (and inside it) is moved out to radius along the normal.
+    # Returns True if pos moved.
+    n = t.n
+    off = n.x * (pos.x - t.a.x) + n.y * (y - t.a.y) + n.z * (pos.z - t.a.z)
+    if off <= -radius or off >= radius:
+        return False
+    px, py, pz = pos.x - n.x * off, y - n.y * off, pos.z - n.z * off
+    if abs(n.x) > abs(n.z):
+        inside = point_in_tri_2d(pz, py, t.a.z, t.a.y, t.b.z, t.b.y, t.c.z, t.c.y)
+    else:
+        inside = point_in_tri_2d(px, py, t.a.x, t.a.y, t.b.x, t.b.y, t.c.x, t.c.y)
+    if not inside:
+        return False
+    push = radius - off
+    pos.x += n.x * push
+    pos.z += n.z * push
+    into = vel.x * n.x + vel.z * n.z
+    if into < 0:
+        vel.x -= n.x * into
+        vel.z -= n.z * into
+    return True
+
+def scan_walls(tris, pos: Vec3, vel: Vec3, radius: float, y_offset=0.0):
+    for t in tris:
+        push_wall(t, pos, vel, radius, pos.y + y_offset)
+
 class Level:
     def __init__(self, meshes, floor_tris=None, bounds=None):
         self.meshes = meshes
+        # collision triangles; walls and ceilings may be mixed in, they are
+        # told apart by their normals like SM64's surface lists
         self.floor_tris = floor_tris or []
         # bounds = (minx, maxx, minz, maxz) for simple "wall" collisions
         self.bounds = bounds
+        self.floors = [t for t in self.floor_tris if t.n.y > 0.01]
+        self.ceilings = [t for t in self.floor_tris if t.n.y < -0.01]
+        self.walls = [t for t in self.floor_tris if -0.01 <= t.n.y <= 0.01]
+
+        # XZ grid of surface lists: cell -> (floors, wall indices, ceilings),
+        # each in level order so ties resolve like the full scan
+        self.cells = {}
+        for kind, tris in enumerate((self.floors, self.walls, self.ceilings)):
+            for i, t in enumerate(tris):
+                xs = (t.a.x, t.b.x, t.c.x)
+                zs = (t.a.z, t.b.z, t.c.z)
+                for cx in cell_range(min(xs), max(xs)):
+                    for cz in cell_range(min(zs), max(zs)):
+                        cell = self.cells.setdefault((cx, cz), ([], [], []))
+                        cell[kind].append(i if kind == 1 else t)
+
+    def cell(self, x, z):
+        return self.cells.get((math.floor(x / CELL_SIZE), math.floor(z / CELL_SIZE)), ((), (), ()))
 
     def find_floor(self, x, z, y_probe, step_up=60.0, max_drop=2000.0):
-        # SM64-ish 'find floor' scan:
-        # - vertical line at (x,z)
-        # - find highest floor triangle under y_probe+step_up
-        best_y = -1e9
-        best_n = Vec3(0, 1, 0)
-        for t in self.floor_tris:
-            if t.n.y <= 0.01:
-                continue
-            if not point_in_tri_2d(x, z, t.a.x, t.a.z, t.b.x, t.b.z, t.c.x, t.c.z):
-                continue
-            if abs(t.n.y) < 1e-6:
-                continue
-            y = t.a.y - (t.n.x * (x - t.a.x) + t.n.z * (z - t.a.z)) / t.n.y
-            if y > y_probe + step_up:
-                continue
-            if y < y_probe - max_drop:
-                continue
-            if y > best_y:
-                best_y = y
-                best_n = t.n
-        return best_y, best_n
+        return scan_floor(self.cell(x, z)[0], x, z, y_probe, step_up, max_drop)
+
+    def find_ceiling(self, x, z, y_probe):
+        return scan_ceiling(self.cell(x, z)[2], x, z, y_probe)
+
+    def walls_near(self, x, z, radius):
+        # indices of walls in every cell the radius-circle around (x,z) touches
+        near = set()
+        for cx in cell_range(x - radius, x + radius):
+            for cz in cell_range(z - radius, z + radius):
+                cell = self.cells.get((cx, cz))
+                if cell:
+                    near.update(cell[1])
+        return sorted(near)
+
+    def collide_walls(self, pos: Vec3, vel: Vec3, radius: float, y_offset=0.0):
+        # Same pushes, in the same order, as scan_walls over every wall: after
+        # a push the cells are looked up again from the new position
+        i = -1
+        while True:
+            for i in [j for j in self.walls_near(pos.x, pos.z, radius) if j > i]:
+                if push_wall(self.walls[i], pos, vel, radius, pos.y + y_offset):
+                    break
+            else:
+                return
 
     def collide_bounds(self, pos: Vec3, vel: Vec3, radius: float):
         if not self.bounds:
@@ -230,6 +335,7 @@ class Player:
 
         # tunables (rough SM64 vibe, not exact)
         self.radius = 12.0
+        self.height = 24.0
         self.walk_speed = 7.0
         self.run_speed = 12.0
         self.ground_accel = 0.9
@@ -286,8 +392,16 @@ class Player:
         self.pos.y += self.vel.y
         self.pos.z += self.vel.z
 
-        # wall bounds
+        # wall bounds, then wall triangles at mid-body height
         level.collide_bounds(self.pos, self.vel, self.radius)
+        level.collide_walls(self.pos, self.vel, self.radius, self.height * 0.5)
+
+        # bonk on ceilings while rising
+        if self.vel.y > 0:
+            ceil_y, _ = level.find_ceiling(self.pos.x, self.pos.z, self.pos.y)
+            if self.pos.y + self.height > ceil_y:
+                self.pos.y = ceil_y - self.height
+                self.vel.y = 0.0
 
         # resolve floor after move
         floor_y2, floor_n2 = level.find_floor(self.pos.x, self.pos.z, self.pos.y)
@@ -419,28 +533,100 @@ player_cube = Mesh(
 # Floors
 # =========================
 def floor_from_quad(v0, v1, v2, v3):
+    # wound so the normals face up (floors by normal, not by list)
     a = Vec3(*v0); b = Vec3(*v1); c = Vec3(*v2); d = Vec3(*v3)
-    return [Triangle(a,b,c), Triangle(a,c,d)]
+    return [Triangle(a,c,b), Triangle(a,d,c)]
 
 overworld_floor = floor_from_quad([-300,-50,-300],[300,-50,-300],[300,-50,300],[-300,-50,300])
 
 sw = [Vec3(*p) for p in spaceworld_vertices]
 spaceworld_floor = [
-    Triangle(sw[0], sw[1], sw[2]), Triangle(sw[0], sw[2], sw[3]),
-    Triangle(sw[4], sw[5], sw[8]), Triangle(sw[5], sw[6], sw[8]),
-    Triangle(sw[6], sw[7], sw[8]), Triangle(sw[7], sw[4], sw[8]),
-    Triangle(sw[9], sw[10], sw[13]), Triangle(sw[10], sw[11], sw[13]),
-    Triangle(sw[11], sw[12], sw[13]), Triangle(sw[12], sw[9], sw[13]),
+    Triangle(sw[0], sw[2], sw[1]), Triangle(sw[0], sw[3], sw[2]),
+    Triangle(sw[4], sw[8], sw[5]), Triangle(sw[5], sw[8], sw[6]),
+    Triangle(sw[6], sw[8], sw[7]), Triangle(sw[7], sw[8], sw[4]),
+    Triangle(sw[9], sw[13], sw[10]), Triangle(sw[10], sw[13], sw[11]),
+    Triangle(sw[11], sw[13], sw[12]), Triangle(sw[12], sw[13], sw[9]),
 ]
 
 cv = [Vec3(*p) for p in courtyard_vertices]
-courtyard_floor = [Triangle(cv[0], cv[1], cv[2]), Triangle(cv[0], cv[2], cv[3])]
+courtyard_floor = [Triangle(cv[0], cv[2], cv[1]), Triangle(cv[0], cv[3], cv[2])]
 
 LEVEL_OVERWORLD = Level(meshes=[castle], floor_tris=overworld_floor, bounds=(-260, 260, -260, 260))
 LEVEL_TECHDEMO  = Level(meshes=[castle, wireframe_fighter], floor_tris=overworld_floor, bounds=(-260, 260, -260, 260))
 LEVEL_SPACEWORLD= Level(meshes=[spaceworld], floor_tris=spaceworld_floor, bounds=(-220, 220, -220, 220))
 LEVEL_COURTYARD = Level(meshes=[courtyard], floor_tris=courtyard_floor, bounds=(-190, 190, -190, 190))
 
+# =========================
+# Collision self-check (--check-collision)
+# =========================
+def random_level(rng, count):
+    # triangle soup of floors, slopes, walls and ceilings; half the vertices
+    # snapped to cell corners so grid edges get exercised
+    def coord():
+        v = rng.uniform(-1000, 1000)
+        return round(v / CELL_SIZE) * CELL_SIZE if rng.random() < 0.5 else v
+    tris = []
+    for _ in range(count):
+        x, z, y = coord(), coord(), rng.uniform(-200, 200)
+        kind = rng.random()
+        if kind < 0.4:      # floor / slope
+            a = Vec3(x, y, z)
+            b = Vec3(x + rng.uniform(-300, 300), y + rng.uniform(-80, 80), z + rng.uniform(-300, 300))
+            c = Vec3(x + rng.uniform(-300, 300), y + rng.uniform(-80, 80), z + rng.uniform(-300, 300))
+        elif kind < 0.7:    # vertical wall
+            dx, dz = rng.uniform(-300, 300), rng.uniform(-300, 300)
+            a, b, c = Vec3(x, y, z), Vec3(x + dx, y, z + dz), Vec3(x, y + rng.uniform(40, 200), z)
+        else:               # ceiling
+            a = Vec3(x, y + 100, z)
+            b = Vec3(x + rng.uniform(-300, 300), y + 100, z + rng.uniform(-300, 300))
+            c = Vec3(x + rng.uniform(-300, 300), y + 100, z + rng.uniform(-300, 300))
+        tris.append(Triangle(a, b, c))
+    return Level(meshes=[], floor_tris=tris)
+
+def check_collision(seed=3313, levels=40, probes=2000):
+    # grid lookups vs. a linear scan of every triangle, on random soups and
+    # on the real levels; prints mismatches and the speedup
+    rng = random.Random(seed)
+    cases = [random_level(rng, rng.choice((20, 200, 1000))) for _ in range(levels)]
+    cases += [LEVEL_OVERWORLD, LEVEL_SPACEWORLD, LEVEL_COURTYARD]
+    checked = mismatches = 0
+    t_grid = t_scan = 0.0
+    for level in cases:
+        for _ in range(probes):
+            x, z, y = rng.uniform(-1100, 1100), rng.uniform(-1100, 1100), rng.uniform(-300, 300)
+            if level.floor_tris and rng.random() < 0.3:
+                # exactly on a vertex or edge
+                t = rng.choice(level.floor_tris)
+                k = rng.random()
+                x = t.a.x + (t.b.x - t.a.x) * k
+                z = t.a.z + (t.b.z - t.a.z) * k
+            pos = Vec3(x, y, z); vel = Vec3(rng.uniform(-5, 5), 0, rng.uniform(-5, 5))
+            pos2, vel2 = pos.copy(), vel.copy()
+            t0 = time.perf_counter()
+            grid = (level.find_floor(x, z, y), level.find_ceiling(x, z, y))
+            level.collide_walls(pos, vel, 12.0, 12.0)
+            t1 = time.perf_counter()
+            scan = (scan_floor(level.floor_tris, x, z, y, 60.0, 2000.0), scan_ceiling(level.floor_tris, x, z, y))
+            scan_walls(level.walls, pos2, vel2, 12.0, 12.0)
+            t2 = time.perf_counter()
+            t_grid += t1 - t0
+            t_scan += t2 - t1
+            checked += 1
+            same = all(g[0] == s[0] and (g[1].x, g[1].y, g[1].z) == (s[1].x, s[1].y, s[1].z)
+                       for g, s in zip(grid, scan))
+            same = same and (pos.x, pos.y, pos.z, vel.x, vel.z) == (pos2.x, pos2.y, pos2.z, vel2.x, vel2.z)
+            if not same:
+                mismatches += 1
+    tris = sum(len(l.floor_tris) for l in cases)
+    print(f"{checked} probes over {len(cases)} levels ({tris} triangles): {mismatches} mismatches")
+    print(f"grid {t_grid / checked * 1e6:.1f} us/probe, linear scan {t_scan / checked * 1e6:.1f} us/probe")
+    return mismatches == 0
+
+if '--check-collision' in sys.argv:
+    ok = check_collision()
+    pygame.quit()
+    sys.exit(0 if ok else 1)
+
 # =========================
 # States
 # =========================
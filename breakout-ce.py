@@ -2,6 +2,12 @@ import pygame
 import numpy as np
 import math
 
+try:
+    import chipaudio
+    CHIPAUDIO_AVAILABLE = True
+except ImportError:
+    CHIPAUDIO_AVAILABLE = False
+
 # --- CONFIGURATION ---
 WIDTH, HEIGHT = 600, 400
 FPS = 60
@@ -19,6 +25,8 @@ PADDLE_COLOR = (180, 180, 200)
 
 # --- AUDIO ENGINE (Famicon Synth) ---
 def generate_tone(frequency, duration, volume=0.5, wave_type="square"):
+    if CHIPAUDIO_AVAILABLE:
+        return chipaudio.breakout_tone(frequency, duration, volume, wave_type)
     sample_rate = 44100
     n_samples = int(sample_rate * duration)
     t = np.linspace(0, duration, n_samples, False)
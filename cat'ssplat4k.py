@@ -8,6 +8,7 @@ from ursina import *
 from ursina.prefabs.first_person_controller import FirstPersonController
 import random
 import math
+import numpy as np
 
 # ============================================================================
 # GAME CONSTANTS
@@ -29,6 +30,29 @@ PALETTES = [
 ]
 ENEMY_COLOR = color.rgb(255, 107, 138)
 ENEMY_COLOR_DARK = color.rgb(140, 50, 70)
+INK_BASE_COLOR = (40, 45, 55)
+INK_MIN_ALPHA = 0.1  # cells thinner than this are neither drawn nor counted as territory
+
+# Disk stamps for paint_circle, keyed by radius in ink cells
+DISK_MASKS = {}
+
+
+def disk_mask(r):
+    """Boolean (2r+1, 2r+1) stamp of cells with dx*dx + dy*dy <= r*r"""
+    mask = DISK_MASKS.get(r)
+    if mask is None:
+        d = np.arange(-r, r + 1)
+        mask = d[:, None] ** 2 + d[None, :] ** 2 <= r * r
+        DISK_MASKS[r] = mask
+    return mask
+
+
+def checker_rgba(size):
+    """The unpainted ground: 8-cell checkerboard, indexed [x, y]"""
+    x = np.arange(size)
+    checker = ((x[:, None] // 8) + (x[None, :] // 8)) % 2
+    val = (40 + checker * 8).astype(np.uint8)
+    return np.stack([val, val + 5, val + 15, np.full_like(val, 255)], axis=-1)
 
 
 # ============================================================================
@@ -58,9 +82,13 @@ class UltraSplatoon:
         self.splat_count = 0
         self.spawn_timer = 2
         
-        # Ink map (2D array for ground painting)
-        self.ink_owner = [[TEAM_NONE] * INK_RESOLUTION for _ in range(INK_RESOLUTION)]
-        self.ink_alpha = [[0.0] * INK_RESOLUTION for _ in range(INK_RESOLUTION)]
+        # Ink map (2D arrays for ground painting, indexed [x, y])
+        self.ink_owner = np.full((INK_RESOLUTION, INK_RESOLUTION), TEAM_NONE, dtype=np.uint8)
+        self.ink_alpha = np.zeros((INK_RESOLUTION, INK_RESOLUTION))
+        self.territory_counts = [0, 0, 0]  # owned cells per team, kept up to date by paint_circle
+        self.ink_dirty = None  # (x0, y0, x1, y1) not yet uploaded to the ground texture
+        self.ink_base_rgba = checker_rgba(INK_RESOLUTION)
+        self.ink_palette_index = None
         
         # Entity lists
         self.enemies = []
@@ -421,51 +449,58 @@ class UltraSplatoon:
     
     def create_ink_texture(self):
         """Create a texture for the ground ink"""
-        # Create a simple colored texture
+        # Create a simple colored texture; update_ink_texture writes into it in place
         tex = Texture(Image.new('RGBA', (INK_RESOLUTION, INK_RESOLUTION), (40, 45, 55, 255)))
+        self.ink_palette_index = None
+        self.mark_ink_dirty(0, 0, INK_RESOLUTION, INK_RESOLUTION)
         return tex
     
+    def mark_ink_dirty(self, x0, y0, x1, y1):
+        """Grow the pending upload rectangle"""
+        if self.ink_dirty is None:
+            self.ink_dirty = (x0, y0, x1, y1)
+        else:
+            dx0, dy0, dx1, dy1 = self.ink_dirty
+            self.ink_dirty = (min(dx0, x0), min(dy0, y0), max(dx1, x1), max(dy1, y1))
+    
+    def ink_colors(self, x0, y0, x1, y1):
+        """RGBA for a rectangle of the ink map, indexed [x, y]"""
+        palette = PALETTES[self.palette_index]
+        player_color = np.array([palette['ink'].r, palette['ink'].g, palette['ink'].b]) * 255
+        enemy_color = np.array([ENEMY_COLOR.r, ENEMY_COLOR.g, ENEMY_COLOR.b]) * 255
+        base = np.array(INK_BASE_COLOR, dtype=np.float64)
+        
+        owner = self.ink_owner[x0:x1, y0:y1]
+        alpha = self.ink_alpha[x0:x1, y0:y1]
+        rgba = self.ink_base_rgba[x0:x1, y0:y1].copy()
+        t = np.minimum(alpha, 1.0)[..., None]
+        for team, team_color in ((TEAM_PLAYER, player_color), (TEAM_ENEMY, enemy_color)):
+            inked = (owner == team) & (alpha > INK_MIN_ALPHA)
+            lerp = np.clip(base + (team_color.astype(np.int64) - base) * t, 0, 255).astype(np.uint8)
+            rgba[inked, :3] = lerp[inked]
+        return rgba
+    
     def update_ink_texture(self):
-        """Update the ground texture based on ink data"""
+        """Upload the dirty rectangle of the ink map into the ground texture.
+        
+        Writes straight into the Panda3D RAM image (bottom-up rows, BGRA)
+        rather than rebuilding a PIL image and a new Texture.
+        """
         if not self.ground_texture:
             return
+        if self.ink_palette_index != self.palette_index:
+            self.ink_palette_index = self.palette_index
+            self.mark_ink_dirty(0, 0, INK_RESOLUTION, INK_RESOLUTION)
+        if self.ink_dirty is None:
+            return
         
-        palette = PALETTES[self.palette_index]
-        player_color = (int(palette['ink'].r * 255), int(palette['ink'].g * 255), int(palette['ink'].b * 255), 255)
-        enemy_color = (int(ENEMY_COLOR.r * 255), int(ENEMY_COLOR.g * 255), int(ENEMY_COLOR.b * 255), 255)
-        base_color = (40, 45, 55, 255)
-        
-        # Update pixels
-        img = Image.new('RGBA', (INK_RESOLUTION, INK_RESOLUTION), base_color)
-        pixels = img.load()
-        
-        for x in range(INK_RESOLUTION):
-            for y in range(INK_RESOLUTION):
-                owner = self.ink_owner[x][y]
-                alpha = self.ink_alpha[x][y]
-                
-                if owner == TEAM_PLAYER and alpha > 0.1:
-                    t = min(1, alpha)
-                    r = int(base_color[0] + (player_color[0] - base_color[0]) * t)
-                    g = int(base_color[1] + (player_color[1] - base_color[1]) * t)
-                    b = int(base_color[2] + (player_color[2] - base_color[2]) * t)
-                    pixels[x, y] = (r, g, b, 255)
-                elif owner == TEAM_ENEMY and alpha > 0.1:
-                    t = min(1, alpha)
-                    r = int(base_color[0] + (enemy_color[0] - base_color[0]) * t)
-                    g = int(base_color[1] + (enemy_color[1] - base_color[1]) * t)
-                    b = int(base_color[2] + (enemy_color[2] - base_color[2]) * t)
-                    pixels[x, y] = (r, g, b, 255)
-                else:
-                    # Checkerboard
-                    checker = ((x // 8) + (y // 8)) % 2
-                    val = 40 + checker * 8
-                    pixels[x, y] = (val, val + 5, val + 15, 255)
-        
-        # Apply new texture
-        self.ground_texture = Texture(img)
-        if self.ground:
-            self.ground.texture = self.ground_texture
+        x0, y0, x1, y1 = self.ink_dirty
+        self.ink_dirty = None
+        rgba = self.ink_colors(x0, y0, x1, y1)
+        ram = np.frombuffer(memoryview(self.ground_texture._texture.modify_ram_image()), dtype=np.uint8)
+        ram = ram.reshape(INK_RESOLUTION, INK_RESOLUTION, 4)
+        n = INK_RESOLUTION
+        ram[n - y1:n - y0, x0:x1] = rgba.transpose(1, 0, 2)[::-1, :, [2, 1, 0, 3]]
     
     def create_player(self):
         """Create the player controller"""
@@ -546,31 +581,35 @@ class UltraSplatoon:
         r = int(radius / ARENA_SIZE * INK_RESOLUTION)
         r = max(1, r)
         
-        for dx in range(-r, r+1):
-            for dy in range(-r, r+1):
-                ix, iy = cx + dx, cy + dy
-                if 0 <= ix < INK_RESOLUTION and 0 <= iy < INK_RESOLUTION:
-                    if dx*dx + dy*dy <= r*r:
-                        self.ink_owner[ix][iy] = team
-                        self.ink_alpha[ix][iy] = min(1, self.ink_alpha[ix][iy] + alpha)
+        # Clip the disk stamp to the map
+        x0, x1 = max(0, cx - r), min(INK_RESOLUTION, cx + r + 1)
+        y0, y1 = max(0, cy - r), min(INK_RESOLUTION, cy + r + 1)
+        mask = disk_mask(r)[x0 - (cx - r):x1 - (cx - r), y0 - (cy - r):y1 - (cy - r)]
+        owner = self.ink_owner[x0:x1, y0:y1]
+        ink = self.ink_alpha[x0:x1, y0:y1]
+        
+        # Territory: drop what the stamp covered before, add it back as `team`
+        old_owner = owner[mask]
+        old_owned = ink[mask] > INK_MIN_ALPHA
+        for t in (TEAM_PLAYER, TEAM_ENEMY):
+            self.territory_counts[t] -= int(np.count_nonzero(old_owned & (old_owner == t)))
+        new_alpha = np.minimum(1, ink[mask] + alpha)
+        owner[mask] = team
+        ink[mask] = new_alpha
+        self.territory_counts[team] += int(np.count_nonzero(new_alpha > INK_MIN_ALPHA))
+        
+        self.mark_ink_dirty(x0, y0, x1, y1)
     
     def get_ink_at(self, wx, wz):
         """Get ink info at world position"""
         ix, iy = self.world_to_ink(wx, wz)
         if 0 <= ix < INK_RESOLUTION and 0 <= iy < INK_RESOLUTION:
-            return self.ink_owner[ix][iy], self.ink_alpha[ix][iy]
+            return int(self.ink_owner[ix, iy]), float(self.ink_alpha[ix, iy])
         return TEAM_NONE, 0
     
     def territory_ratio(self, team):
         """Calculate territory percentage for a team"""
-        owned = 0
-        total = 0
-        for x in range(INK_RESOLUTION):
-            for y in range(INK_RESOLUTION):
-                total += 1
-                if self.ink_owner[x][y] == team and self.ink_alpha[x][y] > 0.1:
-                    owned += 1
-        return owned / total if total > 0 else 0
+        return self.territory_counts[team] / (INK_RESOLUTION * INK_RESOLUTION)
     
     def spawn_enemy(self):
         """Spawn an enemy at arena edge"""
@@ -661,10 +700,10 @@ class UltraSplatoon:
     def reset_match(self):
         """Reset for a new match"""
         # Clear ink
-        for x in range(INK_RESOLUTION):
-            for y in range(INK_RESOLUTION):
-                self.ink_owner[x][y] = TEAM_NONE
-                self.ink_alpha[x][y] = 0
+        self.ink_owner.fill(TEAM_NONE)
+        self.ink_alpha.fill(0)
+        self.territory_counts = [0, 0, 0]
+        self.mark_ink_dirty(0, 0, INK_RESOLUTION, INK_RESOLUTION)
         
         # Reset stats
         self.hp = self.hp_max
@@ -928,9 +967,8 @@ class UltraSplatoon:
             self.spawn_enemy()
             self.spawn_timer = 2.5 - self.territory_ratio(TEAM_PLAYER) * 1.5
         
-        # Update ink texture periodically
-        if int(self.match_time * 10) % 5 == 0:
-            self.update_ink_texture()
+        # Upload whatever was painted this frame
+        self.update_ink_texture()
         
         # Update HUD
         self.update_hud()
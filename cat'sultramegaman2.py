@@ -24,6 +24,22 @@ import math
 import array
 import threading
 import time
+import os
+import hashlib
+import functools
+import bisect
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import chipaudio
+    CHIPAUDIO_AVAILABLE = True
+except ImportError:
+    CHIPAUDIO_AVAILABLE = False
 
 # =============================================================================
 # CONFIGURATION
@@ -139,6 +155,74 @@ canvas = pygame.Surface((SCREEN_W, SCREEN_H))
 # =============================================================================
 # SAMSOFT SOUND MEDIA ENGINE v2.0
 # =============================================================================
+SEQ_BLOCK_SECONDS = 0.05  # Sequencer block length; one block plays, one sits queued
+
+class TrackSequencer:
+    """
+    Renders a track as one continuous PCM stream, a block at a time.
+    Every note sits at an absolute sample offset computed from its beat
+    position, so timing is sample-accurate and never drifts. Each part
+    loops on its own length, like the original player did. A note sounds
+    for its bank duration (the beat length snapped to NOTE_DURATIONS, as
+    the note-bank player plays it), cut short at the next note's start.
+    """
+    
+    # part, waveform, volume, frequency ratio. A track without a 'harmony'
+    # part gets its melody doubled an octave down on the 25% pulse.
+    VOICES = (
+        ('melody', 'square', 0.2, 1.0),
+        ('harmony', 'square25', 0.1, 0.5),
+        ('bass', 'triangle', 0.25, 1.0),
+    )
+    
+    def __init__(self, engine, track):
+        self.engine = engine
+        self.pos = 0
+        self.parts = []
+        spb = engine.sample_rate * 60.0 / track['tempo']
+        for part, wave, volume, ratio in self.VOICES:
+            notes = track.get(part)
+            if notes is None:
+                if part != 'harmony':
+                    continue
+                notes = track['melody']
+            else:
+                ratio = 1.0
+            starts, lengths, spans, freqs = [], [], [], []
+            beat = 0.0
+            for note, dur in notes:
+                start = round(beat * spb)
+                beat += dur
+                starts.append(start)
+                lengths.append(round(beat * spb) - start)
+                spans.append(int(engine.sample_rate * engine._closest_duration(dur, track['tempo'])))
+                freqs.append(engine.NOTE_FREQ.get(engine._canonical(note), 0) * ratio)
+            total = round(beat * spb)
+            if total > 0:
+                self.parts.append((wave, volume, starts, lengths, spans, freqs, total))
+    
+    def advance(self, n):
+        """Move the song position without rendering (music muted)"""
+        self.pos += n
+    
+    def render(self, n):
+        """Mix the next n samples of every part into mono int16"""
+        out = np.zeros(n)
+        for wave, volume, starts, lengths, spans, freqs, total in self.parts:
+            done = 0
+            while done < n:
+                p = (self.pos + done) % total
+                k = bisect.bisect_right(starts, p) - 1
+                offset = p - starts[k]
+                take = min(n - done, lengths[k] - offset)
+                sound = min(take, spans[k] - offset)
+                if freqs[k] and sound > 0:
+                    i = np.arange(offset, offset + sound)
+                    out[done:done + sound] += self.engine._wave_block(freqs[k], spans[k], i, wave, volume)
+                done += take
+        self.pos += n
+        return np.clip(np.trunc(out * 32767), -32767, 32767).astype(np.int16)
+
 class SamsoftSoundEngine:
     """
     SAMSOFT SOUND MEDIA ENGINE v2.0
@@ -150,9 +234,18 @@ class SamsoftSoundEngine:
     
     # Note frequencies (A4 = 440Hz standard)
     NOTE_FREQ = {}
+    FLATS = {'Db': 'C#', 'Eb': 'D#', 'Gb': 'F#', 'Ab': 'G#', 'Bb': 'A#'}
+    
+    # Note bank: durations a note snaps to, and wave suffix -> (waveform, volume)
+    NOTE_DURATIONS = [0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5]
+    VOICES = {'sq': ('square', 0.2), 'tri': ('triangle', 0.25)}
+    ENVELOPE = (0.02, 0.1)  # attack, release as fractions of the note
+    BANK_VERSION = 1
+    BANK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "note_cache")
     
     def __init__(self):
-        self.sample_rate = 22050
+        # Render at the rate the mixer actually opened with
+        self.sample_rate, _, self.out_channels = pygame.mixer.get_init() or (22050, -16, 2)
         self.enabled = True
         self.playing = False
         self.current_track = None
@@ -160,7 +253,10 @@ class SamsoftSoundEngine:
         self.tick = 0
         self.tempo = 150
         
-        # Sound channels
+        # Stream through the block sequencer unless the note-bank player is requested
+        self.use_sequencer = NUMPY_AVAILABLE and '--legacy-music' not in sys.argv
+        
+        # Sound channels (the sequencer streams its full mix through channel 0)
         self.channels = [
             pygame.mixer.Channel(0),  # Melody (Square)
             pygame.mixer.Channel(1),  # Harmony (Square)
@@ -170,9 +266,11 @@ class SamsoftSoundEngine:
         # Pre-generate note table
         self._build_note_table()
         
-        # Pre-generate all note sounds
-        self.sounds = {}
-        self._generate_sounds()
+        # Note bank: nothing is rendered up front. play() renders the notes a
+        # track references, memoized per note and persisted to an .npz cache
+        self.bank_path = self._bank_path()
+        self.bank_file = None
+        self.bank_new = {}
         
         # Track data
         self.tracks = self._define_tracks()
@@ -194,16 +292,47 @@ class SamsoftSoundEngine:
                 self.NOTE_FREQ[f"{note}{octave}"] = freq
         
         # Add flat note aliases
-        flats = {'Db': 'C#', 'Eb': 'D#', 'Gb': 'F#', 'Ab': 'G#', 'Bb': 'A#'}
         for octave in range(1, 8):
-            for flat, sharp in flats.items():
+            for flat, sharp in self.FLATS.items():
                 self.NOTE_FREQ[f"{flat}{octave}"] = self.NOTE_FREQ[f"{sharp}{octave}"]
     
-    def _generate_wave(self, freq, duration, wave_type='square', volume=0.3):
-        """Generate a waveform"""
+    def _wave_block(self, freq, n_samples, i, wave_type='square', volume=0.3):
+        """Float samples i (indices into a note n_samples long) with envelope"""
+        t = i / self.sample_rate
+        if wave_type == 'square':
+            val = np.where(np.floor(t * freq * 2) % 2, volume, -volume)
+        elif wave_type == 'square25':
+            val = np.where((t * freq) % 1.0 < 0.25, volume, -volume)
+        elif wave_type == 'triangle':
+            val = volume * (4 * np.abs((t * freq) % 1.0 - 0.5) - 1)
+        elif wave_type == 'noise':
+            val = volume * np.random.uniform(-1, 1, len(i))
+        else:
+            val = np.zeros(len(i))
+        
+        # Envelope - quick attack, sustain, release at end
+        attack = int(n_samples * self.ENVELOPE[0])
+        release = int(n_samples * self.ENVELOPE[1])
+        env = np.ones(len(i))
+        if attack:
+            head = i < attack
+            env[head] = i[head] / attack
+        if release:
+            tail = (i > n_samples - release) & (i >= attack)
+            env[tail] = (n_samples - i[tail]) / release
+        return val * env
+    
+    def _wave_samples(self, freq, duration, wave_type='square', volume=0.3):
+        """Generate a mono int16 waveform"""
         n_samples = int(self.sample_rate * duration)
-        buf = array.array('h', [0] * (n_samples * 2))
         
+        if NUMPY_AVAILABLE:
+            val = self._wave_block(freq, n_samples, np.arange(n_samples), wave_type, volume)
+            return np.clip(np.trunc(val * 32767), -32767, 32767).astype(np.int16)
+        
+        attack = int(n_samples * self.ENVELOPE[0])
+        release = int(n_samples * self.ENVELOPE[1])
+        buf = array.array('h', [0] * n_samples)
         for i in range(n_samples):
             t = i / self.sample_rate
             
@@ -225,43 +354,103 @@ class SamsoftSoundEngine:
             
             # Envelope - quick attack, sustain, release at end
             env = 1.0
-            attack = int(n_samples * 0.02)
-            release = int(n_samples * 0.1)
             if i < attack:
                 env = i / attack
             elif i > n_samples - release:
                 env = (n_samples - i) / release
             
             sample = int(val * env * 32767)
-            sample = max(-32767, min(32767, sample))
-            buf[i * 2] = sample
-            buf[i * 2 + 1] = sample
-        
+            buf[i] = max(-32767, min(32767, sample))
+        return buf
+    
+    def _generate_wave(self, freq, duration, wave_type='square', volume=0.3):
+        """Generate a waveform as a (stereo) pygame Sound"""
+        return self._make_sound(self._wave_samples(freq, duration, wave_type, volume))
+    
+    def _make_sound(self, samples):
+        """Wrap mono int16 samples in a Sound, copied to every output channel"""
+        if NUMPY_AVAILABLE:
+            return pygame.mixer.Sound(buffer=np.repeat(samples, self.out_channels).tobytes())
+        buf = array.array('h', [0] * (len(samples) * self.out_channels))
+        for c in range(self.out_channels):
+            buf[c::self.out_channels] = samples
         return pygame.mixer.Sound(buffer=buf.tobytes())
     
-    def _generate_sounds(self):
-        """Pre-generate all note sounds"""
-        durations = [0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5]
-        
-        for note, freq in self.NOTE_FREQ.items():
-            for dur in durations:
-                # Melody (square)
-                key = f"{note}_{dur}_sq"
+    # ========== NOTE BANK ==========
+    
+    def _bank_path(self):
+        """Cache file name, keyed by everything that shapes the samples"""
+        params = repr((self.BANK_VERSION, self.sample_rate, self.NOTE_DURATIONS,
+                       sorted(self.VOICES.items()), self.ENVELOPE))
+        digest = hashlib.sha1(params.encode()).hexdigest()[:12]
+        return os.path.join(self.BANK_DIR, f"notes_{digest}.npz")
+    
+    def _canonical(self, note):
+        """Spell flats as sharps so enharmonic aliases share one sample"""
+        if note[:2] in self.FLATS:
+            return self.FLATS[note[:2]] + note[2:]
+        return note
+    
+    def _note_samples(self, key, freq, dur, wave):
+        samples = self.bank_new.get(key)
+        if samples is not None:
+            return samples
+        if NUMPY_AVAILABLE:
+            if self.bank_file is None:
                 try:
-                    self.sounds[key] = self._generate_wave(freq, dur, 'square', 0.2)
-                except:
-                    pass
-                
-                # Bass (triangle) - only for low notes
-                if any(c.isdigit() and int(c) <= 3 for c in note):
-                    key = f"{note}_{dur}_tri"
-                    try:
-                        self.sounds[key] = self._generate_wave(freq, dur, 'triangle', 0.25)
-                    except:
-                        pass
-        
-        # Rest sound (silence)
-        self.sounds['rest'] = self._generate_wave(1, 0.1, 'square', 0)
+                    self.bank_file = np.load(self.bank_path)
+                except (OSError, ValueError):
+                    self.bank_file = {}
+            if key in self.bank_file:
+                return self.bank_file[key]
+        wave_type, volume = self.VOICES[wave]
+        samples = self.bank_new[key] = self._wave_samples(freq, dur, wave_type, volume)
+        return samples
+    
+    @functools.lru_cache(maxsize=512)
+    def _note_sound(self, note, dur, wave):
+        """Sound for a canonical note name at a bank duration (memoized)"""
+        freq = self.NOTE_FREQ.get(note)
+        if freq is None:
+            return None
+        # Bass (triangle) - only for low notes
+        if wave == 'tri' and not any(c.isdigit() and int(c) <= 3 for c in note):
+            return None
+        try:
+            return self._make_sound(self._note_samples(f"{note}_{dur}_{wave}", freq, dur, wave))
+        except Exception:
+            return None
+    
+    def _closest_duration(self, duration, tempo):
+        dur_secs = duration * 60 / tempo
+        return min(self.NOTE_DURATIONS, key=lambda x: abs(x - dur_secs))
+    
+    def prepare_track(self, track_name):
+        """Render every note a track references, then persist anything new"""
+        track = self.tracks[track_name]
+        for part, wave in (('melody', 'sq'), ('bass', 'tri')):
+            for note, dur in track[part]:
+                if note not in ('R', 'rest'):
+                    self._note_sound(self._canonical(note), self._closest_duration(dur, track['tempo']), wave)
+        self._save_bank()
+    
+    def _save_bank(self):
+        """Merge newly rendered samples into the .npz cache (temp file + rename)"""
+        if not (NUMPY_AVAILABLE and self.bank_new):
+            return
+        arrays = {k: self.bank_file[k] for k in self.bank_file.keys()} if self.bank_file else {}
+        arrays.update(self.bank_new)
+        tmp = f"{self.bank_path}.tmp{os.getpid()}.npz"
+        try:
+            os.makedirs(self.BANK_DIR, exist_ok=True)
+            np.savez(tmp, **arrays)
+            if hasattr(self.bank_file, 'close'):
+                self.bank_file.close()
+            os.replace(tmp, self.bank_path)
+        except OSError:
+            return
+        self.bank_file = np.load(self.bank_path)
+        self.bank_new = {}
     
     def _define_tracks(self):
         """Define all music tracks with authentic MM2-style melodies"""
@@ -600,17 +789,50 @@ class SamsoftSoundEngine:
         return tracks
     
     def _get_sound(self, note, duration, wave='sq'):
-        """Get pre-generated sound for a note"""
+        """Get the bank sound for a note"""
         if note == 'R' or note == 'rest':
             return None
         
-        # Find closest pre-generated duration
-        dur_secs = duration * 60 / self.tempo
-        available = [0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5]
-        closest = min(available, key=lambda x: abs(x - dur_secs))
+        # Find closest bank duration
+        return self._note_sound(self._canonical(note), self._closest_duration(duration, self.tempo), wave)
+    
+    def _sequencer_loop(self):
+        """Stream the current track through channel 0 (runs in thread).
+        
+        One block plays while the next waits in the channel queue; the
+        thread wakes once per block, when the queue slot frees, to queue
+        the block it rendered ahead of time.
+        """
+        seq = TrackSequencer(self, self.tracks[self.current_track])
+        channel = self.channels[0]
+        block = int(self.sample_rate * SEQ_BLOCK_SECONDS)
+        block_secs = block / self.sample_rate
+        pending = self._make_sound(seq.render(block))
+        ends_at = time.perf_counter()
         
-        key = f"{note}_{closest}_{wave}"
-        return self.sounds.get(key)
+        while not self.stop_flag and self.playing:
+            if not self.enabled:
+                seq.advance(block)
+                time.sleep(block_secs)
+                continue
+            wake = None
+            try:
+                if not channel.get_busy():
+                    # First block, re-enabled, or we fell behind: restart
+                    channel.play(pending)
+                    ends_at = time.perf_counter() + block_secs
+                elif channel.get_queue() is None:
+                    channel.queue(pending)
+                    wake = ends_at
+                    ends_at += block_secs
+                else:
+                    time.sleep(0.002)
+                    continue
+            except pygame.error:
+                break
+            pending = self._make_sound(seq.render(block))
+            if wake is not None:
+                time.sleep(max(0.0, wake - time.perf_counter()))
     
     def _playback_loop(self):
         """Main playback loop (runs in thread)"""
@@ -682,7 +904,13 @@ class SamsoftSoundEngine:
         self.playing = True
         self.stop_flag = False
         
-        self.thread = threading.Thread(target=self._playback_loop, daemon=True)
+        if self.use_sequencer:
+            loop = self._sequencer_loop
+        else:
+            # Fire whole pre-rendered notes from the note bank
+            self.prepare_track(track_name)
+            loop = self._playback_loop
+        self.thread = threading.Thread(target=loop, daemon=True)
         self.thread.start()
     
     def stop(self):
@@ -721,6 +949,8 @@ STAGE_TRACKS = ['bubble', 'air', 'quick', 'heat', 'wood', 'metal', 'flash', 'cra
 # SOUND EFFECTS
 # =============================================================================
 def synth_sfx(freq, dur, wave="square", vol=0.2, decay=0.7):
+    if CHIPAUDIO_AVAILABLE:
+        return chipaudio.megacat_sfx(freq, dur, wave, vol, decay)
     sr = 22050
     n = int(sr * dur)
     if n < 1:
@@ -4,6 +4,12 @@ import math
 import random
 import numpy as np
 
+try:
+    import chipaudio
+    CHIPAUDIO_AVAILABLE = True
+except ImportError:
+    CHIPAUDIO_AVAILABLE = False
+
 # ================== INIT ==================
 pygame.mixer.pre_init(44100, -16, 2, 512)
 pygame.init()
@@ -29,11 +35,15 @@ def make_sound(mono):
     return pygame.sndarray.make_sound(stereo)
 
 def pulse(freq, dur, vol=0.4):
+    if CHIPAUDIO_AVAILABLE:
+        return chipaudio.invaders_pulse(freq, dur, vol, SAMPLE_RATE)
     t = np.linspace(0, dur, int(SAMPLE_RATE * dur), False)
     wave = np.sign(np.sin(2 * math.pi * freq * t))
     return make_sound((wave * vol * 32767).astype(np.int16))
 
 def noise(dur, vol=0.4):
+    if CHIPAUDIO_AVAILABLE:
+        return chipaudio.invaders_noise(dur, vol, SAMPLE_RATE)
     mono = (np.random.uniform(-1, 1, int(SAMPLE_RATE * dur)) * vol * 32767).astype(np.int16)
     return make_sound(mono.astype(np.int16))
 
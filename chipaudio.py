@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+CHIPAUDIO — Shared procedural chiptune core
+Vectorized square/pulse/triangle/saw/sine/noise generators with envelopes,
+a content-addressed on-disk cache of rendered buffers, and drop-in adapters
+for the sound APIs of the individual games.
+
+Games import this module optionally and keep their own per-sample synth
+as a fallback when it (or NumPy) is not available:
+
+    try:
+        import chipaudio
+        CHIPAUDIO_AVAILABLE = True
+    except ImportError:
+        CHIPAUDIO_AVAILABLE = False
+
+Run it directly to warm the cache and print timings:  python chipaudio.py
+"""
+
+import os
+import sys
+import array
+import hashlib
+import time
+
+import numpy as np
+import pygame
+
+# ============================================================
+# CONFIG
+# ============================================================
+CACHE_VERSION = 1
+CACHE_DIR = os.environ.get(
+    'CHIPAUDIO_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chip_cache'))
+
+# Rendered buffers for this process, keyed like the files on disk
+_memory = {}
+stats = {'memory': 0, 'disk': 0, 'rendered': 0}
+
+# ============================================================
+# WAVEFORMS
+# ============================================================
+def oscillator(wave, freq, t, duty=0.5, rng=None):
+    """Raw -1..1 waveform at times t (seconds)"""
+    x = t * freq
+    if wave in ('square', 'pulse'):
+        return np.where(x % 1.0 < duty, 1.0, -1.0)
+    if wave == 'triangle':
+        return 2 * np.abs(2 * (x - np.floor(x + 0.5))) - 1
+    if wave in ('saw', 'sawtooth'):
+        return 2 * (x - np.floor(x + 0.5))
+    if wave == 'noise':
+        return (rng or np.random.default_rng()).uniform(-1, 1, len(t))
+    return np.sin(2 * np.pi * x)
+
+def envelope(env, n, sample_rate, duration):
+    """Amplitude envelope for n samples.
+
+    env is None (flat) or a tuple:
+        ('decay', amount)        linear fade to 1 - amount (floored at 0)
+        ('linear',)              linear fade from 1 to exactly 0
+        ('sqrt',)                1 - sqrt(progress)
+        ('ar', attack, release)  linear attack/release ramps, in seconds
+    """
+    if env is None:
+        return np.ones(n)
+    kind = env[0]
+    i = np.arange(n)
+    if kind == 'decay':
+        return np.maximum(0.0, 1.0 - (i / n) * env[1])
+    if kind == 'linear':
+        return np.linspace(1, 0, n)
+    if kind == 'sqrt':
+        return 1 - (i / n) ** 0.5
+    if kind == 'ar':
+        attack, release = env[1], env[2]
+        t = i / sample_rate
+        out = np.ones(n)
+        head = t < attack
+        tail = ~head & (t > duration - release)
+        out[head] = t[head] / attack
+        out[tail] = (duration - t[tail]) / release
+        return out
+    raise ValueError(f"unknown envelope {env!r}")
+
+def synthesize(wave, freq, duration, volume=0.5, sample_rate=44100, duty=0.5, env=None, seed=0):
+    """Render one tone to mono int16 (no caching)"""
+    n = int(sample_rate * duration)
+    t = np.arange(n) / sample_rate
+    rng = np.random.default_rng(seed) if wave == 'noise' else None
+    val = oscillator(wave, freq, t, duty, rng) * envelope(env, n, sample_rate, duration) * volume
+    return np.clip(np.trunc(val * 32767), -32767, 32767).astype(np.int16)
+
+# ============================================================
+# CACHE
+# ============================================================
+def cache_key(*params):
+    """Content address of a buffer: a hash of everything that shapes it"""
+    return hashlib.sha1(repr((CACHE_VERSION,) + params).encode()).hexdigest()
+
+def render(wave, freq, duration, volume=0.5, sample_rate=44100, duty=0.5, env=None):
+    """Cached synthesize(): memory, then chip_cache/<key>.npy, then render and store"""
+    params = (wave, float(freq), float(duration), float(volume), int(sample_rate),
+              float(duty), tuple(env) if env else None)
+    key = cache_key(*params)
+    samples = _memory.get(key)
+    if samples is not None:
+        stats['memory'] += 1
+        return samples
+    path = os.path.join(CACHE_DIR, key + '.npy')
+    try:
+        samples = np.load(path)
+        stats['disk'] += 1
+    except (OSError, ValueError):
+        # Noise is seeded from the key so a cached buffer is reproducible
+        samples = synthesize(*params, seed=int(key[:8], 16))
+        stats['rendered'] += 1
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = f"{path}.tmp{os.getpid()}.npy"
+            np.save(tmp, samples)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    _memory[key] = samples
+    return samples
+
+def clear_cache():
+    """Forget every rendered buffer, in memory and on disk"""
+    _memory.clear()
+    if os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            if name.endswith('.npy'):
+                os.remove(os.path.join(CACHE_DIR, name))
+
+# ============================================================
+# OUTPUT
+# ============================================================
+def to_sound(samples, channels=None):
+    """pygame Sound from mono int16 samples copied to `channels`
+    interleaved channels (default: whatever the mixer opened with)"""
+    if channels is None:
+        init = pygame.mixer.get_init()
+        channels = init[2] if init else 2
+    data = samples if channels == 1 else np.repeat(samples, channels)
+    return pygame.mixer.Sound(buffer=data.tobytes())
+
+def to_array(samples):
+    """array.array('h') copy, for callers that splice buffers together"""
+    return array.array('h', samples.tobytes())
+
+# ============================================================
+# GAME ADAPTERS
+# ============================================================
+# Each adapter mirrors one game's existing synth call: same arguments and
+# return type, and the same waveform, envelope and buffer layout, so the
+# game only has to route the call here.
+
+def soundgen_sound(freq, duration, wave_type='square', vol=0.5):
+    """ultramario1.0a12.26.25.py SoundGen.generate (44.1 kHz, raw mono)"""
+    return to_sound(render(wave_type, freq, duration, vol, 44100), channels=1)
+
+def famicom_square_wave(frequency, duration, duty=0.5, volume=0.15, sample_rate=44100):
+    """Tetris HDR FamicomSoundEngine._square_wave (array('h'), 30% decay)"""
+    return to_array(render('square', frequency, duration, volume, sample_rate, duty, ('decay', 0.3)))
+
+def smash_sound(frequency, duration, volume=0.3, wave_type='square', decay=True):
+    """ultra_smash_64_complete.py SoundManager._create_sound (22.05 kHz stereo)"""
+    env = ('sqrt',) if decay else None
+    return to_sound(render(wave_type, frequency, duration, volume, 22050, env=env), channels=2)
+
+def fnf_tone(frequency, duration, volume=0.3, wave_type='square'):
+    """fnfweekforever4k.py SoundGenerator.generate_tone (10 ms attack, 100 ms release)"""
+    return to_sound(render(wave_type, frequency, duration, volume, 44100, env=('ar', 0.01, 0.1)), channels=2)
+
+def breakout_tone(frequency, duration, volume=0.5, wave_type='square'):
+    """breakout-ce.py generate_tone (linear fade out)"""
+    return to_sound(render(wave_type, frequency, duration, volume, 44100, env=('linear',)), channels=2)
+
+def invaders_pulse(freq, dur, vol=0.4, sample_rate=44100):
+    """chatgptspaceinvaders4k##.py pulse"""
+    return to_sound(render('square', freq, dur, vol, sample_rate), channels=2)
+
+def invaders_noise(dur, vol=0.4, sample_rate=44100):
+    """chatgptspaceinvaders4k##.py noise"""
+    return to_sound(render('noise', 0, dur, vol, sample_rate), channels=2)
+
+def megacat_sfx(freq, dur, wave='square', vol=0.2, decay=0.7):
+    """cat'sultramegaman2.py synth_sfx (22.05 kHz stereo, linear decay)"""
+    if int(22050 * dur) < 1:
+        return None
+    # Its square and triangle start on the opposite half-cycle
+    if wave in ('square', 'triangle'):
+        vol = -vol
+    return to_sound(render(wave, freq, dur, vol, 22050, env=('decay', decay)), channels=2)
+
+# ============================================================
+# BENCHMARK / WARM-UP
+# ============================================================
+if __name__ == "__main__":
+    # Dummy drivers let the cache be warmed on a headless machine
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.mixer.init(44100, -16, 2)
+    if '--clear' in sys.argv:
+        clear_cache()
+    tones = [(w, f, d, 0.3) for w in ('square', 'triangle', 'saw', 'sine', 'noise')
+             for f in (110, 220, 440, 880) for d in (0.05, 0.1, 0.5)]
+    for label in ('first pass', 'memory'):
+        t0 = time.perf_counter()
+        for tone in tones:
+            render(*tone)
+        print(f"  {label:10s}: {len(tones)} buffers in {(time.perf_counter() - t0) * 1000:7.2f} ms")
+    _memory.clear()
+    t0 = time.perf_counter()
+    for tone in tones:
+        render(*tone)
+    print(f"  {'disk':10s}: {len(tones)} buffers in {(time.perf_counter() - t0) * 1000:7.2f} ms")
+    print(f"  cache: {CACHE_DIR}  {stats}")
@@ -220,6 +220,298 @@ class Chip8:
         if 0 <= k <= 15:
             self.keys[k] = 0
 
+    def run_cycles(self, count):
+        """Execute up to `count` instructions; returns how many actually ran."""
+        if self.paused:
+            return 0
+        for i in range(count):
+            if self.waiting_key:
+                return i
+            self.cycle()
+        return count
+
+
+class FastChip8(Chip8):
+    """Decode-once variant of Chip8. Each word is decoded into a cached
+    (handler, x, y, n, nn, nnn) tuple per even address; FX33/FX55 drop the
+    entries they overwrite so self-modifying ROMs still behave."""
+
+    def __init__(self):
+        super().__init__()
+        self.decoded = [None] * 2048
+        self._main_ops = {
+            0x1: self._op_jp, 0x2: self._op_call, 0x3: self._op_se_nn,
+            0x4: self._op_sne_nn, 0x5: self._op_se_vy, 0x6: self._op_ld_nn,
+            0x7: self._op_add_nn, 0x9: self._op_sne_vy, 0xA: self._op_ld_i,
+            0xB: self._op_jp_v0, 0xC: self._op_rnd, 0xD: self._op_drw,
+        }
+        self._alu_ops = {
+            0x0: self._op_ld_vy, 0x1: self._op_or, 0x2: self._op_and,
+            0x3: self._op_xor, 0x4: self._op_add_vy, 0x5: self._op_sub,
+            0x6: self._op_shr, 0x7: self._op_subn, 0xE: self._op_shl,
+        }
+        self._key_ops = {0x9E: self._op_skp, 0xA1: self._op_sknp}
+        self._misc_ops = {
+            0x07: self._op_ld_dt, 0x0A: self._op_ld_key, 0x15: self._op_set_dt,
+            0x18: self._op_set_st, 0x1E: self._op_add_i, 0x29: self._op_ld_font,
+            0x33: self._op_bcd, 0x55: self._op_store, 0x65: self._op_restore,
+        }
+
+    def load(self, rom):
+        super().load(rom)
+        self.decoded = [None] * 2048
+
+    def decode(self, op):
+        x = (op >> 8) & 0xF
+        y = (op >> 4) & 0xF
+        n = op & 0xF
+        nn = op & 0xFF
+        nnn = op & 0xFFF
+        hi = op >> 12
+
+        if op == 0x00E0:
+            handler = self._op_cls
+        elif op == 0x00EE:
+            handler = self._op_ret
+        elif hi == 0x8:
+            handler = self._alu_ops.get(n, self._op_nop)
+        elif hi == 0xE:
+            handler = self._key_ops.get(nn, self._op_nop)
+        elif hi == 0xF:
+            handler = self._misc_ops.get(nn, self._op_nop)
+        else:
+            handler = self._main_ops.get(hi, self._op_nop)
+        return (handler, x, y, n, nn, nnn)
+
+    def invalidate(self, addr, length):
+        """Drop cached decodes overlapping memory[addr:addr + length]."""
+        decoded = self.decoded
+        for i in range(addr >> 1, min(((addr + length - 1) >> 1) + 1, 2048)):
+            decoded[i] = None
+
+    def cycle(self):
+        if self.paused or self.waiting_key:
+            return
+        self.run_cycles(1)
+
+    def run_cycles(self, count):
+        if self.paused:
+            return 0
+        decoded = self.decoded
+        memory = self.memory
+        decode = self.decode
+        for i in range(count):
+            if self.waiting_key:
+                return i
+            pc = self.pc
+            if pc < 0x200 or pc > 0xFFE:
+                self.pc = 0x200
+                continue
+            if pc & 1:
+                entry = decode((memory[pc] << 8) | memory[pc + 1])
+            else:
+                entry = decoded[pc >> 1]
+                if entry is None:
+                    entry = decoded[pc >> 1] = decode((memory[pc] << 8) | memory[pc + 1])
+            self.pc = pc + 2
+            handler, x, y, n, nn, nnn = entry
+            handler(x, y, n, nn, nnn)
+        return count
+
+    def _op_nop(self, x, y, n, nn, nnn):
+        pass
+
+    def _op_cls(self, x, y, n, nn, nnn):
+        self.display = [[0] * WIDTH for _ in range(HEIGHT)]
+
+    def _op_ret(self, x, y, n, nn, nnn):
+        if self.stack:
+            self.pc = self.stack.pop()
+
+    def _op_jp(self, x, y, n, nn, nnn):
+        self.pc = nnn
+
+    def _op_call(self, x, y, n, nn, nnn):
+        self.stack.append(self.pc)
+        self.pc = nnn
+
+    def _op_se_nn(self, x, y, n, nn, nnn):
+        if self.V[x] == nn:
+            self.pc += 2
+
+    def _op_sne_nn(self, x, y, n, nn, nnn):
+        if self.V[x] != nn:
+            self.pc += 2
+
+    def _op_se_vy(self, x, y, n, nn, nnn):
+        V = self.V
+        if V[x] == V[y]:
+            self.pc += 2
+
+    def _op_sne_vy(self, x, y, n, nn, nnn):
+        V = self.V
+        if V[x] != V[y]:
+            self.pc += 2
+
+    def _op_ld_nn(self, x, y, n, nn, nnn):
+        self.V[x] = nn
+
+    def _op_add_nn(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] = (V[x] + nn) & 0xFF
+
+    def _op_ld_vy(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] = V[y]
+
+    def _op_or(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] |= V[y]
+
+    def _op_and(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] &= V[y]
+
+    def _op_xor(self, x, y, n, nn, nnn):
+        V = self.V
+        V[x] ^= V[y]
+
+    def _op_add_vy(self, x, y, n, nn, nnn):
+        V = self.V
+        s = V[x] + V[y]
+        V[x] = s & 0xFF
+        V[0xF] = 1 if s > 255 else 0
+
+    def _op_sub(self, x, y, n, nn, nnn):
+        V = self.V
+        f = 1 if V[x] >= V[y] else 0
+        V[x] = (V[x] - V[y]) & 0xFF
+        V[0xF] = f
+
+    def _op_shr(self, x, y, n, nn, nnn):
+        V = self.V
+        f = V[x] & 1
+        V[x] >>= 1
+        V[0xF] = f
+
+    def _op_subn(self, x, y, n, nn, nnn):
+        V = self.V
+        f = 1 if V[y] >= V[x] else 0
+        V[x] = (V[y] - V[x]) & 0xFF
+        V[0xF] = f
+
+    def _op_shl(self, x, y, n, nn, nnn):
+        V = self.V
+        f = (V[x] >> 7) & 1
+        V[x] = (V[x] << 1) & 0xFF
+        V[0xF] = f
+
+    def _op_ld_i(self, x, y, n, nn, nnn):
+        self.I = nnn
+
+    def _op_jp_v0(self, x, y, n, nn, nnn):
+        self.pc = (nnn + self.V[0]) & 0xFFF
+
+    def _op_rnd(self, x, y, n, nn, nnn):
+        self.V[x] = random.randint(0, 255) & nn
+
+    def _op_drw(self, x, y, n, nn, nnn):
+        V = self.V
+        memory = self.memory
+        display = self.display
+        vx, vy = V[x] & 63, V[y] & 31
+        V[0xF] = 0
+        for row in range(n):
+            if self.I + row >= 4096:
+                break
+            sprite = memory[self.I + row]
+            line = display[(vy + row) & 31]
+            for col in range(8):
+                if sprite & (0x80 >> col):
+                    px = (vx + col) & 63
+                    if line[px]:
+                        V[0xF] = 1
+                    line[px] ^= 1
+
+    def _op_skp(self, x, y, n, nn, nnn):
+        if self.keys[self.V[x] & 0xF]:
+            self.pc += 2
+
+    def _op_sknp(self, x, y, n, nn, nnn):
+        if not self.keys[self.V[x] & 0xF]:
+            self.pc += 2
+
+    def _op_ld_dt(self, x, y, n, nn, nnn):
+        self.V[x] = self.delay_timer
+
+    def _op_ld_key(self, x, y, n, nn, nnn):
+        self.waiting_key = True
+        self.key_reg = x
+
+    def _op_set_dt(self, x, y, n, nn, nnn):
+        self.delay_timer = self.V[x]
+
+    def _op_set_st(self, x, y, n, nn, nnn):
+        self.sound_timer = self.V[x]
+
+    def _op_add_i(self, x, y, n, nn, nnn):
+        self.I = (self.I + self.V[x]) & 0xFFF
+
+    def _op_ld_font(self, x, y, n, nn, nnn):
+        self.I = (self.V[x] & 0xF) * 5
+
+    def _op_bcd(self, x, y, n, nn, nnn):
+        if self.I < 4094:
+            v = self.V[x]
+            self.memory[self.I] = v // 100
+            self.memory[self.I + 1] = (v // 10) % 10
+            self.memory[self.I + 2] = v % 10
+            self.invalidate(self.I, 3)
+
+    def _op_store(self, x, y, n, nn, nnn):
+        for i in range(x + 1):
+            if self.I + i < 4096:
+                self.memory[self.I + i] = self.V[i]
+        self.invalidate(self.I, x + 1)
+
+    def _op_restore(self, x, y, n, nn, nnn):
+        for i in range(x + 1):
+            if self.I + i < 4096:
+                self.V[i] = self.memory[self.I + i]
+
+
+def benchmark(million_cycles=1.0, cycles_per_frame=1000, seed=1234):
+    """Run the Pong ROM headless on both cores and print instructions/second.
+
+    Every `cycles_per_frame` instructions the timers tick once; a blocked
+    FX0A is released by tapping key 1. Both cores share the RNG seed, so
+    their final state must agree."""
+    import time
+
+    total = int(million_cycles * 1_000_000)
+    frames = max(1, total // cycles_per_frame)
+    print(f"CHIP-8 core benchmark: PONG, {frames * cycles_per_frame:,} cycle budget")
+
+    results = []
+    for core in (Chip8, FastChip8):
+        chip = core()
+        chip.load(PONG_ROM)
+        random.seed(seed)
+        executed = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            executed += chip.run_cycles(cycles_per_frame)
+            chip.tick_timers()
+            if chip.waiting_key:
+                chip.press(0x1)
+                chip.release(0x1)
+        elapsed = time.perf_counter() - start
+        ips = executed / elapsed
+        results.append((chip.pc, chip.I, list(chip.V), chip.display))
+        print(f"  {core.__name__:<10}{ips:>14,.0f} instructions/s")
+
+    print("  states match" if results[0] == results[1] else "  STATE MISMATCH")
+
 
 class Controller:
     def __init__(self):
@@ -267,7 +559,7 @@ class Controller:
         return False
 
 
-def main():
+def main(fast_core=False):
     pygame.init()
     pygame.mixer.init(22050, -16, 1, 512)
 
@@ -285,7 +577,7 @@ def main():
         font_small = pygame.font.Font(None, 14)
         font_menu = pygame.font.Font(None, 15)
 
-    chip = Chip8()
+    chip = FastChip8() if fast_core else Chip8()
     chip.load(PONG_ROM)
 
     ctrl = Controller()
@@ -357,8 +649,7 @@ def main():
 
         # Emulate
         if not chip.paused:
-            for _ in range(10):
-                chip.cycle()
+            chip.run_cycles(10)
             chip.tick_timers()
             if chip.sound_timer > 0 and beep:
                 if not pygame.mixer.get_busy():
@@ -427,5 +718,17 @@ def main():
     sys.exit()
 
 
+def arg_value(flag, default, cast=int):
+    """Value following `flag` on the command line, or `default`"""
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv) and not sys.argv[idx + 1].startswith("--"):
+            return cast(sys.argv[idx + 1])
+    return default
+
+
 if __name__ == "__main__":
-    main()
+    if "--bench" in sys.argv:
+        benchmark(arg_value("--bench", 1.0, float))
+        sys.exit()
+    main(fast_core="--fast" in sys.argv)
@@ -16,6 +16,12 @@ from dataclasses import dataclass
 from typing import List, Dict, Tuple, Optional
 from enum import Enum
 
+try:
+    import chipaudio
+    CHIPAUDIO_AVAILABLE = True
+except ImportError:
+    CHIPAUDIO_AVAILABLE = False
+
 # Initialize Pygame
 pygame.init()
 pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
@@ -314,6 +320,8 @@ class SoundGenerator:
     @staticmethod
     def generate_tone(frequency, duration, volume=0.3, wave_type='square'):
         """Generate a tone as a pygame Sound object"""
+        if CHIPAUDIO_AVAILABLE:
+            return chipaudio.fnf_tone(frequency, duration, volume, wave_type)
         sample_rate = 44100
         n_samples = int(sample_rate * duration)
         
@@ -10,6 +10,7 @@ Pure Tkinter • Procedural Audio • FILES = OFF
 
 import tkinter as tk
 import math
+import sys
 import struct
 import array
 import threading
@@ -25,8 +26,169 @@ try:
 except ImportError:
     AUDIO_AVAILABLE = False
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 SAMPLE_RATE = 22050
 AUDIO_BUFFER = 1024
+RING_CHUNKS = 4  # Ring buffer depth in AUDIO_BUFFER-sized chunks
+
+class RingBuffer:
+    """Fixed-size int16 sample ring between the synth thread and the output callback"""
+    
+    def __init__(self, size):
+        self.data = np.zeros(size, dtype=np.int16)
+        self.size = size
+        self.start = 0
+        self.count = 0
+        self.underruns = 0
+        self.cond = threading.Condition()
+    
+    def clear(self):
+        with self.cond:
+            self.start = 0
+            self.count = 0
+            self.cond.notify_all()
+    
+    def wait_for_space(self, n, timeout=0.1):
+        with self.cond:
+            return self.cond.wait_for(lambda: self.size - self.count >= n, timeout)
+    
+    def write(self, block):
+        with self.cond:
+            n = min(len(block), self.size - self.count)
+            end = (self.start + self.count) % self.size
+            first = min(n, self.size - end)
+            self.data[end:end + first] = block[:first]
+            self.data[:n - first] = block[first:n]
+            self.count += n
+    
+    def read(self, n):
+        """Pop n samples as bytes, padding with silence on underrun"""
+        out = np.zeros(n, dtype=np.int16)
+        with self.cond:
+            take = min(n, self.count)
+            first = min(take, self.size - self.start)
+            out[:first] = self.data[self.start:self.start + first]
+            out[first:take] = self.data[:take - first]
+            self.start = (self.start + take) % self.size
+            self.count -= take
+            if take < n:
+                self.underruns += 1
+            self.cond.notify_all()
+        return out.tobytes()
+
+class APUSynth:
+    """Block-based NES APU-style synthesizer.
+    
+    Channels are rendered a whole note segment at a time with NumPy: pulse
+    channels compare their phase against the duty cycle exactly as
+    AudioEngine.generate_square does, the triangle indexes a 32-step table,
+    and noise replays a precomputed 15-bit LFSR sequence. The synth keeps its
+    place in the track between blocks, so any block size can be streamed.
+    """
+    LFSR_SEQUENCE = None
+    
+    def __init__(self, volume, tempo):
+        self.volume = volume
+        self.tempo = tempo
+        self.triangle = np.abs(np.arange(32) - 15.5) / 7.75 - 1
+        self.noise = self.lfsr_sequence()
+        self.next_track = None
+        self.notes = []
+        self.note_idx = 0
+        self.note_pos = 0
+        # CPU accounting: seconds spent rendering vs. samples produced
+        self.render_time = 0.0
+        self.rendered = 0
+    
+    @classmethod
+    def lfsr_sequence(cls):
+        """One full period of the NES noise LFSR (long mode) as +/-1"""
+        if cls.LFSR_SEQUENCE is None:
+            reg = 1
+            bits = bytearray(32767)
+            for i in range(32767):
+                bits[i] = reg & 1
+                reg = (reg >> 1) | (((reg ^ (reg >> 1)) & 1) << 14)
+            cls.LFSR_SEQUENCE = np.frombuffer(bytes(bits), dtype=np.uint8).astype(np.float64) * 2 - 1
+        return cls.LFSR_SEQUENCE
+    
+    def load(self, next_track):
+        """Start streaming; next_track() is called for a fresh track whenever one ends"""
+        self.next_track = next_track
+        self.notes = []
+        self.note_idx = 0
+        self.note_pos = 0
+    
+    def compile_track(self, track):
+        beat_dur = 60.0 / self.tempo / 4  # 16th note
+        notes = []
+        for note_data in track:
+            span = SAMPLE_RATE * note_data.get('d', 1) * beat_dur
+            freqs = tuple(AudioEngine.note_freq(note_data.get(k, 0)) for k in ('p1', 'p2', 'tri'))
+            notes.append((span,) + freqs + (note_data.get('n', 0),))
+        return notes
+    
+    def note_block(self, i, span, f1, f2, ft, noise):
+        """Samples i (indices within the note) of one note, all channels mixed
+        
+        span is the note's exact length in samples; the pulse release is
+        measured from it rather than the truncated sample count, as in
+        generate_square.
+        """
+        amp = 32767 * self.volume
+        out = np.zeros(len(i), dtype=np.float64)
+        if f1 or f2:
+            env = np.minimum(1.0, (span - i) / (SAMPLE_RATE * 0.05)) * (amp * 0.5)
+            for freq, duty in ((f1, 0.25), (f2, 0.125)):
+                if freq:
+                    period = SAMPLE_RATE / freq
+                    t = (i % period) / period
+                    # Truncate per channel like the int() in generate_square
+                    out += np.trunc(np.where(t < duty, 1.0, -1.0) * env)
+        if ft:
+            phase = (i * (ft / SAMPLE_RATE)) % 1.0
+            out += self.triangle[(phase * 32).astype(np.intp)] * (amp * 0.4)
+        if noise:
+            step = max(1, int(100 / noise))
+            out += self.noise[(i // step) % len(self.noise)] * (amp * 0.15)
+        return out
+    
+    def render(self, n):
+        """Render the next n samples as int16"""
+        t0 = time.perf_counter()
+        out = np.zeros(n, dtype=np.float64)
+        pos = 0
+        while pos < n and self.next_track:
+            if self.note_idx >= len(self.notes):
+                self.notes = self.compile_track(self.next_track())
+                self.note_idx = 0
+                self.note_pos = 0
+                if not self.notes:
+                    break
+            span, f1, f2, ft, noise = self.notes[self.note_idx]
+            length = int(span)
+            take = min(n - pos, length - self.note_pos)
+            if take > 0:
+                i = np.arange(self.note_pos, self.note_pos + take)
+                out[pos:pos + take] = self.note_block(i, span, f1, f2, ft, noise)
+                pos += take
+                self.note_pos += take
+            if self.note_pos >= length:
+                self.note_idx += 1
+                self.note_pos = 0
+        block = np.clip(out, -32767, 32767).astype(np.int16)
+        self.render_time += time.perf_counter() - t0
+        self.rendered += n
+        return block
+    
+    def cpu_load(self):
+        """Fraction of real time spent synthesizing (render seconds per audio second)"""
+        return self.render_time * SAMPLE_RATE / self.rendered if self.rendered else 0.0
 
 class AudioEngine:
     """NES-style procedural audio synthesizer"""
@@ -37,6 +199,18 @@ class AudioEngine:
         self.track_pos = 0
         self.tempo = 140  # BPM
         self.volume = 0.05
+        self.audio_thread = None
+        
+        # With NumPy, music is synthesized in blocks and streamed through a
+        # ring buffer to the output callback; otherwise whole tracks are
+        # rendered per sample and written with blocking writes.
+        if NUMPY_AVAILABLE:
+            self.synth = APUSynth(self.volume, self.tempo)
+            self.ring = RingBuffer(AUDIO_BUFFER * RING_CHUNKS)
+            self.synth_lock = threading.Lock()
+        else:
+            self.synth = None
+            self.ring = None
         
         if AUDIO_AVAILABLE:
             try:
@@ -46,9 +220,9 @@ class AudioEngine:
                     channels=1,
                     rate=SAMPLE_RATE,
                     output=True,
-                    frames_per_buffer=AUDIO_BUFFER
+                    frames_per_buffer=AUDIO_BUFFER,
+                    stream_callback=self._callback if self.synth else None
                 )
-                self.audio_thread = None
             except:
                 self.pa = None
                 self.stream = None
@@ -56,7 +230,8 @@ class AudioEngine:
             self.pa = None
             self.stream = None
     
-    def note_freq(self, note):
+    @staticmethod
+    def note_freq(note):
         """Convert MIDI note to frequency"""
         if note == 0:
             return 0
@@ -119,6 +294,20 @@ class AudioEngine:
             return
         
         self.current_track = track_name
+        
+        if self.synth:
+            # Swap tracks under the lock so no stale block lands after the clear
+            with self.synth_lock:
+                self.synth.load(lambda: self.get_track_data(track_name))
+                self.ring.clear()
+            if not self.playing and self.audio_thread:
+                self.audio_thread.join(timeout=0.5)  # let a stopped feeder finish exiting
+            self.playing = True
+            if not (self.audio_thread and self.audio_thread.is_alive()):
+                self.audio_thread = threading.Thread(target=self._synth_loop, daemon=True)
+                self.audio_thread.start()
+            return
+        
         self.playing = True
         
         if self.audio_thread and self.audio_thread.is_alive():
@@ -132,6 +321,26 @@ class AudioEngine:
     def stop(self):
         """Stop audio playback"""
         self.playing = False
+        if self.synth:
+            with self.synth_lock:
+                self.synth.load(None)
+                self.ring.clear()
+    
+    def cpu_load(self):
+        """Synth CPU time per second of audio (0 when not streaming)"""
+        return self.synth.cpu_load() if self.synth else 0.0
+    
+    def _callback(self, in_data, frame_count, time_info, status):
+        """PortAudio output callback: drain one buffer from the ring"""
+        return self.ring.read(frame_count), pyaudio.paContinue
+    
+    def _synth_loop(self):
+        """Keep the ring buffer topped up, one AUDIO_BUFFER block at a time"""
+        while self.playing and self.stream:
+            if not self.ring.wait_for_space(AUDIO_BUFFER):
+                continue
+            with self.synth_lock:
+                self.ring.write(self.synth.render(AUDIO_BUFFER))
     
     def _audio_loop(self):
         """Background audio playback thread"""
@@ -317,6 +526,31 @@ class AudioEngine:
         if self.pa:
             self.pa.terminate()
 
+def benchmark_audio(seconds=10.0):
+    """Per-sample vs. block synthesis cost per second of audio (--bench-audio)"""
+    engine = AudioEngine()
+    random.seed(1)
+    track = engine.generate_dynamic_track('1-1')
+    n = int(SAMPLE_RATE * seconds)
+    
+    t0 = time.perf_counter()
+    rendered = 0
+    while rendered < n:
+        rendered += len(engine.render_track(track))
+    legacy = (time.perf_counter() - t0) / (rendered / SAMPLE_RATE)
+    print(f"  per-sample render_track : {legacy * 1000:7.2f} ms per audio second")
+    
+    if not NUMPY_AVAILABLE:
+        print("  NumPy not installed; block synth unavailable")
+        return
+    synth = APUSynth(engine.volume, engine.tempo)
+    synth.load(lambda: track)
+    t0 = time.perf_counter()
+    for _ in range(n // AUDIO_BUFFER):
+        synth.render(AUDIO_BUFFER)
+    print(f"  APUSynth {AUDIO_BUFFER}-sample blocks: {synth.cpu_load() * 1000:7.2f} ms per audio second "
+          f"({synth.render_time * 1000 / (n // AUDIO_BUFFER):.2f} ms per block)")
+
 # ============================================================
 # ENGINE CONFIG
 # ============================================================
@@ -864,40 +1098,194 @@ class Phys:
 # OPTIMIZED RENDERER
 # ============================================================
 class Renderer:
+    """Retained-mode renderer.
+
+    Every sprite (and its mirrored variant) is rasterized once into a scaled
+    PhotoImage. Canvas items are kept in a persistent pool: each frame the
+    draw calls claim pool slots in order and only move/reconfigure the items
+    that changed, instead of recreating one rectangle per sprite pixel.
+    """
     def __init__(self, canvas, scale):
         self.canvas = canvas
         self.scale = scale
-        # Pre-compute color lookups
-        self.color_cache = {}
+        # (id(sprite), flip) -> (sprite, PhotoImage); the sprite is kept so its id stays unique
+        self.images = {}
+        # Pool slots in stacking order: [item, kind, coords, config]
+        self.slots = []
+        self.cursor = 0
+        self.shown = 0
     
-    def draw(self, x, y, sprite, flip=False):
-        """Optimized sprite drawing"""
+    def sprite_image(self, sprite, flip=False):
+        key = (id(sprite), flip)
+        entry = self.images.get(key)
+        if entry is None:
+            entry = self.images[key] = (sprite, self.rasterize(sprite, flip))
+        return entry[1]
+    
+    def rasterize(self, sprite, flip=False):
+        """Bake a sprite into a PhotoImage, one put() per run of equal pixels"""
         s = self.scale
+        w = max((len(row) for row in sprite), default=1)
+        img = tk.PhotoImage(width=w * s, height=max(len(sprite), 1) * s)
         for ri, row in enumerate(sprite):
-            for ci, ch in enumerate(row):
-                if ch == '_':
-                    continue
-                col = PAL.get(ch)
-                if not col:
-                    continue
-                px = x + (len(row) - 1 - ci if flip else ci) * s
-                py = y + ri * s
-                self.canvas.create_rectangle(
-                    px, py, px + s, py + s,
-                    fill=col, outline=col, width=0
-                )
+            if flip:
+                row = row[::-1]
+            ci = 0
+            while ci < len(row):
+                end = ci + 1
+                while end < len(row) and row[end] == row[ci]:
+                    end += 1
+                col = PAL.get(row[ci])
+                if col:
+                    img.put(col, to=(ci * s, ri * s, end * s, (ri + 1) * s))
+                ci = end
+        return img
+    
+    def begin_frame(self):
+        self.cursor = 0
+    
+    def end_frame(self):
+        """Hide pool items that were not claimed this frame"""
+        for slot in self.slots[self.cursor:self.shown]:
+            self.canvas.itemconfigure(slot[0], state='hidden')
+            slot[3] = None
+        self.shown = self.cursor
+    
+    def item_count(self):
+        return len(self.canvas.find_all())
+    
+    def _create(self, kind, coords, config):
+        if kind == 'image':
+            return self.canvas.create_image(*coords, anchor='nw', **config)
+        if kind == 'rect':
+            return self.canvas.create_rectangle(*coords, width=0, **config)
+        return self.canvas.create_text(*coords, **config)
+    
+    def _claim(self, kind, coords, config):
+        i = self.cursor
+        self.cursor += 1
+        if i < len(self.slots):
+            slot = self.slots[i]
+            if slot[1] == kind:
+                item = slot[0]
+                if slot[2] != coords:
+                    self.canvas.coords(item, *coords)
+                    slot[2] = coords
+                if slot[3] is None:
+                    self.canvas.itemconfigure(item, state='normal', **config)
+                    slot[3] = config
+                elif slot[3] != config:
+                    self.canvas.itemconfigure(item, **config)
+                    slot[3] = config
+                return
+            # Kind changed at this depth: replace the item in place
+            item = self._create(kind, coords, config)
+            if i + 1 < len(self.slots):
+                self.canvas.tag_lower(item, self.slots[i + 1][0])
+            self.canvas.delete(slot[0])
+            self.slots[i] = [item, kind, coords, config]
+            return
+        self.slots.append([self._create(kind, coords, config), kind, coords, config])
+    
+    def draw(self, x, y, sprite, flip=False):
+        self._claim('image', (x, y), {'image': self.sprite_image(sprite, flip)})
     
     def rect(self, x, y, w, h, color):
-        self.canvas.create_rectangle(x, y, x + w, y + h, fill=color, outline=color, width=0)
+        self._claim('rect', (x, y, x + w, y + h), {'fill': color, 'outline': color})
     
     def text(self, x, y, txt, color='#FCFCFC', size=8, anchor='nw'):
-        self.canvas.create_text(x, y, text=txt, fill=color, font=('Courier', size, 'bold'), anchor=anchor)
+        self._claim('text', (x, y), {'text': txt, 'fill': color,
+                                     'font': ('Courier', size, 'bold'), 'anchor': anchor})
+
+class FramebufferRenderer(Renderer):
+    """Software framebuffer backend.
+
+    Sprites and rects are composited into an NES-resolution RGB bytearray,
+    which is pushed to a single PhotoImage once per frame as PPM data and
+    zoomed onto the canvas. Tk work stays at one image update per frame no
+    matter how busy the scene is; only text still uses pooled canvas items.
+    """
+    def __init__(self, canvas, scale):
+        super().__init__(canvas, scale)
+        self.w, self.h = NES_W, NES_H
+        self.buf = bytearray(self.w * self.h * 3)
+        self.header = b'P6 %d %d 255\n' % (self.w, self.h)
+        self.rgb = {}
+        # (id(sprite), flip) -> (sprite, [(row, col, rgb bytes)]) opaque pixel runs
+        self.runs = {}
+        self.frame_img = tk.PhotoImage(width=self.w, height=self.h)
+        self.screen_img = tk.PhotoImage(width=self.w * scale, height=self.h * scale)
+        self.item = canvas.create_image(0, 0, image=self.screen_img, anchor='nw')
+        canvas.tag_lower(self.item)
+    
+    def color_bytes(self, color):
+        rgb = self.rgb.get(color)
+        if rgb is None:
+            rgb = self.rgb[color] = bytes.fromhex(color[1:])
+        return rgb
+    
+    def sprite_runs(self, sprite, flip=False):
+        key = (id(sprite), flip)
+        entry = self.runs.get(key)
+        if entry is None:
+            runs = []
+            for ri, row in enumerate(sprite):
+                if flip:
+                    row = row[::-1]
+                ci = 0
+                while ci < len(row):
+                    if not PAL.get(row[ci]):
+                        ci += 1
+                        continue
+                    start = ci
+                    px = bytearray()
+                    while ci < len(row) and PAL.get(row[ci]):
+                        px += self.color_bytes(PAL[row[ci]])
+                        ci += 1
+                    runs.append((ri, start, bytes(px)))
+            entry = self.runs[key] = (sprite, runs)
+        return entry[1]
+    
+    def draw(self, x, y, sprite, flip=False):
+        s = self.scale
+        x, y = int(x) // s, int(y) // s
+        w, h, buf = self.w, self.h, self.buf
+        for ri, ci, px in self.sprite_runs(sprite, flip):
+            py = y + ri
+            if py < 0 or py >= h:
+                continue
+            x0 = x + ci
+            x1 = x0 + len(px) // 3
+            if x1 <= 0 or x0 >= w:
+                continue
+            if x0 < 0 or x1 > w:
+                px = px[max(0, -x0) * 3:len(px) - max(0, x1 - w) * 3]
+                x0 = max(0, x0)
+            off = (py * w + x0) * 3
+            buf[off:off + len(px)] = px
+    
+    def rect(self, x, y, w, h, color):
+        s = self.scale
+        x0, y0 = max(0, int(x) // s), max(0, int(y) // s)
+        x1, y1 = min(self.w, -(-int(x + w) // s)), min(self.h, -(-int(y + h) // s))
+        if x0 >= x1 or y0 >= y1:
+            return
+        line = self.color_bytes(color) * (x1 - x0)
+        for py in range(y0, y1):
+            off = (py * self.w + x0) * 3
+            self.buf[off:off + len(line)] = line
+    
+    def end_frame(self):
+        tk_call = self.canvas.tk.call
+        tk_call(self.frame_img, 'put', self.header + self.buf, '-format', 'ppm')
+        tk_call(self.screen_img, 'copy', self.frame_img, '-zoom', self.scale, self.scale)
+        super().end_frame()
 
 # ============================================================
 # GAME
 # ============================================================
 class Game:
-    def __init__(self, root):
+    def __init__(self, root, framebuffer=False):
         self.root = root
         root.title("ULTRA MARIO 2D BROS V0 — Complete Edition")
         root.geometry(f"{WIDTH}x{HEIGHT}")
@@ -907,7 +1295,7 @@ class Game:
         self.canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT, bg=SKY, highlightthickness=0)
         self.canvas.pack()
         
-        self.r = Renderer(self.canvas, SCALE)
+        self.r = (FramebufferRenderer if framebuffer else Renderer)(self.canvas, SCALE)
         
         # Audio
         self.audio = AudioEngine()
@@ -935,6 +1323,10 @@ class Game:
         
         self.particles = []
         
+        # Debug overlay (F3): smoothed frame time and live Tk item count
+        self.debug = False
+        self.frame_ms = 0.0
+        
         self.loop()
     
     def cleanup(self, event=None):
@@ -943,7 +1335,12 @@ class Game:
         self.audio.close()
     
     def loop(self):
-        self.canvas.delete('all')
+        t0 = time.perf_counter()
+        self.r.begin_frame()
+        
+        if 'f3' in self.keys:
+            self.keys.discard('f3')
+            self.debug = not self.debug
         
         if self.state == 'menu':
             self.update_menu()
@@ -961,9 +1358,20 @@ class Game:
             self.draw_clear()
             self.update_clear()
         
+        if self.debug:
+            self.draw_debug()
+        self.r.end_frame()
+        
+        self.frame_ms += ((time.perf_counter() - t0) * 1000 - self.frame_ms) * 0.1
         self.frame += 1
         self.root.after(FRAME_MS, self.loop)
     
+    def draw_debug(self):
+        self.r.rect(WIDTH - 150 * SCALE, HEIGHT - 12 * SCALE, 150 * SCALE, 12 * SCALE, '#000000')
+        self.r.text(WIDTH - 4 * SCALE, HEIGHT - 3 * SCALE,
+                    f"{self.frame_ms:5.2f}MS  {self.r.item_count()} ITEMS  APU {self.audio.cpu_load():.1%}",
+                    '#00FC00', 5 * SCALE // 2, 'se')
+    
     # ========== MENU ==========
     def update_menu(self):
         if 'up' in self.keys:
@@ -1455,6 +1863,10 @@ class Game:
 # MAIN
 # ============================================================
 if __name__ == "__main__":
+    if '--bench-audio' in sys.argv:
+        benchmark_audio()
+        sys.exit()
+    
     print("=" * 60)
     print("  ULTRA MARIO 2D BROS V0 — COMPLETE EDITION")
     print("  32 Levels (World 1-1 to 8-4)")
@@ -1467,6 +1879,8 @@ if __name__ == "__main__":
     print("    ← →  / A D   : Move")
     print("    Z / Space / W : Jump")
     print("    X / Shift     : Run")
+    print("    F3            : Debug overlay")
+    print("    (run with --framebuffer for the single-image backend)")
     print("\n  Level Types:")
     print("    X-1, X-3 : Overworld (blue sky)")
     print("    X-2      : Underground (black)")
@@ -1478,5 +1892,5 @@ if __name__ == "__main__":
         print("    pip install pyaudio")
     
     root = tk.Tk()
-    game = Game(root)
+    game = Game(root, framebuffer='--framebuffer' in sys.argv)
     root.mainloop()
@@ -1,6 +1,10 @@
 """
 Super Mario 64 3D Clone - College English Version
 A 3D platformer using pygame-ce with OpenGL rendering
+
+Flags:
+--immediate      rebuild every mesh each frame with glBegin/glEnd (old path)
+--alloc-report   print Python allocations per frame over ALLOC_FRAMES, then exit
 """
 
 import pygame
@@ -9,10 +13,18 @@ from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import math
+import sys
+import tracemalloc
 from collections import defaultdict
 
+IMMEDIATE = '--immediate' in sys.argv
+ALLOC_REPORT = '--alloc-report' in sys.argv
+ALLOC_FRAMES = 300
+
 class Vector3:
     """3D vector class for position and movement"""
+    __slots__ = ("x", "y", "z")
+
     def __init__(self, x=0, y=0, z=0):
         self.x = x
         self.y = y
@@ -30,6 +42,106 @@ class Vector3:
             return Vector3(self.x/length, self.y/length, self.z/length)
         return Vector3(0, 0, 0)
 
+# Unit cube corners and edge pairs, in the old draw_cube vertex order
+CUBE_CORNERS = np.array([
+    [0.5, 0.5, -0.5], [-0.5, 0.5, -0.5], [-0.5, -0.5, -0.5], [0.5, -0.5, -0.5],
+    [0.5, 0.5, 0.5], [-0.5, 0.5, 0.5], [-0.5, -0.5, 0.5], [0.5, -0.5, 0.5]
+], dtype=np.float32)
+CUBE_EDGES = np.array([
+    (0,1), (1,2), (2,3), (3,0),
+    (4,5), (5,6), (6,7), (7,4),
+    (0,4), (1,5), (2,6), (3,7)
+], dtype=np.uint32).ravel()
+
+def sphere_mesh(radius, slices=10, stacks=10):
+    """Vertices and GL_QUADS indices of the old quad-strip sphere"""
+    lat = math.pi * (-0.5 + np.arange(stacks + 1) / stacks)
+    lng = 2 * math.pi * np.arange(slices + 1) / slices
+    zr = radius * np.cos(lat)[:, None]
+    verts = np.stack((np.cos(lng)[None, :] * zr,
+                      np.sin(lng)[None, :] * zr,
+                      np.repeat(radius * np.sin(lat)[:, None], slices + 1, axis=1)), axis=-1)
+    # strip vertices (i,j), (i+1,j), (i,j+1), (i+1,j+1) make one quad
+    base = (np.arange(stacks)[:, None] * (slices + 1) + np.arange(slices)[None, :]).ravel()
+    quads = np.stack((base, base + slices + 1, base + slices + 2, base + 1), axis=-1)
+    return verts.reshape(-1, 3).astype(np.float32), quads.ravel().astype(np.uint32)
+
+class DisplayList:
+    """Geometry compiled once into vertex/color/index arrays.
+
+    Shapes are added in world (or model) space, then compile() packs them
+    into one array set per primitive type. draw() hands those to GL with a
+    single glDrawElements each, so the per-frame cost is the camera
+    transform GL applies anyway. With color=None the current glColor is
+    used, which lets one cached mesh serve differently colored objects."""
+    def __init__(self):
+        self.parts = defaultdict(list)   # mode -> [(verts, indices, color)]
+        self.batches = []                # (mode, verts, colors or None, indices)
+
+    def add(self, mode, verts, indices, color=None):
+        self.parts[mode].append((verts, indices, color))
+        return self
+
+    def add_cube(self, pos, size, color=None):
+        verts = CUBE_CORNERS * (size.x, size.y, size.z) + (pos.x, pos.y, pos.z)
+        return self.add(GL_LINES, verts, CUBE_EDGES, color)
+
+    def add_sphere(self, pos, radius, color=None):
+        verts, quads = sphere_mesh(radius)
+        return self.add(GL_QUADS, verts + (pos.x, pos.y, pos.z), quads, color)
+
+    def compile(self):
+        for mode, parts in self.parts.items():
+            verts, colors, indices = [], [], []
+            offset = 0
+            for v, idx, color in parts:
+                verts.append(v)
+                colors.append(np.tile(np.asarray(color if color else (1, 1, 1, 1), dtype=np.float32), (len(v), 1)))
+                indices.append(idx + offset)
+                offset += len(v)
+            use_colors = any(color for _, _, color in parts)
+            self.batches.append((
+                mode,
+                np.ascontiguousarray(np.concatenate(verts), dtype=np.float32),
+                np.ascontiguousarray(np.concatenate(colors)) if use_colors else None,
+                np.ascontiguousarray(np.concatenate(indices), dtype=np.uint32),
+            ))
+        self.parts.clear()
+        return self
+
+    def draw(self):
+        glEnableClientState(GL_VERTEX_ARRAY)
+        for mode, verts, colors, indices in self.batches:
+            glVertexPointer(3, GL_FLOAT, 0, verts)
+            if colors is not None:
+                glEnableClientState(GL_COLOR_ARRAY)
+                glColorPointer(4, GL_FLOAT, 0, colors)
+            glDrawElements(mode, len(indices), GL_UNSIGNED_INT, indices)
+            if colors is not None:
+                glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+# Meshes for dynamic objects, compiled on first use and keyed by shape
+_mesh_cache = {}
+
+def cached_mesh(kind, *params):
+    mesh = _mesh_cache.get((kind, params))
+    if mesh is None:
+        origin = Vector3(0, 0, 0)
+        if kind == 'cube':
+            mesh = DisplayList().add_cube(origin, Vector3(*params))
+        else:
+            mesh = DisplayList().add_sphere(origin, *params)
+        mesh = _mesh_cache[(kind, params)] = mesh.compile()
+    return mesh
+
+def compile_platforms(platforms):
+    """Display list of a level's static platforms"""
+    mesh = DisplayList()
+    for platform in platforms:
+        mesh.add_cube(platform['pos'], platform['size'], platform['color'])
+    return mesh.compile()
+
 class Mario64Game:
     def __init__(self):
         pygame.init()
@@ -73,6 +185,13 @@ class Mario64Game:
         
         # Initialize test level
         self.load_test_level()
+        self.level_mesh = compile_platforms(self.platforms)
+
+        # HUD text is re-rendered and re-uploaded only when it changes
+        self.hud_font = pygame.font.Font(None, 36)
+        self.hud_text = None
+        self.hud_texture = None
+        self.hud_size = (0, 0)
     
     def load_test_level(self):
         """Load a simple test level with platforms and collectibles"""
@@ -107,6 +226,28 @@ class Mario64Game:
     
     def draw_cube(self, pos, size, color):
         """Draw a colored cube at position"""
+        if IMMEDIATE:
+            self.draw_cube_immediate(pos, size, color)
+            return
+        glPushMatrix()
+        glTranslatef(pos.x, pos.y, pos.z)
+        glColor4f(*color)
+        cached_mesh('cube', size.x, size.y, size.z).draw()
+        glPopMatrix()
+
+    def draw_sphere(self, pos, radius, color):
+        """Draw a sphere for coins and stars"""
+        if IMMEDIATE:
+            self.draw_sphere_immediate(pos, radius, color)
+            return
+        glPushMatrix()
+        glTranslatef(pos.x, pos.y, pos.z)
+        glColor4f(*color)
+        cached_mesh('sphere', radius).draw()
+        glPopMatrix()
+
+    def draw_cube_immediate(self, pos, size, color):
+        """draw_cube, rebuilding the vertices every call"""
         glPushMatrix()
         glTranslatef(pos.x, pos.y, pos.z)
         glColor4f(*color)
@@ -131,8 +272,8 @@ class Mario64Game:
         
         glPopMatrix()
     
-    def draw_sphere(self, pos, radius, color):
-        """Draw a sphere for coins and stars"""
+    def draw_sphere_immediate(self, pos, radius, color):
+        """draw_sphere, rebuilding the vertices every call"""
         glPushMatrix()
         glTranslatef(pos.x, pos.y, pos.z)
         glColor4f(*color)
@@ -324,27 +465,31 @@ class Mario64Game:
         glDisable(GL_DEPTH_TEST)
         
         # Draw star counter
-        font = pygame.font.Font(None, 36)
-        text = font.render(f"Stars: {self.stars_collected}", True, (255, 255, 255))
-        text_surface = pygame.image.fromstring(text.tobytes(), text.get_size(), "RGBA")
+        label = f"Stars: {self.stars_collected}"
+        if label != self.hud_text:
+            text = self.hud_font.render(label, True, (255, 255, 255))
+            text_surface = pygame.image.fromstring(text.tobytes(), text.get_size(), "RGBA")
+            if self.hud_texture is not None:
+                glDeleteTextures([self.hud_texture])
+            self.hud_texture = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_2D, self.hud_texture)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, text.get_width(), text.get_height(), 
+                        0, GL_RGBA, GL_UNSIGNED_BYTE, text_surface.get_buffer())
+            self.hud_text = label
+            self.hud_size = text.get_size()
         
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
         
-        texture = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, text.get_width(), text.get_height(), 
-                    0, GL_RGBA, GL_UNSIGNED_BYTE, text_surface.get_buffer())
-        
+        w, h = self.hud_size
+        glBindTexture(GL_TEXTURE_2D, self.hud_texture)
         glBegin(GL_QUADS)
         glTexCoord2f(0, 0); glVertex2f(20, 20)
-        glTexCoord2f(1, 0); glVertex2f(20 + text.get_width(), 20)
-        glTexCoord2f(1, 1); glVertex2f(20 + text.get_width(), 20 + text.get_height())
-        glTexCoord2f(0, 1); glVertex2f(20, 20 + text.get_height())
+        glTexCoord2f(1, 0); glVertex2f(20 + w, 20)
+        glTexCoord2f(1, 1); glVertex2f(20 + w, 20 + h)
+        glTexCoord2f(0, 1); glVertex2f(20, 20 + h)
         glEnd()
         
-        glDeleteTextures([texture])
-        
         # Restore 3D settings
         glEnable(GL_DEPTH_TEST)
         glEnable(GL_LIGHTING)
@@ -363,7 +508,18 @@ class Mario64Game:
         global glutSolidCube, glutSolidSphere, glutSolidCone
         from OpenGL.GLUT import glutSolidCube, glutSolidSphere, glutSolidCone
         
+        # Allocation report: bytes Python allocates within a frame (peak over
+        # the frame's starting point, so short-lived garbage counts too)
+        frames = 0
+        alloc_bytes = 0
+        if ALLOC_REPORT:
+            tracemalloc.start()
+        
         while running:
+            if ALLOC_REPORT:
+                tracemalloc.reset_peak()
+                frame_start = tracemalloc.get_traced_memory()[0]
+            
             for event in pygame.event.get():
                 if event.type == QUIT:
                     running = False
@@ -385,8 +541,11 @@ class Mario64Game:
             self.update_camera()
             
             # Draw platforms
-            for platform in self.platforms:
-                self.draw_cube(platform['pos'], platform['size'], platform['color'])
+            if IMMEDIATE:
+                for platform in self.platforms:
+                    self.draw_cube(platform['pos'], platform['size'], platform['color'])
+            else:
+                self.level_mesh.draw()
             
             # Draw coins
             for coin in self.coins:
@@ -410,6 +569,16 @@ class Mario64Game:
             self.draw_hud()
             
             pygame.display.flip()
+            
+            if ALLOC_REPORT:
+                alloc_bytes += tracemalloc.get_traced_memory()[1] - frame_start
+                frames += 1
+                if frames == ALLOC_FRAMES:
+                    mode = "immediate" if IMMEDIATE else "display lists"
+                    print(f"{mode}: {alloc_bytes / frames:,.0f} bytes allocated per frame "
+                          f"over {frames} frames")
+                    running = False
+            
             clock.tick(60)
         
         pygame.quit()
@@ -437,11 +606,18 @@ class CastleArea:
         
         self.paintings = []  # Portal to levels
         self.secret_stars = 0
+        self.mesh = None
     
     def draw_castle(self):
         """Render the castle environment"""
-        # This would be expanded with actual castle geometry
-        pass
+        # This would be expanded with actual castle geometry; the room
+        # outlines are compiled into a display list on first draw
+        if self.mesh is None:
+            self.mesh = DisplayList()
+            for room in self.rooms.values():
+                self.mesh.add_cube(room["position"], room["size"], (0.9, 0.9, 0.85, 1))
+            self.mesh.compile()
+        self.mesh.draw()
 
 class LevelManager:
     """Manages loading and switching between levels"""
@@ -471,12 +647,16 @@ class LevelManager:
         }
         
         self.current_level_id = 1
+        self.display_lists = {}  # level_id -> compiled static geometry
     
     def load_level(self, level_id):
         """Load level data and geometry"""
         level = self.levels.get(level_id)
         if level:
             print(f"Loading level: {level['name']}")
+            if level_id not in self.display_lists:
+                self.display_lists[level_id] = compile_platforms(level.get("platforms", []))
+            level["display_list"] = self.display_lists[level_id]
             return level
         return None
 
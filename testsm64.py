@@ -5,13 +5,41 @@ No assets. No shaders. Just math.
 
 Controls:
 A/D rotate | W/S forward/back | Q/E strafe | Shift run | Space jump | Ctrl ground pound | R reset
+
+Flags:
+--legacy-render   per-face Python pipeline instead of the NumPy batch
+--zbuffer         z-buffered softraster backend instead of painter's sort
+--zscale S        internal resolution scale for --zbuffer (e.g. 0.5)
+--no-cull         draw and collide against every platform (no BVH)
+--bench           headless frame-time benchmark on a 10x course, then
+                  on courses 10x/100x longer along Z
 """
 
 import math
+import os
+import sys
+import time
+from collections import defaultdict
 from dataclasses import dataclass
+from itertools import repeat
 
 import pygame
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import softraster
+    SOFTRASTER_AVAILABLE = True
+except ImportError:
+    SOFTRASTER_AVAILABLE = False
+
+if '--bench' in sys.argv:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
 pygame.init()
 W, H = 960, 600
 screen = pygame.display.set_mode((W, H))
@@ -30,6 +58,13 @@ JUMP = 12.5
 POUND = -32
 TERM = 22
 
+BATCHED = NUMPY_AVAILABLE and '--legacy-render' not in sys.argv
+ZBUFFER = BATCHED and SOFTRASTER_AVAILABLE and '--zbuffer' in sys.argv
+ZSCALE = float(sys.argv[sys.argv.index('--zscale') + 1]) if '--zscale' in sys.argv else 1.0
+CULL = '--no-cull' not in sys.argv
+FAR = 4000       # distance cull; the stock course spans ~3500 from the spawn view
+BVH_LEAF = 4     # platforms per BVH leaf
+
 MARIO_R = 14     # collision radius
 MARIO_H = 56     # collision height (feet -> head)
 
@@ -118,33 +153,53 @@ class Mario:
         self.a = 0.0
         self.ground = False
 
-    def _resolve_walls(self, plats):
-        """Cheap AABB wall collisions in XZ (so pipes/bricks feel solid)."""
+    def _resolve_walls(self, plats, bvh=None):
+        """Cheap AABB wall collisions in XZ (so pipes/bricks feel solid).
+
+        With a PlatformBVH only the platforms overlapping Mario's volume
+        are tested; after a push the query is repeated from the new spot,
+        continuing in level order, so the result matches a full scan."""
         feet = self.p.y
         head = self.p.y + MARIO_H
-        for pl in plats:
-            # vertical overlap with the platform's volume
-            if head <= pl.y or feet >= pl.y + pl.h:
-                continue
+        i = -1
+        while True:
+            if bvh is None:
+                near = range(len(plats))
+            else:
+                near = [j for j in bvh.overlap((self.p.x-MARIO_R, feet, self.p.z-MARIO_R),
+                                               (self.p.x+MARIO_R, head, self.p.z+MARIO_R)) if j > i]
+            for i in near:
+                if self._push_out(plats[i], feet, head) and bvh is not None:
+                    break
+            else:
+                return
+
+    def _push_out(self, pl, feet, head):
+        """Push Mario out of one platform; True if he moved"""
+        # vertical overlap with the platform's volume
+        if head <= pl.y or feet >= pl.y + pl.h:
+            return False
+
+        dx = self.p.x - pl.x
+        dz = self.p.z - pl.z
+        px = (pl.w/2 + MARIO_R) - abs(dx)
+        pz = (pl.d/2 + MARIO_R) - abs(dz)
+
+        if px > 0 and pz > 0:
+            # Don't push when standing on top (feet essentially at top)
+            if feet >= (pl.y + pl.h - 1):
+                return False
+            # Push out along the shallowest penetration axis
+            if px < pz:
+                self.p.x += px if dx > 0 else -px
+                self.v.x = 0
+            else:
+                self.p.z += pz if dz > 0 else -pz
+                self.v.z = 0
+            return True
+        return False
 
-            dx = self.p.x - pl.x
-            dz = self.p.z - pl.z
-            px = (pl.w/2 + MARIO_R) - abs(dx)
-            pz = (pl.d/2 + MARIO_R) - abs(dz)
-
-            if px > 0 and pz > 0:
-                # Don't push when standing on top (feet essentially at top)
-                if feet >= (pl.y + pl.h - 1):
-                    continue
-                # Push out along the shallowest penetration axis
-                if px < pz:
-                    self.p.x += px if dx > 0 else -px
-                    self.v.x = 0
-                else:
-                    self.p.z += pz if dz > 0 else -pz
-                    self.v.z = 0
-
-    def update(self, keys, plats):
+    def update(self, keys, plats, bvh=None):
         acc = RUN_ACCEL if keys[pygame.K_LSHIFT] else WALK_ACCEL
         if keys[pygame.K_a]: self.a += 0.06
         if keys[pygame.K_d]: self.a -= 0.06
@@ -178,7 +233,14 @@ class Mario:
 
         # floor collision (land on top)
         self.ground = False
-        for pl in plats:
+        if bvh is not None:
+            # landing only ever raises p.y, so platforms reaching the
+            # starting height are all that can catch him
+            plats_below = [plats[i] for i in bvh.overlap((self.p.x, self.p.y, self.p.z),
+                                                          (self.p.x, math.inf, self.p.z))]
+        else:
+            plats_below = plats
+        for pl in plats_below:
             if (pl.x - pl.w/2 < self.p.x < pl.x + pl.w/2 and
                 pl.z - pl.d/2 < self.p.z < pl.z + pl.d/2):
                 top = pl.y + pl.h
@@ -188,7 +250,7 @@ class Mario:
                     self.ground = True
 
         # wall collision (XZ push-out)
-        self._resolve_walls(plats)
+        self._resolve_walls(plats, bvh)
 
         if self.p.y < -240:
             self.__init__()
@@ -219,7 +281,10 @@ def add_poly(draw, pts, z, col, outline=True):
     draw.append((z, "poly", pts, col, outline))
 
 def add_circle(draw, sx, sy, z, r, col):
-    draw.append((z, "circ", (sx,sy,r), col, False))
+    if isinstance(draw, list):
+        draw.append((z, "circ", (sx,sy,r), col, False))
+    else:
+        draw.disc(sx, sy, z, r, col)   # softraster target
 
 def box_faces(draw, corners, cam, base_col, bottom=False):
     faces = []
@@ -252,7 +317,10 @@ def oriented_box(draw, center, w,h,d, yaw, col, cam):
         rx = lx*ca - lz*sa
         rz = lx*sa + lz*ca
         world.append((cx+rx, cy+ly, cz+rz))
-    box_faces(draw, world, cam, col)
+    if BATCHED:
+        batch_boxes(draw, np.array(world)[None], np.array([col], dtype=float), cam)
+    else:
+        box_faces(draw, world, cam, col)
 
 def sphere(draw, center_w, r, col, cam, top_only=False):
     cxw,cyw,czw = center_w
@@ -278,19 +346,207 @@ def sphere(draw, center_w, r, col, cam, top_only=False):
         if ok and len(pts)>=3:
             add_poly(draw, pts, zsum/len(pts), scol)
 
+# ─── batched (NumPy) pipeline ───
+# Same math as box_faces/sphere, but every platform (or head part) goes
+# through camera transform, near-clip rejection, backface test, Lambert
+# shading and projection as one array pass; only survivors reach Python.
+if NUMPY_AVAILABLE:
+    BOX_FACE_IDX = np.array([(4,7,6,5),(0,4,5,1),(3,2,6,7),(0,3,7,4),(1,5,6,2)])
+    BOX_COUNT = np.full(len(BOX_FACE_IDX), 4)
+    # Sphere caps are triangles: pad them to quads with their last vertex
+    # and keep a per-face vertex count / validity mask for the averages
+    SPF_IDX = np.array([f + (f[-1],)*(4-len(f)) for f in SPF])
+    SPF_COUNT = np.array([len(f) for f in SPF])
+    SPV_ARR = np.array(SPV, dtype=float)
+    LIGHT_ARR = np.array(LIGHT)
+
+def cam_space(pts, cam: Cam):
+    """w2c over an (..., 3) array"""
+    ca, sa = math.cos(-cam.yaw), math.sin(-cam.yaw)
+    rx, ry, rz = pts[...,0]-cam.x, pts[...,1]-cam.y, pts[...,2]-cam.z
+    return np.stack((rx*ca - rz*sa, ry, rx*sa + rz*ca), axis=-1)
+
+def batch_faces(draw, fv, count, cols, k_mul, k_add, k_lo, k_hi, centers=None, top_only=None):
+    """Cull, shade and project (M,F,4,3) camera-space faces into `draw`
+    (a painter's list, or a softraster.Rasterizer).
+
+    count is each face's real vertex count (3 or 4), cols the (M,3) base
+    colors. With centers (M,3) the normals are flipped to point away from
+    the object center, as sphere() does; top_only (M,) drops faces whose
+    centroid sits below that center."""
+    valid = np.arange(4) < count[:,None]                      # (F,4)
+    keep = (fv[...,2] >= NEAR).all(-1)                        # (M,F)
+    fc = (fv * valid[...,None]).sum(2) / count[:,None]        # centroids
+    n = np.cross(fv[:,:,1]-fv[:,:,0], fv[:,:,2]-fv[:,:,0])
+    if centers is not None:
+        c = centers[:,None,:]
+        n = np.where(((n*(fc-c)).sum(-1) < 0)[...,None], -n, n)
+        if top_only is not None:
+            keep &= ~(top_only[:,None] & (fc[...,1] < c[...,1]))
+    keep &= (n*fc).sum(-1) < 0                                # backface
+    if not keep.any():
+        return
+    fv, n, fcount = fv[keep], n[keep], np.broadcast_to(count, keep.shape)[keep]
+    length = np.sqrt((n*n).sum(-1))
+    length[length == 0] = 1.0
+    k = np.clip((n/length[:,None]) @ LIGHT_ARR * k_mul + k_add, k_lo, k_hi)
+    base = np.broadcast_to(cols[:,None,:], keep.shape + (3,))[keep]
+    shaded = np.clip(base * np.clip(k, 0.0, 1.15)[:,None], 0, 255).astype(int)
+    s = FOV / fv[...,2]
+    pts = np.stack((fv[...,0]*s + W/2, -fv[...,1]*s + H/2), axis=-1)
+    if not isinstance(draw, list):
+        draw.polygons(pts, fv[...,2], shaded, fcount)
+        return
+    z = (fv[...,2] * (np.arange(4) < fcount[:,None])).sum(-1) / fcount
+    pts = pts.tolist()
+    if not (fcount == 4).all():
+        pts = [p[:c] for p, c in zip(pts, fcount.tolist())]
+    draw.extend(zip(z.tolist(), repeat("poly"), pts, map(tuple, shaded.tolist()), repeat(True)))
+
+class PlatformBatch:
+    """Static platforms stacked into one (N,8,3) corner array"""
+    def __init__(self, plats):
+        self.corners = np.array([pl.corners() for pl in plats], dtype=float).reshape(-1,8,3)
+        self.cols = np.array([pl.col for pl in plats], dtype=float).reshape(-1,3)
+
+    def faces(self, draw, cam: Cam, idx=None):
+        """All platforms, or only those whose indices are in idx"""
+        if idx is None:
+            batch_boxes(draw, self.corners, self.cols, cam)
+        elif len(idx):
+            batch_boxes(draw, self.corners[idx], self.cols[idx], cam)
+
+def batch_boxes(draw, corners, cols, cam: Cam):
+    """box_faces() for (N,8,3) corners and (N,3) colors"""
+    cv = cam_space(corners, cam)
+    batch_faces(draw, cv[:, BOX_FACE_IDX], BOX_COUNT, cols, 0.85, 0.25, 0.25, 1.05)
+
+def spheres(draw, parts, cam: Cam):
+    """sphere() for a list of (center, r, col, top_only) in one pass"""
+    if not BATCHED:
+        for center, r, col, top_only in parts:
+            sphere(draw, center, r, col, cam, top_only)
+        return
+    centers = np.array([p[0] for p in parts], dtype=float)
+    radii = np.array([p[1] for p in parts], dtype=float)
+    cols = np.array([p[2] for p in parts], dtype=float)
+    top_only = np.array([p[3] for p in parts])
+    cv = cam_space(centers[:,None,:] + SPV_ARR[None]*radii[:,None,None], cam)
+    batch_faces(draw, cv[:, SPF_IDX], SPF_COUNT, cols, 0.9, 0.22, 0.22, 1.08,
+                centers=cam_space(centers, cam), top_only=top_only)
+
+# ─── static BVH over platform boxes ───
+# Built once per level. Rendering walks it against the camera frustum so
+# whole stretches of off-screen course are dropped before any per-vertex
+# work; physics asks it for the platforms overlapping Mario's volume. Both
+# return platform indices in level order, so draw order and collision
+# order match a full scan.
+class BVHNode:
+    __slots__ = ("lo", "hi", "center", "half", "items", "left", "right")
+
+def frustum_planes(cam: Cam, far=FAR):
+    """World-space (n, d, |n|) planes, inward facing, bounding what proj()
+    can put on screen between NEAR and far"""
+    kx, ky = (W/2) / FOV, (H/2) / FOV
+    ca, sa = math.cos(-cam.yaw), math.sin(-cam.yaw)
+    planes = []
+    for nx, ny, nz, d in ((0,0,1,-NEAR), (0,0,-1,far), (-1,0,kx,0), (1,0,kx,0), (0,-1,ky,0), (0,1,ky,0)):
+        # camera space is w2c: rotate the normal back and move the plane to cam
+        wx, wz = nx*ca + nz*sa, nz*ca - nx*sa
+        d -= wx*cam.x + ny*cam.y + wz*cam.z
+        planes.append((wx, ny, wz, d, abs(wx), abs(ny), abs(wz)))
+    return planes
+
+def box_vs_planes(c, h, planes):
+    """-1 box fully outside some plane, 1 fully inside all, 0 straddling"""
+    inside = 1
+    for nx, ny, nz, d, ax, ay, az in planes:
+        s = nx*c[0] + ny*c[1] + nz*c[2] + d
+        r = ax*h[0] + ay*h[1] + az*h[2]
+        if s + r < 0:
+            return -1
+        if s - r < 0:
+            inside = 0
+    return inside
+
+class PlatformBVH:
+    """Median-split AABB tree over a level's platforms"""
+    def __init__(self, plats):
+        self.lo = [(pl.x-pl.w/2, pl.y, pl.z-pl.d/2) for pl in plats]
+        self.hi = [(pl.x+pl.w/2, pl.y+pl.h, pl.z+pl.d/2) for pl in plats]
+        self.center = [tuple((a+b)/2 for a, b in zip(lo, hi)) for lo, hi in zip(self.lo, self.hi)]
+        self.half = [tuple((b-a)/2 for a, b in zip(lo, hi)) for lo, hi in zip(self.lo, self.hi)]
+        self.root = self._build(list(range(len(plats)))) if plats else None
+
+    def _build(self, idx):
+        node = BVHNode()
+        node.lo = tuple(min(self.lo[i][k] for i in idx) for k in range(3))
+        node.hi = tuple(max(self.hi[i][k] for i in idx) for k in range(3))
+        node.center = tuple((a+b)/2 for a, b in zip(node.lo, node.hi))
+        node.half = tuple((b-a)/2 for a, b in zip(node.lo, node.hi))
+        node.items = sorted(idx)    # whole subtree, for nodes entirely in view
+        node.left = node.right = None
+        if len(idx) > BVH_LEAF:
+            axis = max(range(3), key=lambda k: node.hi[k] - node.lo[k])
+            idx.sort(key=lambda i: self.center[i][axis])
+            mid = len(idx) // 2
+            node.left, node.right = self._build(idx[:mid]), self._build(idx[mid:])
+        return node
+
+    def visible(self, cam: Cam, far=FAR):
+        """Sorted indices of platforms not wholly outside the view frustum"""
+        out = []
+        planes = frustum_planes(cam, far)
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            state = box_vs_planes(node.center, node.half, planes)
+            if state < 0:
+                continue
+            if state > 0:
+                out += node.items
+            elif node.left is None:
+                out += [i for i in node.items if box_vs_planes(self.center[i], self.half[i], planes) >= 0]
+            else:
+                stack += (node.left, node.right)
+        out.sort()
+        return out
+
+    def overlap(self, lo, hi):
+        """Sorted indices of platforms whose box touches the box lo..hi"""
+        out = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if (node.lo[0] > hi[0] or node.hi[0] < lo[0] or node.lo[1] > hi[1] or
+                    node.hi[1] < lo[1] or node.lo[2] > hi[2] or node.hi[2] < lo[2]):
+                continue
+            if node.left is None:
+                for i in node.items:
+                    a, b = self.lo[i], self.hi[i]
+                    if (a[0] <= hi[0] and b[0] >= lo[0] and a[1] <= hi[1] and
+                            b[1] >= lo[1] and a[2] <= hi[2] and b[2] >= lo[2]):
+                        out.append(i)
+            else:
+                stack += (node.left, node.right)
+        out.sort()
+        return out
+
 def mario_head(draw, m: Mario, cam: Cam):
     fwd = (-math.sin(m.a), -math.cos(m.a))
     rgt = ( math.cos(m.a), -math.sin(m.a))
     hc = (m.p.x, m.p.y+36, m.p.z)
-    sphere(draw, hc, 18, SKIN, cam)                         # head
-    sphere(draw, (hc[0],hc[1]+5,hc[2]), 19, RED, cam, True) # cap top
     brim = (hc[0]+fwd[0]*14, hc[1]+8, hc[2]+fwd[1]*14)
     oriented_box(draw, brim, 20, 3.2, 10, m.a, RED, cam)    # brim
     nose = (hc[0]+fwd[0]*18, hc[1]-1, hc[2]+fwd[1]*18)
-    sphere(draw, nose, 6.2, SKIN, cam)
     st = (hc[0]+fwd[0]*13, hc[1]-6, hc[2]+fwd[1]*13)
-    sphere(draw, (st[0]+rgt[0]*4.5, st[1], st[2]+rgt[1]*4.5), 3.3, BROWN, cam)
-    sphere(draw, (st[0]-rgt[0]*4.5, st[1], st[2]-rgt[1]*4.5), 3.3, BROWN, cam)
+    spheres(draw, [
+        (hc, 18, SKIN, False),                               # head
+        ((hc[0],hc[1]+5,hc[2]), 19, RED, True),              # cap top
+        (nose, 6.2, SKIN, False),
+        ((st[0]+rgt[0]*4.5, st[1], st[2]+rgt[1]*4.5), 3.3, BROWN, False),
+        ((st[0]-rgt[0]*4.5, st[1], st[2]-rgt[1]*4.5), 3.3, BROWN, False),
+    ], cam)
     # eyes as billboard circles (readable)
     eb = (hc[0]+fwd[0]*14, hc[1]+3.5, hc[2]+fwd[1]*14)
     for sgn in (-1,1):
@@ -333,40 +589,39 @@ def build_level():
     star = Star(0, pole_y + 7*step_h + 60, -3000)
     return plats, star
 
-m = Mario()
-plats, star = build_level()
-font = pygame.font.SysFont("Arial", 22)
-small = pygame.font.SysFont("Arial", 16)
-stars = 0
-
-running = True
-while running:
-    for e in pygame.event.get():
-        if e.type == pygame.QUIT:
-            running = False
-
-    keys = pygame.key.get_pressed()
-    if keys[pygame.K_r]:
-        m = Mario(); plats, star = build_level(); stars = 0
-
-    m.update(keys, plats)
-    star.update()
-    if star.hit(m.p): stars += 1
-
-    cam = Cam(
+def follow_cam(m: Mario):
+    return Cam(
         m.p.x + math.sin(m.a)*320,
         m.p.y + 160,
         m.p.z + math.cos(m.a)*320,
         m.a + math.pi,  # IMPORTANT: look along mario forward (-sin,-cos)
     )
 
-    screen.fill(SKY)
+def draw_sky(surface):
+    surface.fill(SKY)
     for (x,y,r) in [(140,90,28),(170,80,34),(205,92,26),(820,110,26),(850,100,32),(885,112,24)]:
-        pygame.draw.circle(screen, WHITE, (x,y), r)
-
-    draw=[]
-    for pl in plats:
-        box_faces(draw, pl.corners(), cam, pl.col)
+        pygame.draw.circle(surface, WHITE, (x,y), r)
+
+def make_raster(scale=ZSCALE):
+    raster = softraster.Rasterizer((W, H), scale)
+    sky = pygame.Surface((W, H))
+    draw_sky(sky)
+    raster.set_background(sky)
+    return raster
+
+def build_draw(plats, batch, star, m, cam, raster=None, bvh=None):
+    """Depth-sorted draw list for one frame (batch=None: per-face path),
+    or, given a softraster.Rasterizer, the frame rasterized into it.
+    With a PlatformBVH only platforms inside the view frustum are drawn."""
+    if raster is not None:
+        raster.clear()
+    draw = [] if raster is None else raster
+    idx = bvh.visible(cam) if bvh is not None else None
+    if batch is not None:
+        batch.faces(draw, cam, idx)
+    else:
+        for pl in plats if idx is None else [plats[i] for i in idx]:
+            box_faces(draw, pl.corners(), cam, pl.col)
 
     if not star.collected:
         sx,sy,sz = star.p.x, star.p.y + 18*math.sin(star.a), star.p.z
@@ -377,14 +632,183 @@ while running:
 
     mario_head(draw, m, cam)
 
-    draw.sort(key=lambda it: it[0], reverse=True)
+    if raster is None:
+        draw.sort(key=lambda it: it[0], reverse=True)
+    return draw
+
+def render_draw(surface, draw):
     for _,kind,payload,col,outline in draw:
         if kind=="poly":
-            pygame.draw.polygon(screen, col, payload)
-            if outline: pygame.draw.polygon(screen, (0,0,0), payload, 1)
+            pygame.draw.polygon(surface, col, payload)
+            if outline: pygame.draw.polygon(surface, (0,0,0), payload, 1)
         else:
             sx,sy,r = payload
-            pygame.draw.circle(screen, col, (int(sx),int(sy)), int(r))
+            pygame.draw.circle(surface, col, (int(sx),int(sy)), int(r))
+
+def benchmark(scale=10, frames=120):
+    """Frame time of both pipelines on build_level() copied `scale` times
+    side by side, with the camera walking the course"""
+    global BATCHED
+    base, star = build_level()
+    plats = [Platform(pl.x + (i - scale//2)*800, pl.y, pl.z, pl.w, pl.h, pl.d, pl.col)
+             for i in range(scale) for pl in base]
+    batch = PlatformBatch(plats)
+    surface = pygame.Surface((W, H))
+    m = Mario()
+    path = [(-220 + 40*math.sin(i*0.2), 140, 140 - 3100*i/frames, 0.3*math.sin(i*0.05)) for i in range(frames)]
+    print(f"{len(plats)} platforms ({scale}x build_level), {frames} frames")
+    results = {}
+    for label, use_batch in (("per-face", False), ("batched", True)):
+        BATCHED = use_batch
+        build_s = draw_s = 0.0
+        polys = 0
+        lists = []
+        for x, y, z, a in path:
+            m.p.x, m.p.y, m.p.z, m.a = x, y, z, a
+            cam = follow_cam(m)
+            t0 = time.perf_counter()
+            draw = build_draw(plats, batch if use_batch else None, star, m, cam)
+            t1 = time.perf_counter()
+            draw_sky(surface)
+            render_draw(surface, draw)
+            build_s += t1 - t0
+            draw_s += time.perf_counter() - t1
+            polys += len(draw)
+            lists.append(draw)
+        results[label] = lists
+        print(f"  {label:9s} transform/cull/shade {build_s/frames*1000:7.2f} ms  "
+              f"draw {draw_s/frames*1000:6.2f} ms  ({polys/frames:.0f} polygons/frame)")
+    BATCHED = NUMPY_AVAILABLE
+
+    def key(draw):
+        return sorted((kind, col, [tuple(round(c, 6) for c in pt) for pt in payload] if kind == "poly" else payload)
+                      for _, kind, payload, col, _ in draw)
+    same = all(key(a) == key(b) for a, b in zip(results["per-face"], results["batched"]))
+    print(f"  batched output {'matches' if same else 'DIFFERS from'} per-face")
+
+    if not SOFTRASTER_AVAILABLE:
+        return
+    for scale in (1.0, 0.5):
+        raster = make_raster(scale)
+        pixels = 0
+        t0 = time.perf_counter()
+        for x, y, z, a in path:
+            m.p.x, m.p.y, m.p.z, m.a = x, y, z, a
+            build_draw(plats, batch, star, m, follow_cam(m), raster)
+            raster.present(surface)
+            pixels += raster.stats['pixels']
+        print(f"  zbuffer   scale {scale:.2f}  frame {(time.perf_counter()-t0)/frames*1000:7.2f} ms  "
+              f"({pixels/frames:,.0f} pixels/frame)")
+
+def long_level(length):
+    """build_level() repeated `length` times end to end along -Z"""
+    base, star = build_level()
+    plats = [Platform(pl.x, pl.y, pl.z - i*3400, pl.w, pl.h, pl.d, pl.col)
+             for i in range(length) for pl in base]
+    return plats, star
+
+def benchmark_length(lengths=(1, 10, 100), frames=60):
+    """Per-frame cost with and without the BVH as the course gets longer,
+    with the camera and Mario walking its whole length"""
+    print("course length scaling (batched)")
+    keys = defaultdict(bool, {pygame.K_w: True, pygame.K_LSHIFT: True})
+    for length in lengths:
+        plats, star = long_level(length)
+        batch = PlatformBatch(plats)
+        t0 = time.perf_counter()
+        bvh = PlatformBVH(plats)
+        build_ms = (time.perf_counter() - t0) * 1000
+        path = [(-220 + 40*math.sin(i*0.2), 140, 140 - 3400*length*i/frames, 0.3*math.sin(i*0.05))
+                for i in range(frames)]
+        m = Mario()
+        times, lists = {}, {}
+        for label, tree in (("full", None), ("bvh", bvh)):
+            t0 = time.perf_counter()
+            lists[label] = []
+            for x, y, z, a in path:
+                m.p.x, m.p.y, m.p.z, m.a = x, y, z, a
+                lists[label].append(build_draw(plats, batch, star, m, follow_cam(m), bvh=tree))
+            times[label] = (time.perf_counter() - t0) / frames * 1000
+        same = None
+        if length == 1:
+            # frustum culling only drops faces that land off screen; on the
+            # stock course nothing is past FAR, so the pixels must agree
+            surface = pygame.Surface((W, H))
+            images = {}
+            for label, frame_lists in lists.items():
+                images[label] = []
+                for draw in frame_lists:
+                    draw_sky(surface)
+                    render_draw(surface, draw)
+                    images[label].append(pygame.image.tobytes(surface, "RGB"))
+            same = images["full"] == images["bvh"]
+
+        # physics: one update from every path point, then a long scripted run
+        runs = {}
+        for label, tree in (("full", None), ("bvh", bvh)):
+            states = []
+            t0 = time.perf_counter()
+            for x, y, z, a in path:
+                m = Mario()
+                m.p.x, m.p.y, m.p.z, m.a = x, y - 60, z, a
+                m.update(keys, plats, tree)
+                states.append((m.p.x, m.p.y, m.p.z, m.v.x, m.v.y, m.v.z, m.ground))
+            times[label + " phys"] = (time.perf_counter() - t0) / frames * 1000
+            m = Mario()
+            for i in range(600):
+                keys[pygame.K_SPACE] = i % 90 == 0
+                keys[pygame.K_a] = i % 200 < 20
+                m.update(keys, plats, tree)
+                states.append((m.p.x, m.p.y, m.p.z, m.v.x, m.v.y, m.v.z, m.ground))
+            runs[label] = states
+        print(f"  {length:3d}x {len(plats):5d} platforms  bvh build {build_ms:6.1f} ms  "
+              f"frame full {times['full']:6.2f} ms  bvh {times['bvh']:5.2f} ms  "
+              f"physics full {times['full phys']*1000:6.0f} us  bvh {times['bvh phys']*1000:4.0f} us  "
+              f"physics {'matches' if runs['full'] == runs['bvh'] else 'DIFFERS'}"
+              + ("" if same is None else f", frames {'match' if same else 'DIFFER'}"))
+
+if '--bench' in sys.argv:
+    if not NUMPY_AVAILABLE:
+        sys.exit("--bench needs numpy")
+    benchmark()
+    benchmark_length()
+    pygame.quit()
+    sys.exit()
+
+m = Mario()
+plats, star = build_level()
+batch = PlatformBatch(plats) if BATCHED else None
+bvh = PlatformBVH(plats) if CULL else None
+raster = make_raster() if ZBUFFER else None
+font = pygame.font.SysFont("Arial", 22)
+small = pygame.font.SysFont("Arial", 16)
+stars = 0
+
+running = True
+while running:
+    for e in pygame.event.get():
+        if e.type == pygame.QUIT:
+            running = False
+
+    keys = pygame.key.get_pressed()
+    if keys[pygame.K_r]:
+        m = Mario(); plats, star = build_level(); stars = 0
+        batch = PlatformBatch(plats) if BATCHED else None
+        bvh = PlatformBVH(plats) if CULL else None
+
+    m.update(keys, plats, bvh)
+    star.update()
+    if star.hit(m.p): stars += 1
+
+    cam = follow_cam(m)
+
+    frame = build_draw(plats, batch, star, m, cam, raster, bvh)
+    if raster is not None:
+        raster.present(screen)
+    else:
+        draw_sky(screen)
+        render_draw(screen, frame)
+
 
     screen.blit(font.render(f"STARS: {stars}   (1-1-ish test course)", True, (255,255,0)), (18,16))
     screen.blit(small.render("A/D rotate  W/S move  Q/E strafe  Shift run  Space jump  Ctrl pound  R reset", True, (10,10,10)), (18, H-26))
@@ -9,6 +9,8 @@ NES-Accurate Edition • Pure Tkinter • FILES = OFF
 
 import tkinter as tk
 import math
+import sys
+import time
 
 # ============================================================
 # ENGINE CONFIG
@@ -564,35 +566,188 @@ MUSHROOM = [
 # RENDERER
 # ============================================================
 class Renderer:
+    """Retained-mode renderer.
+
+    Every sprite (and its mirrored variant) is rasterized once into a scaled
+    PhotoImage. Canvas items are kept in a persistent pool: each frame the
+    draw calls claim pool slots in order and only move/reconfigure the items
+    that changed, instead of recreating one rectangle per sprite pixel.
+    """
     def __init__(self, canvas, scale):
         self.canvas = canvas
         self.scale = scale
+        # (id(sprite), flip) -> (sprite, PhotoImage); the sprite is kept so its id stays unique
+        self.images = {}
+        # Pool slots in stacking order: [item, kind, coords, config]
+        self.slots = []
+        self.cursor = 0
+        self.shown = 0
     
-    def draw(self, x, y, sprite, flip=False):
+    def sprite_image(self, sprite, flip=False):
+        key = (id(sprite), flip)
+        entry = self.images.get(key)
+        if entry is None:
+            entry = self.images[key] = (sprite, self.rasterize(sprite, flip))
+        return entry[1]
+    
+    def rasterize(self, sprite, flip=False):
+        """Bake a sprite into a PhotoImage, one put() per run of equal pixels"""
         s = self.scale
+        w = max((len(row) for row in sprite), default=1)
+        img = tk.PhotoImage(width=w * s, height=max(len(sprite), 1) * s)
         for ri, row in enumerate(sprite):
-            for ci, ch in enumerate(row):
-                if ch == '_' or ch not in PAL or PAL[ch] is None:
-                    continue
-                col = PAL[ch]
-                px = x + (len(row) - 1 - ci if flip else ci) * s
-                py = y + ri * s
-                self.canvas.create_rectangle(
-                    px, py, px + s, py + s,
-                    fill=col, outline=col, width=0
-                )
+            if flip:
+                row = row[::-1]
+            ci = 0
+            while ci < len(row):
+                end = ci + 1
+                while end < len(row) and row[end] == row[ci]:
+                    end += 1
+                col = PAL.get(row[ci])
+                if col:
+                    img.put(col, to=(ci * s, ri * s, end * s, (ri + 1) * s))
+                ci = end
+        return img
+    
+    def begin_frame(self):
+        self.cursor = 0
+    
+    def end_frame(self):
+        """Hide pool items that were not claimed this frame"""
+        for slot in self.slots[self.cursor:self.shown]:
+            self.canvas.itemconfigure(slot[0], state='hidden')
+            slot[3] = None
+        self.shown = self.cursor
+    
+    def item_count(self):
+        return len(self.canvas.find_all())
+    
+    def _create(self, kind, coords, config):
+        if kind == 'image':
+            return self.canvas.create_image(*coords, anchor='nw', **config)
+        if kind == 'rect':
+            return self.canvas.create_rectangle(*coords, width=0, **config)
+        return self.canvas.create_text(*coords, **config)
+    
+    def _claim(self, kind, coords, config):
+        i = self.cursor
+        self.cursor += 1
+        if i < len(self.slots):
+            slot = self.slots[i]
+            if slot[1] == kind:
+                item = slot[0]
+                if slot[2] != coords:
+                    self.canvas.coords(item, *coords)
+                    slot[2] = coords
+                if slot[3] is None:
+                    self.canvas.itemconfigure(item, state='normal', **config)
+                    slot[3] = config
+                elif slot[3] != config:
+                    self.canvas.itemconfigure(item, **config)
+                    slot[3] = config
+                return
+            # Kind changed at this depth: replace the item in place
+            item = self._create(kind, coords, config)
+            if i + 1 < len(self.slots):
+                self.canvas.tag_lower(item, self.slots[i + 1][0])
+            self.canvas.delete(slot[0])
+            self.slots[i] = [item, kind, coords, config]
+            return
+        self.slots.append([self._create(kind, coords, config), kind, coords, config])
+    
+    def draw(self, x, y, sprite, flip=False):
+        self._claim('image', (x, y), {'image': self.sprite_image(sprite, flip)})
     
     def rect(self, x, y, w, h, color):
-        self.canvas.create_rectangle(
-            x, y, x + w, y + h,
-            fill=color, outline=color, width=0
-        )
+        self._claim('rect', (x, y, x + w, y + h), {'fill': color, 'outline': color})
     
     def text(self, x, y, txt, color='#FCFCFC', size=8, anchor='nw'):
-        self.canvas.create_text(
-            x, y, text=txt, fill=color,
-            font=('Courier', size, 'bold'), anchor=anchor
-        )
+        self._claim('text', (x, y), {'text': txt, 'fill': color,
+                                     'font': ('Courier', size, 'bold'), 'anchor': anchor})
+
+class FramebufferRenderer(Renderer):
+    """Software framebuffer backend.
+
+    Sprites and rects are composited into an NES-resolution RGB bytearray,
+    which is pushed to a single PhotoImage once per frame as PPM data and
+    zoomed onto the canvas. Tk work stays at one image update per frame no
+    matter how busy the scene is; only text still uses pooled canvas items.
+    """
+    def __init__(self, canvas, scale):
+        super().__init__(canvas, scale)
+        self.w, self.h = NES_W, NES_H
+        self.buf = bytearray(self.w * self.h * 3)
+        self.header = b'P6 %d %d 255\n' % (self.w, self.h)
+        self.rgb = {}
+        # (id(sprite), flip) -> (sprite, [(row, col, rgb bytes)]) opaque pixel runs
+        self.runs = {}
+        self.frame_img = tk.PhotoImage(width=self.w, height=self.h)
+        self.screen_img = tk.PhotoImage(width=self.w * scale, height=self.h * scale)
+        self.item = canvas.create_image(0, 0, image=self.screen_img, anchor='nw')
+        canvas.tag_lower(self.item)
+    
+    def color_bytes(self, color):
+        rgb = self.rgb.get(color)
+        if rgb is None:
+            rgb = self.rgb[color] = bytes.fromhex(color[1:])
+        return rgb
+    
+    def sprite_runs(self, sprite, flip=False):
+        key = (id(sprite), flip)
+        entry = self.runs.get(key)
+        if entry is None:
+            runs = []
+            for ri, row in enumerate(sprite):
+                if flip:
+                    row = row[::-1]
+                ci = 0
+                while ci < len(row):
+                    if not PAL.get(row[ci]):
+                        ci += 1
+                        continue
+                    start = ci
+                    px = bytearray()
+                    while ci < len(row) and PAL.get(row[ci]):
+                        px += self.color_bytes(PAL[row[ci]])
+                        ci += 1
+                    runs.append((ri, start, bytes(px)))
+            entry = self.runs[key] = (sprite, runs)
+        return entry[1]
+    
+    def draw(self, x, y, sprite, flip=False):
+        s = self.scale
+        x, y = int(x) // s, int(y) // s
+        w, h, buf = self.w, self.h, self.buf
+        for ri, ci, px in self.sprite_runs(sprite, flip):
+            py = y + ri
+            if py < 0 or py >= h:
+                continue
+            x0 = x + ci
+            x1 = x0 + len(px) // 3
+            if x1 <= 0 or x0 >= w:
+                continue
+            if x0 < 0 or x1 > w:
+                px = px[max(0, -x0) * 3:len(px) - max(0, x1 - w) * 3]
+                x0 = max(0, x0)
+            off = (py * w + x0) * 3
+            buf[off:off + len(px)] = px
+    
+    def rect(self, x, y, w, h, color):
+        s = self.scale
+        x0, y0 = max(0, int(x) // s), max(0, int(y) // s)
+        x1, y1 = min(self.w, -(-int(x + w) // s)), min(self.h, -(-int(y + h) // s))
+        if x0 >= x1 or y0 >= y1:
+            return
+        line = self.color_bytes(color) * (x1 - x0)
+        for py in range(y0, y1):
+            off = (py * self.w + x0) * 3
+            self.buf[off:off + len(line)] = line
+    
+    def end_frame(self):
+        tk_call = self.canvas.tk.call
+        tk_call(self.frame_img, 'put', self.header + self.buf, '-format', 'ppm')
+        tk_call(self.screen_img, 'copy', self.frame_img, '-zoom', self.scale, self.scale)
+        super().end_frame()
 
 # ============================================================
 # LEVEL GENERATOR
@@ -677,7 +832,7 @@ class Phys:
 # GAME
 # ============================================================
 class Game:
-    def __init__(self, root):
+    def __init__(self, root, framebuffer=False):
         self.root = root
         root.title("ULTRA MARIO 2D BROS V0")
         root.geometry(f"{WIDTH}x{HEIGHT}")
@@ -688,7 +843,7 @@ class Game:
                                  bg=SKY, highlightthickness=0)
         self.canvas.pack()
         
-        self.r = Renderer(self.canvas, SCALE)
+        self.r = (FramebufferRenderer if framebuffer else Renderer)(self.canvas, SCALE)
         
         self.keys = set()
         root.bind('<KeyPress>', lambda e: self.keys.add(e.keysym.lower()))
@@ -712,10 +867,19 @@ class Game:
         
         self.particles = []
         
+        # Debug overlay (F3): smoothed frame time and live Tk item count
+        self.debug = False
+        self.frame_ms = 0.0
+        
         self.loop()
     
     def loop(self):
-        self.canvas.delete('all')
+        t0 = time.perf_counter()
+        self.r.begin_frame()
+        
+        if 'f3' in self.keys:
+            self.keys.discard('f3')
+            self.debug = not self.debug
         
         if self.state == 'menu':
             self.update_menu()
@@ -733,9 +897,20 @@ class Game:
             self.draw_clear()
             self.update_clear()
         
+        if self.debug:
+            self.draw_debug()
+        self.r.end_frame()
+        
+        self.frame_ms += ((time.perf_counter() - t0) * 1000 - self.frame_ms) * 0.1
         self.frame += 1
         self.root.after(FRAME_MS, self.loop)
     
+    def draw_debug(self):
+        self.r.rect(WIDTH - 110 * SCALE, HEIGHT - 12 * SCALE, 110 * SCALE, 12 * SCALE, '#000000')
+        self.r.text(WIDTH - 4 * SCALE, HEIGHT - 3 * SCALE,
+                    f"{self.frame_ms:5.2f}MS  {self.r.item_count()} ITEMS",
+                    '#00FC00', 5 * SCALE // 2, 'se')
+    
     # ========== MENU ==========
     def update_menu(self):
         if 'up' in self.keys:
@@ -1257,8 +1432,10 @@ if __name__ == "__main__":
     print("    ← →  / A D   : Move")
     print("    Z / Space / W : Jump")
     print("    X / Shift     : Run")
+    print("    F3            : Debug overlay")
+    print("    (run with --framebuffer for the single-image backend)")
     print("=" * 55)
     
     root = tk.Tk()
-    game = Game(root)
+    game = Game(root, framebuffer='--framebuffer' in sys.argv)
     root.mainloop()
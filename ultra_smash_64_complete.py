@@ -16,6 +16,12 @@ import sys
 import json
 from enum import Enum, auto
 
+try:
+    import chipaudio
+    CHIPAUDIO_AVAILABLE = True
+except ImportError:
+    CHIPAUDIO_AVAILABLE = False
+
 # =============================================================================
 # INITIALIZATION
 # =============================================================================
@@ -65,6 +71,8 @@ class SoundManager:
         self._generate_sounds()
     
     def _create_sound(self, frequency, duration, volume=0.3, wave_type='square', decay=True):
+        if CHIPAUDIO_AVAILABLE:
+            return chipaudio.smash_sound(frequency, duration, volume, wave_type, decay)
         sample_rate = 22050
         n_samples = int(sample_rate * duration)
         buf = []
@@ -6,6 +6,7 @@ A Splatoon-inspired ink shooter with RPG elements
 """
 
 import pygame
+import numpy as np
 import math
 import random
 import sys
@@ -49,6 +50,19 @@ PALETTES = [
 ]
 ENEMY_COLOR = (255, 107, 138)
 
+# Disk stamps for paint_circle, keyed by radius in grid cells
+DISK_MASKS = {}
+
+
+def disk_mask(r):
+    """Boolean (2r+1, 2r+1) stamp of cells with dx * dx + dy * dy <= r * r"""
+    mask = DISK_MASKS.get(r)
+    if mask is None:
+        d = np.arange(-r, r + 1)
+        mask = d[:, None] ** 2 + d[None, :] ** 2 <= r * r
+        DISK_MASKS[r] = mask
+    return mask
+
 
 # ============================================================================
 # GAME STATE
@@ -105,6 +119,32 @@ class Enemy:
     dead: bool = False
 
 
+class EnemyHorde:
+    """Enemies as parallel arrays (horde mode), one entry per live enemy"""
+    FIELDS = ("x", "y", "hp", "cooldown", "target_x", "target_y")
+    
+    def __init__(self):
+        self.clear()
+    
+    def __len__(self):
+        return len(self.x)
+    
+    def clear(self):
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(0))
+    
+    def add(self, x, y):
+        """Append an enemy with the same defaults as Enemy"""
+        values = {"x": x, "y": y, "hp": 40, "cooldown": 0,
+                  "target_x": GRID_W / 2, "target_y": GRID_H / 2}
+        for name in self.FIELDS:
+            setattr(self, name, np.append(getattr(self, name), values[name]))
+    
+    def keep(self, mask):
+        for name in self.FIELDS:
+            setattr(self, name, getattr(self, name)[mask])
+
+
 @dataclass
 class Bomb:
     x: float
@@ -185,7 +225,7 @@ class SoundSystem:
 # MAIN GAME CLASS
 # ============================================================================
 class UltraSplatoon:
-    def __init__(self):
+    def __init__(self, horde=False):
         pygame.init()
         pygame.display.set_caption("Ultra!Splatoon 0.1")
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -202,14 +242,20 @@ class UltraSplatoon:
         self.state_timer = 0
         self.palette_index = 0
         
-        # Ink grid
-        self.ink_owner = [[TEAM_NONE] * GRID_H for _ in range(GRID_W)]
-        self.ink_alpha = [[0.0] * GRID_H for _ in range(GRID_W)]
-        self.walls = [[False] * GRID_H for _ in range(GRID_W)]
+        # Ink grid, indexed [x, y]; alpha runs from -1 (enemy) to 1 (player)
+        self.ink_owner = np.full((GRID_W, GRID_H), TEAM_NONE, dtype=np.uint8)
+        self.ink_alpha = np.zeros((GRID_W, GRID_H))
+        self.walls = np.zeros((GRID_W, GRID_H), dtype=bool)
+        self.open_cells = GRID_W * GRID_H
+        self.territory_counts = [0, 0, 0]  # inked cells per team, kept up to date by paint_circle
         
         # Entities
         self.player = Player()
         self.enemies: List[Enemy] = []
+        self.horde_mode = horde  # enemies live in self.horde instead of self.enemies
+        self.horde = EnemyHorde()
+        self.horde_rng = np.random.default_rng()
+        self.enemy_sprite = None
         self.bombs: List[Bomb] = []
         self.pellets: List[Pellet] = []
         
@@ -232,8 +278,12 @@ class UltraSplatoon:
         self.toast_text = ""
         self.toast_timer = 0
         
-        # Pre-render ink surface for performance
+        # Pre-render ink surface for performance; only dirty grid rows are
+        # recoloured and re-scaled into the cached screen-sized copy
         self.ink_surface = pygame.Surface((GRID_W, GRID_H))
+        self.ink_scaled = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.ink_dirty_rows = np.ones(GRID_H, dtype=bool)
+        self.ink_palette_index = None
     
     def run(self):
         running = True
@@ -323,14 +373,15 @@ class UltraSplatoon:
     
     def reset_level(self):
         # Clear grids
-        for x in range(GRID_W):
-            for y in range(GRID_H):
-                self.ink_owner[x][y] = TEAM_NONE
-                self.ink_alpha[x][y] = 0
-                self.walls[x][y] = False
+        self.ink_owner.fill(TEAM_NONE)
+        self.ink_alpha.fill(0)
+        self.walls.fill(False)
         
         # Generate tech demo level
         self.generate_tech_demo()
+        self.open_cells = int(np.count_nonzero(~self.walls))
+        self.territory_counts = [0, 0, 0]
+        self.mark_ink_dirty(0, GRID_H)
         
         # Reset player
         self.player.reset()
@@ -340,6 +391,7 @@ class UltraSplatoon:
         
         # Reset entities
         self.enemies.clear()
+        self.horde.clear()
         self.bombs.clear()
         self.pellets.clear()
         
@@ -357,11 +409,11 @@ class UltraSplatoon:
         """Generate the tech demo level layout"""
         # Border walls
         for x in range(GRID_W):
-            self.walls[x][0] = True
-            self.walls[x][GRID_H - 1] = True
+            self.walls[x, 0] = True
+            self.walls[x, GRID_H - 1] = True
         for y in range(GRID_H):
-            self.walls[0][y] = True
-            self.walls[GRID_W - 1][y] = True
+            self.walls[0, y] = True
+            self.walls[GRID_W - 1, y] = True
         
         # Central structure
         cx, cy = GRID_W // 2, GRID_H // 2
@@ -374,7 +426,7 @@ class UltraSplatoon:
                         continue
                     if abs(dx) < 10 and abs(dy) < 3:
                         continue
-                    self.walls[x][y] = True
+                    self.walls[x, y] = True
         
         # Corner pillars
         corners = [(25, 20), (GRID_W - 26, 20), (25, GRID_H - 21), (GRID_W - 26, GRID_H - 21)]
@@ -384,19 +436,19 @@ class UltraSplatoon:
                     x, y = cx + dx, cy + dy
                     if 0 < x < GRID_W - 1 and 0 < y < GRID_H - 1:
                         if dx * dx + dy * dy <= 25:
-                            self.walls[x][y] = True
+                            self.walls[x, y] = True
         
         # Side barriers
         for x in range(35, 55):
-            self.walls[x][35] = True
-            self.walls[x][36] = True
-            self.walls[x][GRID_H - 36] = True
-            self.walls[x][GRID_H - 37] = True
+            self.walls[x, 35] = True
+            self.walls[x, 36] = True
+            self.walls[x, GRID_H - 36] = True
+            self.walls[x, GRID_H - 37] = True
         for x in range(GRID_W - 55, GRID_W - 35):
-            self.walls[x][35] = True
-            self.walls[x][36] = True
-            self.walls[x][GRID_H - 36] = True
-            self.walls[x][GRID_H - 37] = True
+            self.walls[x, 35] = True
+            self.walls[x, 36] = True
+            self.walls[x, GRID_H - 36] = True
+            self.walls[x, GRID_H - 37] = True
     
     def spawn_enemy(self):
         attempts = 0
@@ -412,7 +464,10 @@ class UltraSplatoon:
                 x, y = GRID_W - 6, random.randint(5, GRID_H - 6)
             
             if not self.is_wall(x, y):
-                self.enemies.append(Enemy(x=float(x), y=float(y)))
+                if self.horde_mode:
+                    self.horde.add(float(x), float(y))
+                else:
+                    self.enemies.append(Enemy(x=float(x), y=float(y)))
                 return
             attempts += 1
     
@@ -452,19 +507,34 @@ class UltraSplatoon:
         ix, iy = int(round(x)), int(round(y))
         if ix < 0 or iy < 0 or ix >= GRID_W or iy >= GRID_H:
             return True
-        return self.walls[ix][iy]
+        return bool(self.walls[ix, iy])
+    
+    def mark_ink_dirty(self, y0, y1):
+        self.ink_dirty_rows[y0:y1] = True
     
     def paint_circle(self, cx, cy, r, team, alpha=0.8):
-        r2 = r * r
-        for dx in range(-r, r + 1):
-            for dy in range(-r, r + 1):
-                x, y = cx + dx, cy + dy
-                if 0 <= x < GRID_W and 0 <= y < GRID_H:
-                    if not self.walls[x][y] and dx * dx + dy * dy <= r2:
-                        self.ink_owner[x][y] = team
-                        current = self.ink_alpha[x][y]
-                        delta = alpha if team == TEAM_PLAYER else -alpha
-                        self.ink_alpha[x][y] = max(-1, min(1, current + delta))
+        # Clip the disk stamp to the grid, skipping walls
+        x0, x1 = max(0, cx - r), min(GRID_W, cx + r + 1)
+        y0, y1 = max(0, cy - r), min(GRID_H, cy + r + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        mask = disk_mask(r)[x0 - (cx - r):x1 - (cx - r), y0 - (cy - r):y1 - (cy - r)]
+        mask = mask & ~self.walls[x0:x1, y0:y1]
+        owner = self.ink_owner[x0:x1, y0:y1]
+        ink = self.ink_alpha[x0:x1, y0:y1]
+        
+        # Territory: drop what the stamp covered before, add it back as `team`
+        old_owner = owner[mask]
+        old_inked = ink[mask] > 0
+        for t in (TEAM_PLAYER, TEAM_ENEMY):
+            self.territory_counts[t] -= int(np.count_nonzero(old_inked & (old_owner == t)))
+        delta = alpha if team == TEAM_PLAYER else -alpha
+        new_alpha = np.clip(ink[mask] + delta, -1, 1)
+        owner[mask] = team
+        ink[mask] = new_alpha
+        self.territory_counts[team] += int(np.count_nonzero(new_alpha > 0))
+        
+        self.mark_ink_dirty(y0, y1)
     
     def flood_spray(self, cx, cy, steps, team, spread=8):
         for _ in range(int(steps)):
@@ -474,20 +544,11 @@ class UltraSplatoon:
             y = int(round(cy + math.sin(angle) * dist))
             x = max(0, min(GRID_W - 1, x))
             y = max(0, min(GRID_H - 1, y))
-            if not self.walls[x][y]:
+            if not self.walls[x, y]:
                 self.paint_circle(x, y, random.randint(1, 2), team, 0.5)
     
     def territory_ratio(self, team):
-        owned = 0
-        total = 0
-        for x in range(GRID_W):
-            for y in range(GRID_H):
-                if self.walls[x][y]:
-                    continue
-                total += 1
-                if self.ink_owner[x][y] == team and self.ink_alpha[x][y] > 0:
-                    owned += 1
-        return owned / total if total > 0 else 0
+        return self.territory_counts[team] / self.open_cells if self.open_cells > 0 else 0
     
     def update(self, dt):
         self.state_timer += dt
@@ -530,6 +591,8 @@ class UltraSplatoon:
         self.update_player(dt)
         
         # Update enemies
+        if self.horde_mode:
+            self.update_horde(dt)
         for enemy in self.enemies:
             self.update_enemy(enemy, dt)
         self.enemies = [e for e in self.enemies if not e.dead]
@@ -569,10 +632,10 @@ class UltraSplatoon:
         my_ink = 0
         enemy_ink = 0
         if 0 <= ix < GRID_W and 0 <= iy < GRID_H:
-            if self.ink_owner[ix][iy] == TEAM_PLAYER:
-                my_ink = max(0, self.ink_alpha[ix][iy])
-            elif self.ink_owner[ix][iy] == TEAM_ENEMY:
-                enemy_ink = max(0, self.ink_alpha[ix][iy])
+            if self.ink_owner[ix, iy] == TEAM_PLAYER:
+                my_ink = max(0, float(self.ink_alpha[ix, iy]))
+            elif self.ink_owner[ix, iy] == TEAM_ENEMY:
+                enemy_ink = max(0, float(self.ink_alpha[ix, iy]))
         
         # Calculate speed
         swim_mul = 1 + p.perks["swim_speed"] * 0.25
@@ -672,7 +735,7 @@ class UltraSplatoon:
         ix, iy = int(round(e.x)), int(round(e.y))
         on_enemy_ink = False
         if 0 <= ix < GRID_W and 0 <= iy < GRID_H:
-            on_enemy_ink = self.ink_owner[ix][iy] == TEAM_ENEMY and self.ink_alpha[ix][iy] > 0.15
+            on_enemy_ink = self.ink_owner[ix, iy] == TEAM_ENEMY and self.ink_alpha[ix, iy] > 0.15
         
         if player_dist < 6 and e.cooldown <= 0 and on_enemy_ink:
             self.player.hp -= 6
@@ -684,28 +747,130 @@ class UltraSplatoon:
         # Check death
         if e.hp <= 0:
             e.dead = True
-            self.splat_count += 1
-            self.player.xp += 25
-            
-            # Level up
-            if self.player.xp >= self.player.xp_to:
-                self.player.level += 1
-                self.player.xp = 0
-                self.player.xp_to = int(self.player.xp_to * 1.35)
-                self.perk_choices = self.roll_perks()
-                self.show_toast("Level up! Press E for perk")
-                self.sound.level_up()
-            
-            # Gear drop
-            if random.random() < 0.12:
-                tiers = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
-                r = random.random()
-                new_tier = 4 if r > 0.985 else 3 if r > 0.94 else 2 if r > 0.75 else 1 if r > 0.45 else 0
-                if new_tier > self.player.gear_tier:
-                    self.player.gear_tier = new_tier
-                    self.show_toast(f"Gear: {tiers[new_tier]}")
-            
-            self.sound.thud()
+            self.enemy_splatted()
+    
+    def enemy_splatted(self):
+        """Rewards for one splatted enemy"""
+        self.splat_count += 1
+        self.player.xp += 25
+        
+        # Level up
+        if self.player.xp >= self.player.xp_to:
+            self.player.level += 1
+            self.player.xp = 0
+            self.player.xp_to = int(self.player.xp_to * 1.35)
+            self.perk_choices = self.roll_perks()
+            self.show_toast("Level up! Press E for perk")
+            self.sound.level_up()
+        
+        # Gear drop
+        if random.random() < 0.12:
+            tiers = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
+            r = random.random()
+            new_tier = 4 if r > 0.985 else 3 if r > 0.94 else 2 if r > 0.75 else 1 if r > 0.45 else 0
+            if new_tier > self.player.gear_tier:
+                self.player.gear_tier = new_tier
+                self.show_toast(f"Gear: {tiers[new_tier]}")
+        
+        self.sound.thud()
+    
+    def walls_at(self, xs, ys):
+        """is_wall for arrays of positions"""
+        ix = np.round(xs).astype(np.int64)
+        iy = np.round(ys).astype(np.int64)
+        inside = (ix >= 0) & (iy >= 0) & (ix < GRID_W) & (iy < GRID_H)
+        hit = ~inside
+        hit[inside] = self.walls[ix[inside], iy[inside]]
+        return hit
+    
+    def paint_stamps(self, xs, ys, r, team, alpha):
+        """paint_circle at many integer centres at once.
+        
+        Overlapping stamps of one team add up and clamp exactly as the same
+        calls made one after another would, since every delta has one sign.
+        """
+        d = np.arange(-r, r + 1)
+        dx, dy = np.nonzero(disk_mask(r))
+        px = (xs[:, None] + d[dx][None, :]).ravel()
+        py = (ys[:, None] + d[dy][None, :]).ravel()
+        inside = (px >= 0) & (px < GRID_W) & (py >= 0) & (py < GRID_H)
+        hits = np.bincount(px[inside] * GRID_H + py[inside], minlength=GRID_W * GRID_H)
+        hits = hits.reshape(GRID_W, GRID_H)
+        hits[self.walls] = 0
+        cells = hits > 0
+        if not cells.any():
+            return
+        
+        old_owner = self.ink_owner[cells]
+        old_inked = self.ink_alpha[cells] > 0
+        for t in (TEAM_PLAYER, TEAM_ENEMY):
+            self.territory_counts[t] -= int(np.count_nonzero(old_inked & (old_owner == t)))
+        delta = alpha if team == TEAM_PLAYER else -alpha
+        new_alpha = np.clip(self.ink_alpha[cells] + delta * hits[cells], -1, 1)
+        self.ink_owner[cells] = team
+        self.ink_alpha[cells] = new_alpha
+        self.territory_counts[team] += int(np.count_nonzero(new_alpha > 0))
+        self.ink_dirty_rows |= cells.any(axis=0)
+    
+    def update_horde(self, dt):
+        """update_enemy for every horde enemy in one pass.
+        
+        Same rules in the same order (cooldown, retarget, move, trail, attack,
+        death). The one difference: the "standing in enemy ink" attack check
+        sees this frame's trails from all enemies, not only the ones updated
+        before it.
+        """
+        h = self.horde
+        n = len(h)
+        if n == 0:
+            return
+        np.maximum(h.cooldown - dt, 0, out=h.cooldown)
+        
+        # Retarget occasionally
+        retarget = self.horde_rng.random(n) < 0.02
+        k = int(np.count_nonzero(retarget))
+        if k:
+            h.target_x[retarget] = self.player.x + self.horde_rng.uniform(-40, 40, k)
+            h.target_y[retarget] = self.player.y + self.horde_rng.uniform(-30, 30, k)
+        
+        # Move toward target, x then y, each axis blocked separately by walls
+        dx = h.target_x - h.x
+        dy = h.target_y - h.y
+        dist = np.hypot(dx, dy)
+        dist[dist == 0] = 1
+        speed = 1.6
+        nx = h.x + (dx / dist) * speed * dt * 60
+        ny = h.y + (dy / dist) * speed * dt * 60
+        
+        free = ~self.walls_at(nx, h.y)
+        h.x[free] = np.clip(nx[free], 2, GRID_W - 3)
+        free = ~self.walls_at(h.x, ny)
+        h.y[free] = np.clip(ny[free], 2, GRID_H - 3)
+        
+        # Paint trails
+        ix = np.round(h.x).astype(np.int64)
+        iy = np.round(h.y).astype(np.int64)
+        self.paint_stamps(ix, iy, 3, TEAM_ENEMY, 0.8)
+        
+        # Attack player
+        player_dist = np.hypot(self.player.x - h.x, self.player.y - h.y)
+        on_enemy_ink = (self.ink_owner[ix, iy] == TEAM_ENEMY) & (self.ink_alpha[ix, iy] > 0.15)
+        attacks = (player_dist < 6) & (h.cooldown <= 0) & on_enemy_ink
+        hits = int(np.count_nonzero(attacks))
+        if hits:
+            h.cooldown[attacks] = 0.6
+            alive_before = self.player.hp > 0
+            self.player.hp -= 6 * hits
+            if self.player.hp <= 0 and alive_before:
+                self.state = GameState.LOSE
+                self.sound.lose()
+        
+        # Check death
+        dead = h.hp <= 0
+        if dead.any():
+            for _ in range(int(np.count_nonzero(dead))):
+                self.enemy_splatted()
+            h.keep(~dead)
     
     def update_bomb(self, b: Bomb, dt):
         b.timer += dt
@@ -725,6 +890,8 @@ class UltraSplatoon:
                 dist = math.hypot(e.x - b.x, e.y - b.y)
                 if dist <= b.power:
                     e.hp -= 25
+            if len(self.horde):
+                self.horde.hp[np.hypot(self.horde.x - b.x, self.horde.y - b.y) <= b.power] -= 25
             
             b.dead = True
     
@@ -744,6 +911,8 @@ class UltraSplatoon:
             dist = math.hypot(e.x - p.x, e.y - p.y)
             if dist < 3:
                 e.hp -= 3
+        if len(self.horde):
+            self.horde.hp[np.hypot(self.horde.x - p.x, self.horde.y - p.y) < 3] -= 3
     
     def draw(self):
         self.screen.fill(COLOR_BG)
@@ -830,36 +999,8 @@ class UltraSplatoon:
         palette = PALETTES[self.palette_index]
         
         # Render ink field to surface
-        for x in range(GRID_W):
-            for y in range(GRID_H):
-                if self.walls[x][y]:
-                    color = COLOR_WALL
-                else:
-                    owner = self.ink_owner[x][y]
-                    alpha_val = self.ink_alpha[x][y]
-                    
-                    if owner == TEAM_PLAYER and alpha_val > 0:
-                        t = max(0, min(1, alpha_val))
-                        color = (
-                            int(COLOR_BG[0] + (palette["ink"][0] - COLOR_BG[0]) * t),
-                            int(COLOR_BG[1] + (palette["ink"][1] - COLOR_BG[1]) * t),
-                            int(COLOR_BG[2] + (palette["ink"][2] - COLOR_BG[2]) * t),
-                        )
-                    elif owner == TEAM_ENEMY and alpha_val > 0:
-                        t = max(0, min(1, alpha_val))
-                        color = (
-                            int(COLOR_BG[0] + (ENEMY_COLOR[0] - COLOR_BG[0]) * t),
-                            int(COLOR_BG[1] + (ENEMY_COLOR[1] - COLOR_BG[1]) * t),
-                            int(COLOR_BG[2] + (ENEMY_COLOR[2] - COLOR_BG[2]) * t),
-                        )
-                    else:
-                        color = COLOR_BG
-                
-                self.ink_surface.set_at((x, y), color)
-        
-        # Scale up and blit
-        scaled = pygame.transform.scale(self.ink_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.screen.blit(scaled, (0, 0))
+        self.refresh_ink_surface(palette)
+        self.screen.blit(self.ink_scaled, (0, 0))
         
         # Draw entities
         for pellet in self.pellets:
@@ -875,6 +1016,19 @@ class UltraSplatoon:
             pygame.draw.circle(self.screen, ENEMY_COLOR, (ex, ey), int(3 * SCALE))
             pygame.draw.rect(self.screen, COLOR_BLACK, (ex - 2, ey - 2, 4, 4))
         
+        if len(self.horde):
+            # One pre-drawn sprite blitted in a batch instead of two draw calls each
+            r = int(3 * SCALE)
+            if self.enemy_sprite is None or self.enemy_sprite.get_width() != 2 * r + 1:
+                self.enemy_sprite = pygame.Surface((2 * r + 1, 2 * r + 1))
+                self.enemy_sprite.set_colorkey(COLOR_BG)
+                self.enemy_sprite.fill(COLOR_BG)
+                pygame.draw.circle(self.enemy_sprite, ENEMY_COLOR, (r, r), r)
+                pygame.draw.rect(self.enemy_sprite, COLOR_BLACK, (r - 2, r - 2, 4, 4))
+            ex = (self.horde.x * SCALE).astype(int) - r
+            ey = (self.horde.y * SCALE).astype(int) - r
+            self.screen.blits([(self.enemy_sprite, pos) for pos in zip(ex.tolist(), ey.tolist())], False)
+        
         # Player
         px, py = int(self.player.x * SCALE), int(self.player.y * SCALE)
         pygame.draw.circle(self.screen, palette["roller"], (px, py), int(3.5 * SCALE))
@@ -884,6 +1038,40 @@ class UltraSplatoon:
         aim_y = py + int(math.sin(self.player.angle) * 15)
         pygame.draw.rect(self.screen, COLOR_BLACK, (aim_x - 2, aim_y - 2, 4, 4))
     
+    def refresh_ink_surface(self, palette):
+        """Recolour dirty grid rows and re-scale them into the cached surface"""
+        if self.ink_palette_index != self.palette_index:
+            self.ink_palette_index = self.palette_index
+            self.mark_ink_dirty(0, GRID_H)
+        if not self.ink_dirty_rows.any():
+            return
+        
+        # Palette lerp from the background: row 0 = bare floor, 1 = player, 2 = enemy
+        bg = np.array(COLOR_BG, dtype=np.float64)
+        targets = np.array([COLOR_BG, palette["ink"], ENEMY_COLOR], dtype=np.float64)
+        
+        # Contiguous runs of dirty rows
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], self.ink_dirty_rows.view(np.int8), [0]))))
+        self.ink_dirty_rows[:] = False
+        pixels = pygame.surfarray.pixels3d(self.ink_surface)
+        for y0, y1 in zip(edges[0::2], edges[1::2]):
+            owner = self.ink_owner[:, y0:y1]
+            alpha = self.ink_alpha[:, y0:y1]
+            team = np.where(alpha > 0, owner, TEAM_NONE)
+            t = np.clip(alpha, 0, 1)[..., None]
+            rgb = (bg + (targets[team] - bg) * t).astype(np.uint8)
+            rgb[self.walls[:, y0:y1]] = COLOR_WALL
+            pixels[:, y0:y1] = rgb
+        del pixels
+        
+        for y0, y1 in zip(edges[0::2], edges[1::2]):
+            sy0 = y0 * SCREEN_HEIGHT // GRID_H
+            sy1 = y1 * SCREEN_HEIGHT // GRID_H
+            if sy1 > sy0:
+                strip = self.ink_surface.subsurface((0, y0, GRID_W, y1 - y0))
+                dest = self.ink_scaled.subsurface((0, sy0, SCREEN_WIDTH, sy1 - sy0))
+                pygame.transform.scale(strip, (SCREEN_WIDTH, sy1 - sy0), dest)
+    
     def draw_hud(self):
         # Top-left stats panel
         panel_rect = pygame.Rect(8, 8, 180, 80)
@@ -1030,9 +1218,81 @@ class UltraSplatoon:
         self.screen.blit(text3, rect3)
 
 
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def benchmark_ink(frames=300, sizes=((150, 100), (300, 200))):
+    """Scripted match (spray, roller, enemy trails) at several grid sizes"""
+    global GRID_W, GRID_H, SCALE
+    import time
+    
+    saved = GRID_W, GRID_H, SCALE
+    print(f"Ink field, {frames} frames per grid")
+    print(f"{'grid':<10}{'update ms':>12}{'draw ms':>10}{'frame ms':>10}")
+    for w, h in sizes:
+        GRID_W, GRID_H, SCALE = w, h, SCREEN_WIDTH / w
+        random.seed(1)
+        game = UltraSplatoon()
+        game.start_game()
+        for _ in range(12):
+            game.spawn_enemy()
+        game.mouse_pos = (SCREEN_WIDTH * 2 // 3, SCREEN_HEIGHT // 3)
+        game.mouse_down = True
+        update_t = draw_t = 0.0
+        for f in range(frames):
+            game.mouse_right = (f // 50) % 2 == 1
+            game.keys[pygame.K_d] = (f // 70) % 2 == 0
+            game.keys[pygame.K_s] = (f // 90) % 2 == 0
+            game.match_time = 0
+            t0 = time.perf_counter()
+            game.update_game(1 / 60)
+            t1 = time.perf_counter()
+            game.draw_game()
+            draw_t += time.perf_counter() - t1
+            update_t += t1 - t0
+        update_ms = update_t * 1000 / frames
+        draw_ms = draw_t * 1000 / frames
+        print(f"{w}x{h:<6}{update_ms:>12.2f}{draw_ms:>10.2f}{update_ms + draw_ms:>10.2f}")
+    GRID_W, GRID_H, SCALE = saved
+    pygame.quit()
+
+
+def benchmark_horde(counts=(10, 50, 200, 500, 1000, 2000), frames=60):
+    """Per-frame update + draw cost of classic enemies vs horde mode"""
+    import time
+    
+    print(f"Enemies, {frames} frames per run")
+    print(f"{'enemies':<10}{'classic ms':>12}{'horde ms':>10}{'speedup':>10}")
+    for count in counts:
+        times = []
+        for horde in (False, True):
+            random.seed(1)
+            game = UltraSplatoon(horde=horde)
+            game.horde_rng = np.random.default_rng(1)
+            game.start_game()
+            for _ in range(count - 3):
+                game.spawn_enemy()
+            game.player.hp = game.player.hp_max = 10 ** 9
+            game.mouse_pos = (SCREEN_WIDTH * 2 // 3, SCREEN_HEIGHT // 3)
+            game.mouse_down = True
+            start = time.perf_counter()
+            for _ in range(frames):
+                game.match_time = 0
+                game.update_game(1 / 60)
+                game.draw_game()
+            times.append((time.perf_counter() - start) * 1000 / frames)
+        print(f"{count:<10}{times[0]:>12.2f}{times[1]:>10.2f}{times[0] / times[1]:>9.1f}x")
+    pygame.quit()
+
+
 # ============================================================================
 # ENTRY POINT
 # ============================================================================
 if __name__ == "__main__":
-    game = UltraSplatoon()
-    game.run()
+    if "--bench" in sys.argv:
+        benchmark_ink()
+    elif "--bench-horde" in sys.argv:
+        benchmark_horde()
+    else:
+        game = UltraSplatoon(horde="--horde" in sys.argv)
+        game.run()
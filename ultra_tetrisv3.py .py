@@ -12,18 +12,33 @@ Samsoft • © The Tetris Company • Team Flames • 2025
 • Full sound settings
 """
 
-import pygame
 import random
 import math
 import array
 import sys
 import os
+import time
 import json
 from datetime import datetime
 from enum import Enum, auto
 from dataclasses import dataclass, field, asdict
 from typing import List, Optional, Tuple, Dict
 
+# Self-play runs headless, and its JSON lines on stdout must not follow
+# pygame's import banner, so this comes before the import
+if '--selfplay' in sys.argv or '--bench-ai' in sys.argv:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+try:
+    import chipaudio
+    CHIPAUDIO_AVAILABLE = True
+except ImportError:
+    CHIPAUDIO_AVAILABLE = False
+
 # ============================================================
 # INITIALIZE PYGAME
 # ============================================================
@@ -473,6 +488,8 @@ class FamicomSoundEngine:
         self._apply_volumes()
     
     def _square_wave(self, frequency: float, duration: float, duty: float = 0.5, volume: float = 0.15) -> array.array:
+        if CHIPAUDIO_AVAILABLE:
+            return chipaudio.famicom_square_wave(frequency, duration, duty, volume, self.sample_rate)
         n_samples = int(self.sample_rate * duration)
         samples = array.array('h')
         
@@ -826,11 +843,15 @@ class TetrisEngine:
             return False
         return True
     
-    def _check_lines(self):
+    def _full_rows(self) -> List[int]:
         lines_to_clear = []
         for y in range(BOARD_HEIGHT):
             if all(cell is not None for cell in self.board[y]):
                 lines_to_clear.append(y)
+        return lines_to_clear
+    
+    def _check_lines(self):
+        lines_to_clear = self._full_rows()
         
         if lines_to_clear:
             self.clearing_lines = lines_to_clear
@@ -850,8 +871,11 @@ class TetrisEngine:
     def _clear_lines(self):
         num_lines = len(self.clearing_lines)
         
+        # Delete every cleared row before refilling the top; inserting
+        # between deletions would shift the remaining indices
         for y in sorted(self.clearing_lines, reverse=True):
             del self.board[y]
+        for _ in range(num_lines):
             self.board.insert(0, [None for _ in range(BOARD_WIDTH)])
         
         self.score += SCORE_TABLE.get(num_lines, 0) * self.level
@@ -957,6 +981,129 @@ class TetrisEngine:
         
         return True, lines_cleared
 
+# ============================================================
+# BITBOARD ENGINE
+# ============================================================
+FULL_ROW = (1 << BOARD_WIDTH) - 1
+
+def build_piece_masks() -> Dict[str, list]:
+    """Per shape and rotation: (left, right, bottom, row masks, column bottoms).
+    Row masks are (dy, bits) with bit cx set for each cell; column bottoms
+    are (cx, lowest dy) for every column the piece occupies."""
+    masks = {}
+    for shape, piece in SHAPES.items():
+        rots = []
+        for cells in piece['rotations']:
+            rows: Dict[int, int] = {}
+            bottoms: Dict[int, int] = {}
+            for cx, cy in cells:
+                rows[cy] = rows.get(cy, 0) | (1 << cx)
+                bottoms[cx] = max(bottoms.get(cx, cy), cy)
+            xs = [cx for cx, _ in cells]
+            rots.append((min(xs), max(xs), max(cy for _, cy in cells),
+                         tuple(sorted(rows.items())), tuple(sorted(bottoms.items()))))
+        masks[shape] = rots
+    return masks
+
+PIECE_MASKS = build_piece_masks()
+
+class BitboardTetrisEngine(TetrisEngine):
+    """TetrisEngine core on integer bitmasks.
+    
+    `rows[y]` has bit x set for every filled cell and `cols[x]` has bit y
+    set, alongside the usual `board` color plane that the draw code reads.
+    Collision is a few shifts and ANDs against precomputed rotation masks,
+    a full row is `rows[y] == FULL_ROW`, and the ghost drop comes from the
+    column bitmasks instead of stepping down one row at a time.
+    """
+    
+    def reset(self):
+        self.rows = [0] * BOARD_HEIGHT
+        self.cols = [0] * BOARD_WIDTH
+        self.pieces_locked = 0
+        super().reset()
+    
+    def _masks(self, rotation: int, shape: Optional[str] = None):
+        rots = PIECE_MASKS[shape or self.current_shape]
+        return rots[rotation % len(rots)]
+    
+    def _check_collision(self, x: int, y: int, rotation: int, shape: Optional[str] = None) -> bool:
+        left, right, bottom, rows, _ = self._masks(rotation, shape)
+        if x + left < 0 or x + right >= BOARD_WIDTH or y + bottom >= BOARD_HEIGHT:
+            return True
+        board_rows = self.rows
+        for dy, bits in rows:
+            r = y + dy
+            if r >= 0 and board_rows[r] & (bits << x if x >= 0 else bits >> -x):
+                return True
+        return False
+    
+    def drop_distance(self, x: int, y: int, rotation: int, shape: Optional[str] = None) -> int:
+        """Rows the piece (or `shape`) can fall from (x, y) before it lands"""
+        distance = BOARD_HEIGHT
+        for cx, dy in self._masks(rotation, shape)[4]:
+            below = y + dy + 1  # first row under this column's lowest cell
+            col = self.cols[x + cx]
+            col = col >> below if below >= 0 else col << -below
+            if col:
+                gap = (col & -col).bit_length() - 1
+            else:
+                gap = BOARD_HEIGHT - below
+            distance = min(distance, gap)
+        return distance
+    
+    def get_ghost_y(self) -> int:
+        if self._check_collision(self.current_x, self.current_y, self.rotation):
+            return self.current_y  # swapped in by hold on top of the stack
+        return self.current_y + self.drop_distance(self.current_x, self.current_y, self.rotation)
+    
+    def column_heights(self) -> List[int]:
+        """Stack height per column (0 = empty)"""
+        return [BOARD_HEIGHT - ((c & -c).bit_length() - 1) if c else 0 for c in self.cols]
+    
+    def hard_drop(self) -> int:
+        drop_distance = self.get_ghost_y() - self.current_y
+        self.current_y += drop_distance
+        self.score += drop_distance * 2
+        self.hard_drops_used += 1
+        return drop_distance
+    
+    def _lock_piece(self):
+        color = self.current_piece['color']
+        for cx, cy in self._get_cells(self.current_x, self.current_y, self.rotation):
+            if 0 <= cy < BOARD_HEIGHT and 0 <= cx < BOARD_WIDTH:
+                self.board[cy][cx] = color
+                self.rows[cy] |= 1 << cx
+                self.cols[cx] |= 1 << cy
+        self.pieces_locked += 1
+        
+        self._check_lines()
+        
+        if not self._spawn_piece():
+            return False
+        return True
+    
+    def _full_rows(self) -> List[int]:
+        # Only rows the piece just locked into can have become full, plus any
+        # still waiting out the clear animation (hard drop stays live then)
+        rows = self.rows
+        candidates = {self.current_y + dy for dy, _ in self._masks(self.rotation)[3]}
+        candidates.update(self.clearing_lines)
+        return [y for y in sorted(candidates)
+                if 0 <= y < BOARD_HEIGHT and rows[y] == FULL_ROW]
+    
+    def _clear_lines(self):
+        for y in sorted(self.clearing_lines, reverse=True):
+            del self.rows[y]
+        self.rows[:0] = [0] * len(self.clearing_lines)
+        self.cols = [0] * BOARD_WIDTH
+        for y, bits in enumerate(self.rows):
+            while bits:
+                low = bits & -bits
+                self.cols[low.bit_length() - 1] |= 1 << y
+                bits ^= low
+        return super()._clear_lines()
+
 # ============================================================
 # DRAWING FUNCTIONS
 # ============================================================
@@ -1278,8 +1425,8 @@ def main():
     # Create trophy manager
     trophy_mgr = TrophyManager(save_data, sound)
     
-    # Game engine
-    engine = TetrisEngine()
+    # Game engine (--bitboard selects the bitmask core)
+    engine = BitboardTetrisEngine() if '--bitboard' in sys.argv else TetrisEngine()
     
     # State
     state = GameState.MENU
@@ -1547,10 +1694,266 @@ def main():
     pygame.quit()
     sys.exit()
 
+# ============================================================
+# SELF-PLAY (headless AI)
+# ============================================================
+# PlacementBot weights for lines cleared and the resulting board's
+# aggregate column height, covered holes and bumpiness. While the stack is
+# under AI_SAFE_HEIGHT the bot builds for tetrises: 'burn' is charged per
+# line of a 1-3 line clear, 'tetris' is paid for a 4-line clear, and 'well'
+# per filled cell of the rightmost column, which is kept open for the I
+AI_WEIGHTS = {'lines': 0.76, 'height': -0.51, 'holes': -0.36, 'bumpiness': -0.18,
+              'burn': -0.5, 'tetris': 4.0, 'well': -0.5}
+AI_SAFE_HEIGHT = 6     # Stack height (rows) above which the bot stops building a well
+AI_INPUT_FRAMES = 4    # Frames the bot spends on each rotate/shift/hold
+AI_MAX_PIECES = 2000   # Cap so games a strong bot never tops out of still end
+
+def board_features(rows: List[int]) -> Tuple[int, int, int, int]:
+    """(aggregate height, holes, bumpiness, well) of a bitboard, rows top to
+    bottom. Bumpiness leaves out the well (rightmost) column; well is the
+    number of filled cells in it."""
+    heights = [0] * BOARD_WIDTH
+    holes = 0
+    covered = 0
+    for y, bits in enumerate(rows):
+        new = bits & ~covered
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = BOARD_HEIGHT - y
+            new ^= low
+        holes += bin(covered & ~bits).count('1')
+        covered |= bits
+    stack = heights[:-1]
+    bumpiness = sum(abs(a - b) for a, b in zip(stack, stack[1:]))
+    well_bit = 1 << (BOARD_WIDTH - 1)
+    well = sum(1 for bits in rows if bits & well_bit)
+    return sum(heights), holes, bumpiness, well
+
+class PlacementBot:
+    """Scores every (rotation, column) landing of the current piece and of
+    the piece a hold would bring in, and plays the best one"""
+    
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = weights or AI_WEIGHTS
+        self.evaluated = 0
+    
+    def best_placement(self, engine: BitboardTetrisEngine, shape: str) -> Optional[Tuple[float, int, int]]:
+        """(score, rotation, x) of the best landing for `shape` from the spawn row"""
+        w = self.weights
+        best = None
+        seen = set()
+        stack = BOARD_HEIGHT - next((y for y, bits in enumerate(engine.rows) if bits), BOARD_HEIGHT)
+        building = stack < AI_SAFE_HEIGHT
+        for rotation, (left, right, _, row_masks, _) in enumerate(PIECE_MASKS[shape]):
+            if row_masks in seen:
+                continue
+            seen.add(row_masks)
+            for x in range(-left, BOARD_WIDTH - right):
+                if engine._check_collision(x, 0, rotation, shape):
+                    continue
+                y = engine.drop_distance(x, 0, rotation, shape)
+                rows = engine.rows[:]
+                for dy, bits in row_masks:
+                    rows[y + dy] |= bits << x if x >= 0 else bits >> -x
+                kept = [bits for bits in rows if bits != FULL_ROW]
+                cleared = BOARD_HEIGHT - len(kept)
+                height, holes, bumpiness, well = board_features(kept)
+                score = (w['lines'] * cleared + w['height'] * height +
+                         w['holes'] * holes + w['bumpiness'] * bumpiness)
+                if building:
+                    score += w['well'] * well
+                    if cleared == 4:
+                        score += w['tetris']
+                    elif cleared:
+                        score += w['burn'] * cleared
+                self.evaluated += 1
+                if best is None or score > best[0]:
+                    best = (score, rotation, x)
+        return best
+    
+    def choose(self, engine: BitboardTetrisEngine) -> Tuple[bool, int, int]:
+        """(hold first, rotation, x) for the piece in play"""
+        plan = self.best_placement(engine, engine.current_shape)
+        if engine.can_hold:
+            # Holding into an empty slot brings in the next piece
+            alt = self.best_placement(engine, engine.hold_piece or engine.next_piece)
+            if alt and (plan is None or alt[0] > plan[0]):
+                return True, alt[1], alt[2]
+        if plan is None:
+            return False, engine.rotation, engine.current_x
+        return False, plan[1], plan[2]
+
+class SilentSound:
+    """Sound engine stand-in for TrophyManager when running headless"""
+    def play_trophy(self):
+        pass
+
+def game_trophies(engine: TetrisEngine) -> List[str]:
+    """Trophies a fresh save would unlock from this one game"""
+    save_data = SaveData(total_games=1, total_lines=engine.lines,
+                         total_tetrises=engine.tetrises_in_game, high_score=engine.score,
+                         max_level=engine.level, total_holds=engine.holds_used,
+                         total_hard_drops=engine.hard_drops_used)
+    session_stats = {
+        'tetrises_in_game': engine.tetrises_in_game,
+        'back_to_back_tetris': engine.back_to_back_tetris,
+        'no_hold_10k': engine.score >= 10000 and engine.holds_used == 0
+    }
+    TrophyManager(save_data, SilentSound()).check_all(engine, session_stats)
+    return save_data.unlocked_trophies
+
+def play_game(seed: int, input_frames: int = AI_INPUT_FRAMES, max_pieces: int = AI_MAX_PIECES) -> dict:
+    """Play one seeded bot game and return its stats.
+    
+    Every bot input costs `input_frames` engine updates, so gravity and
+    LEVEL_SPEEDS apply to it the same way they do to a player."""
+    start = time.perf_counter()
+    random.seed(seed)
+    engine = BitboardTetrisEngine()
+    bot = PlacementBot()
+    alive = True
+    frames = 0
+    
+    def tick() -> bool:
+        nonlocal frames
+        frames += 1
+        return engine.update()[0]
+    
+    def press(action) -> bool:
+        """One input, then input_frames of engine time; False once the plan is void"""
+        nonlocal alive
+        if not action():
+            return False
+        for _ in range(input_frames):
+            alive = tick()
+            if not alive or engine.pieces_locked != piece:
+                return False
+        return True
+    
+    while alive and engine.pieces_locked < max_pieces:
+        # Gravity pauses for the line-clear animation; a piece locked during
+        # it would find the cleared rows still on the board and score them again
+        while alive and engine.clearing_lines:
+            alive = tick()
+        if not alive:
+            break
+        piece = engine.pieces_locked
+        use_hold, rotation, x = bot.choose(engine)
+        
+        ready = press(engine.hold) if use_hold else True
+        turns = 0
+        while ready and engine.rotation != rotation and turns < 4:
+            ready = press(lambda: engine.rotate(1))
+            turns += 1
+        while ready and engine.current_x != x:
+            ready = press(lambda: engine.move(1 if x > engine.current_x else -1, 0))
+        
+        # Gravity may have locked the piece (or ended the game) mid-plan
+        if alive and engine.pieces_locked == piece:
+            engine.hard_drop()
+            alive = engine._lock_piece() and tick()
+    
+    return {
+        'seed': seed,
+        'pieces': engine.pieces_locked,
+        'lines': engine.lines,
+        'tetrises': engine.tetrises_in_game,
+        'back_to_back_tetris': engine.back_to_back_tetris,
+        'holds': engine.holds_used,
+        'hard_drops': engine.hard_drops_used,
+        'score': engine.score,
+        'level': engine.level,
+        'frames': frames,
+        'topped_out': not alive,
+        'evaluated': bot.evaluated,
+        'seconds': round(time.perf_counter() - start, 4),
+        'trophies': game_trophies(engine),
+    }
+
+def _selfplay_init(speeds: Optional[List[int]]):
+    if speeds:
+        LEVEL_SPEEDS[:] = speeds
+
+def arg_value(flag: str, default, cast=int):
+    """Value following `flag` on the command line, or `default`"""
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv) and not sys.argv[idx + 1].startswith('--'):
+            return cast(sys.argv[idx + 1])
+    return default
+
+def run_selfplay(games: int = 100, seed: int = 0, workers: Optional[int] = None,
+                 out: Optional[str] = None, input_frames: int = AI_INPUT_FRAMES,
+                 max_pieces: int = AI_MAX_PIECES, speeds: Optional[List[int]] = None):
+    """Play `games` seeded bot games across a process pool, writing one JSON
+    line per game to `out` (stdout by default) and a summary to stderr"""
+    import multiprocessing
+    from functools import partial
+    
+    workers = workers or multiprocessing.cpu_count()
+    game = partial(play_game, input_frames=input_frames, max_pieces=max_pieces)
+    stream = open(out, 'w') if out else sys.stdout
+    results = []
+    start = time.perf_counter()
+    # SDL turns SIGTERM into a quit event, so Pool.terminate() would hang on
+    # the workers; close() and join() let them exit on their own
+    pool = multiprocessing.Pool(workers, initializer=_selfplay_init, initargs=(speeds,))
+    try:
+        for result in pool.imap_unordered(game, range(seed, seed + games), chunksize=max(1, games // (workers * 8))):
+            stream.write(json.dumps(result) + "\n")
+            results.append(result)
+    finally:
+        pool.close()
+        pool.join()
+        if out:
+            stream.close()
+    elapsed = time.perf_counter() - start
+    
+    pieces = sum(r['pieces'] for r in results)
+    search_seconds = sum(r['seconds'] for r in results)
+    n = len(results)
+    log = sys.stderr
+    print(f"Self-play: {n} games on {workers} workers in {elapsed:.2f}s", file=log)
+    print(f"  games/min:       {n / elapsed * 60:10.1f}", file=log)
+    print(f"  placements/sec:  {pieces / elapsed:10.0f}  ({pieces / search_seconds:.0f} per worker)", file=log)
+    print(f"  candidates/sec:  {sum(r['evaluated'] for r in results) / search_seconds:10.0f} per worker", file=log)
+    print(f"  mean lines {sum(r['lines'] for r in results) / n:.1f}, "
+          f"tetrises {sum(r['tetrises'] for r in results) / n:.2f}, "
+          f"back-to-back {sum(r['back_to_back_tetris'] for r in results) / n:.0%}, "
+          f"level {sum(r['level'] for r in results) / n:.1f}, "
+          f"topped out {sum(r['topped_out'] for r in results) / n:.0%}", file=log)
+    for trophy_id in TROPHIES:
+        unlocked = sum(trophy_id in r['trophies'] for r in results)
+        if unlocked:
+            print(f"  {trophy_id:16s} {unlocked / n:6.1%}", file=log)
+    return results
+
+def benchmark_ai(games: int = 5, seed: int = 0):
+    """Single-process bot throughput: placements/sec and games/min per core"""
+    start = time.perf_counter()
+    results = [play_game(s, max_pieces=500) for s in range(seed, seed + games)]
+    elapsed = time.perf_counter() - start
+    pieces = sum(r['pieces'] for r in results)
+    candidates = sum(r['evaluated'] for r in results)
+    print(f"PlacementBot: {games} games, {pieces} pieces in {elapsed:.2f}s (1 process)")
+    print(f"  placements/sec: {pieces / elapsed:10.0f}")
+    print(f"  candidates/sec: {candidates / elapsed:10.0f}")
+    print(f"  games/min:      {games / elapsed * 60:10.1f}")
+
 # ============================================================
 # ENTRY POINT
 # ============================================================
 if __name__ == "__main__":
+    if '--selfplay' in sys.argv:
+        speeds = arg_value('--speeds', None, lambda s: [int(v) for v in s.split(',')])
+        run_selfplay(games=arg_value('--selfplay', 100), seed=arg_value('--seed', 0),
+                     workers=arg_value('--workers', None), out=arg_value('--out', None, str),
+                     input_frames=arg_value('--input-frames', AI_INPUT_FRAMES),
+                     max_pieces=arg_value('--max-pieces', AI_MAX_PIECES), speeds=speeds)
+        sys.exit()
+    if '--bench-ai' in sys.argv:
+        benchmark_ai(arg_value('--bench-ai', 5))
+        sys.exit()
     print("=" * 50)
     print("  ULTRA!TETRIS — Pygame Port")
     print("  Samsoft • © The Tetris Company • Team Flames")
@@ -4,6 +4,12 @@ import math
 import random
 import array
 
+try:
+    import chipaudio
+    CHIPAUDIO_AVAILABLE = True
+except ImportError:
+    CHIPAUDIO_AVAILABLE = False
+
 # --- FLAMES CO. ENGINE INITIALIZATION ---
 pygame.init()
 pygame.mixer.init(frequency=44100, size=-16, channels=1, buffer=512)
@@ -579,6 +585,9 @@ class SoundGen:
     def __init__(self):
         self.sounds = {}
     def generate(self, name, freq, duration, wave_type='square', vol=0.5):
+        if CHIPAUDIO_AVAILABLE:
+            self.sounds[name] = chipaudio.soundgen_sound(freq, duration, wave_type, vol)
+            return
         sample_rate = 44100
         n_samples = int(sample_rate * duration)
         buf = array.array('h')